@@ -0,0 +1,343 @@
+"""
+Admission control for expensive endpoints.
+
+Two layers keep one client (or a burst of ingest) from saturating a worker
+while cheap reads stay fast:
+
+    rate limits - a token bucket per (caller, route class) plus one per
+                  route class shared by authenticated callers; an empty bucket
+                  answers 429 with Retry-After before the body is read
+    gates       - bounded concurrency per resource (uploads, audio streams,
+                  SINC analysis) with a bounded wait queue; a full queue or
+                  a wait past ADMISSION_QUEUE_TIMEOUT answers 503 with
+                  Retry-After
+
+`AdmissionMiddleware` applies both to the routes in ROUTE_RULES, ahead of
+request parsing; the analysis gate is taken around each analysis in
+app/analysis.py. Limits are per worker process: rates are divided by
+WEB_CONCURRENCY so a token's budget is roughly the same whatever the
+worker count.
+"""
+
+import asyncio
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from .metrics import admission_queued, admission_rejected, admission_wait
+
+ADMISSION_CONTROL = os.getenv("ADMISSION_CONTROL", "1") == "1"
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT") or 10.0)
+WORKERS = int(os.getenv("WEB_CONCURRENCY") or 1)
+
+# route class: (requests per second, burst) per caller, before the worker split.
+# RATE_LIMITS overrides entries, e.g. "ingest=0.5:10,stream=5:50"
+DEFAULT_RATE_LIMITS = {
+    "ingest": (0.2, 5),
+    "match": (1.0, 10),
+    "stream": (2.0, 20),
+}
+
+# route class: (requests per second, burst) across all callers, so many
+# callers together can't exceed what the host handles. GLOBAL_RATE_LIMITS
+# overrides entries the same way
+DEFAULT_GLOBAL_RATE_LIMITS = {
+    "ingest": (2.0, 20),
+    "match": (10.0, 50),
+    "stream": (50.0, 200),
+}
+
+# Concurrent requests per worker, and how many more may wait for a slot
+UPLOAD_CONCURRENCY = int(os.getenv("UPLOAD_CONCURRENCY") or 4)
+STREAM_CONCURRENCY = int(os.getenv("STREAM_CONCURRENCY") or 16)
+QUEUE_FACTOR = 4
+
+# Per-caller buckets kept; the least recently used is dropped past this
+MAX_BUCKETS = 10000
+
+
+class Overloaded(Exception):
+    """A gate's queue is full or the wait timed out."""
+
+    def __init__(self, gate: str, retry_after: int):
+        super().__init__(f"{gate} at capacity")
+        self.gate = gate
+        self.retry_after = retry_after
+
+
+def parse_rate_limits(
+    spec: Optional[str],
+    defaults: Dict[str, Tuple[float, int]] = DEFAULT_RATE_LIMITS
+) -> Dict[str, Tuple[float, int]]:
+    """`defaults` with `class=rate:burst` overrides applied."""
+    limits = dict(defaults)
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        route_class, _, value = item.partition("=")
+        rate, _, burst = value.partition(":")
+        limits[route_class.strip()] = (float(rate), int(burst or max(1, float(rate))))
+    return limits
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def wait(self, now: float) -> float:
+        """Refill; returns 0 if a token is available, else seconds until one is."""
+        self.tokens = min(self.burst, self.tokens + max(0.0, now - self.updated) * self.rate)
+        self.updated = max(now, self.updated)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+def _per_worker(limits: Dict[str, Tuple[float, int]], workers: int) -> Dict[str, Tuple[float, int]]:
+    return {
+        route_class: (rate / workers, max(1, math.ceil(burst / workers)))
+        for route_class, (rate, burst) in limits.items()
+        if rate > 0
+    }
+
+
+class RateLimiter:
+    """
+    Token buckets keyed by (caller, route class), plus one per route class
+    for all authenticated callers together. A request takes a token from
+    every bucket it is charged to or from none.
+    """
+
+    def __init__(
+        self,
+        limits: Dict[str, Tuple[float, int]],
+        workers: int = 1,
+        global_limits: Optional[Dict[str, Tuple[float, int]]] = None
+    ):
+        self.limits = _per_worker(limits, workers)
+        self._global = {
+            route_class: TokenBucket(*limit)
+            for route_class, limit in _per_worker(global_limits or {}, workers).items()
+        }
+        # Least recently used first
+        self._buckets: "OrderedDict[Tuple[str, str], TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, caller: str, route_class: str, shared: bool = True) -> float:
+        """
+        0 if the request may proceed, else seconds to wait. `shared=False`
+        leaves the route class's global bucket alone (unauthenticated
+        callers, whom the route will refuse anyway).
+        """
+        limit = self.limits.get(route_class)
+        pooled = self._global.get(route_class) if shared else None
+        with self._lock:
+            now = time.monotonic()
+            buckets = [pooled] if pooled is not None else []
+            if limit is not None:
+                buckets.append(self._bucket((caller, route_class), limit))
+            wait = max((bucket.wait(now) for bucket in buckets), default=0.0)
+            if not wait:
+                for bucket in buckets:
+                    bucket.tokens -= 1
+            return wait
+
+    def _bucket(self, key: Tuple[str, str], limit: Tuple[float, int]) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            self._buckets.move_to_end(key)
+            return bucket
+        if len(self._buckets) >= MAX_BUCKETS:
+            # The longest idle caller; most likely refilled anyway
+            self._buckets.popitem(last=False)
+        bucket = self._buckets[key] = TokenBucket(*limit)
+        return bucket
+
+
+class Gate:
+    """
+    At most `limit` holders; up to `queue_limit` more wait in FIFO order for
+    at most `timeout` seconds. Used from the event loop only.
+    """
+
+    def __init__(self, name: str, limit: int, queue_limit: int, timeout: float = ADMISSION_QUEUE_TIMEOUT):
+        self.name = name
+        self.limit = limit
+        self.queue_limit = queue_limit
+        self.timeout = timeout
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    def _reject(self, reason: str):
+        admission_rejected.inc(self.name, reason)
+        raise Overloaded(self.name, max(1, math.ceil(self.timeout)))
+
+    async def acquire(self):
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+        if len(self._waiters) >= self.queue_limit:
+            self._reject("queue_full")
+
+        admission_queued.inc(self.name)
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        start = time.perf_counter()
+        try:
+            # release() hands the slot over by resolving the future
+            await asyncio.wait_for(waiter, self.timeout)
+        except asyncio.TimeoutError:
+            self._reject("queue_timeout")
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            admission_wait.observe(time.perf_counter() - start, self.name)
+
+    def release(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+
+class Rule:
+    """Requests matching `method` and `pattern` count against `route_class` and hold `gates`."""
+
+    def __init__(self, method: str, pattern: str, route_class: str, gates: Sequence[Gate] = ()):
+        self.method = method
+        self.pattern = re.compile(pattern)
+        self.route_class = route_class
+        self.gates = tuple(gates)
+
+
+upload_gate = Gate("uploads", UPLOAD_CONCURRENCY, UPLOAD_CONCURRENCY * QUEUE_FACTOR)
+stream_gate = Gate("streams", STREAM_CONCURRENCY, STREAM_CONCURRENCY * QUEUE_FACTOR)
+
+ROUTE_RULES = [
+    Rule("POST", r"^/api/assets/issue$", "ingest", [upload_gate]),
+    Rule("POST", r"^/api/imports$", "ingest", [upload_gate]),
+    Rule("POST", r"^/api/assets/match$", "match", [upload_gate]),
+    Rule("GET", r"^/api/assets/\d+/audio$", "stream", [stream_gate]),
+]
+
+rate_limiter = RateLimiter(
+    parse_rate_limits(os.getenv("RATE_LIMITS")),
+    WORKERS,
+    parse_rate_limits(os.getenv("GLOBAL_RATE_LIMITS"), DEFAULT_GLOBAL_RATE_LIMITS)
+)
+
+
+def _caller(scope, valid_token: Callable[[str], bool]) -> Tuple[str, bool]:
+    """
+    (bucket key, authenticated): a valid bearer token, else the client
+    address. Keying on any header value would give every made-up token a
+    fresh bucket.
+    """
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            token = value.decode("latin-1").replace("Bearer ", "").strip()
+            if valid_token(token):
+                return "token:" + token, True
+            break
+    client = scope.get("client")
+    return (client[0] if client else "unknown"), False
+
+
+async def _reject(send, status: int, detail: str, retry_after: float):
+    body = ('{"detail":"%s"}' % detail).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware applying rate limits and gates to ROUTE_RULES. Runs
+    before the request body is read, and holds gate slots until the
+    response (including a streamed body) has been sent. `valid_token`
+    says whether a bearer token is genuine; only those get their own
+    buckets, other requests are limited by client address.
+    """
+
+    def __init__(
+        self,
+        app,
+        rules: List[Rule] = ROUTE_RULES,
+        limiter: RateLimiter = rate_limiter,
+        valid_token: Callable[[str], bool] = lambda token: False
+    ):
+        self.app = app
+        self.rules = rules
+        self.limiter = limiter
+        self.valid_token = valid_token
+
+    def _match(self, scope) -> Optional[Rule]:
+        for rule in self.rules:
+            if rule.method == scope["method"] and rule.pattern.match(scope["path"]):
+                return rule
+        return None
+
+    async def __call__(self, scope, receive, send):
+        rule = self._match(scope) if scope["type"] == "http" else None
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        # Unauthenticated requests only spend their address's bucket, so
+        # they can't drain the shared one for real issuers
+        caller, authenticated = _caller(scope, self.valid_token)
+        retry_after = self.limiter.take(caller, rule.route_class, shared=authenticated)
+        if retry_after:
+            admission_rejected.inc(rule.route_class, "rate_limited")
+            await _reject(send, 429, "Rate limit exceeded", retry_after)
+            return
+
+        held = []
+        try:
+            for gate in rule.gates:
+                await gate.acquire()
+                held.append(gate)
+        except Overloaded as e:
+            for gate in reversed(held):
+                gate.release()
+            await _reject(send, 503, "Server busy, retry later", e.retry_after)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            for gate in reversed(held):
+                gate.release()
@@ -0,0 +1,80 @@
+"""
+SINC analysis for requests, off the event loop.
+
+`issue_asset` awaits `analyze(path)` and excerpt matching awaits
+`landmark_blob(path)`; both run on a bounded thread pool so a worker keeps
+serving other requests while an upload is decoded. With admission control
+on, callers first take a slot on the `analysis` gate, so a burst beyond
+the pool's queue gets 503 instead of piling up. The app lifespan calls
+`drain()` at shutdown so in-flight analyses finish before the process exits.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from .admission import ADMISSION_CONTROL, QUEUE_FACTOR, Gate
+
+# Threads per server process; `python -m app.serve` exports WEB_CONCURRENCY
+# so N workers split the cores instead of each claiming all of them
+ANALYSIS_THREADS = int(
+    os.getenv("ANALYSIS_THREADS")
+    or max(1, (os.cpu_count() or 1) // int(os.getenv("WEB_CONCURRENCY") or 1))
+)
+
+analysis_gate = Gate("analysis", ANALYSIS_THREADS, ANALYSIS_THREADS * QUEUE_FACTOR)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def executor() -> ThreadPoolExecutor:
+    """The process-wide analysis pool, created on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=ANALYSIS_THREADS, thread_name_prefix="sinc")
+    return _executor
+
+
+async def _run(fn: Callable, *args):
+    loop = asyncio.get_running_loop()
+    if not ADMISSION_CONTROL:
+        return await loop.run_in_executor(executor(), fn, *args)
+    async with analysis_gate.slot():
+        return await loop.run_in_executor(executor(), fn, *args)
+
+
+def _analyze(path: str) -> dict:
+    from sinc.fingerprint import analyze_audio
+    return analyze_audio(path)
+
+
+def _landmark_blob(path: str) -> Optional[bytes]:
+    from sinc.fingerprint import compute_landmark_blob
+    return compute_landmark_blob(path)
+
+
+async def analyze(path: str) -> dict:
+    """
+    Run SINC analysis on a local file in the analysis pool. Raises
+    `Overloaded` when the analysis gate is saturated.
+    """
+    return await _run(_analyze, path)
+
+
+async def landmark_blob(path: str) -> Optional[bytes]:
+    """Landmark blob of an excerpt, computed in the analysis pool."""
+    return await _run(_landmark_blob, path)
+
+
+def drain():
+    """Wait for in-flight analyses and shut the pool down."""
+    global _executor
+    with _executor_lock:
+        pool, _executor = _executor, None
+    if pool is not None:
+        pool.shutdown(wait=True)
@@ -4,12 +4,19 @@ Blockchain integration for Polygon registry
 
 import os
 import json
+import time
+import logging
+import threading
 from typing import Optional
 from web3 import Web3
 from dotenv import load_dotenv
 
+from .metrics import chain_rpc_duration, chain_tx_confirmation
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Contract ABI (minimal for IssuanceRegistry)
 CONTRACT_ABI = [
     {
@@ -51,24 +58,51 @@ CONTRACT_ABI = [
 
 
 class BlockchainRegistry:
+    """
+    Client for the IssuanceRegistry contract.
+
+    The Web3 provider is created on first use, so importing this module in
+    every server worker is cheap; in a multi-worker deployment only the
+    elected coordinator (see app/coordinator.py) ever connects.
+    """
+
     def __init__(self):
         self.rpc_url = os.getenv("POLYGON_RPC_URL", "http://127.0.0.1:8545")
         self.contract_address = os.getenv("CONTRACT_ADDRESS", "")
         self.private_key = os.getenv("PRIVATE_KEY", "")
         self.w3 = None
         self.contract = None
-
-        if self.contract_address and self.private_key:
+        self._connect_lock = threading.Lock()
+        self._connected = False
+
+    def _connect(self):
+        if self._connected:
+            return
+        with self._connect_lock:
+            if self._connected:
+                return
+            self._connected = True
+            if not (self.contract_address and self.private_key):
+                return
             try:
                 self.w3 = Web3(Web3.HTTPProvider(self.rpc_url))
                 self.contract = self.w3.eth.contract(
                     address=Web3.to_checksum_address(self.contract_address),
                     abi=CONTRACT_ABI
                 )
-            except Exception as e:
-                print(f"Blockchain init error: {e}")
+            except Exception:
+                logger.exception("Blockchain init failed", extra={"rpc_url": self.rpc_url})
+
+    def _rpc(self, method: str, fn, *args, **kwargs):
+        """Call an RPC function and record its latency."""
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            chain_rpc_duration.observe(time.perf_counter() - start, method)
 
     def is_available(self) -> bool:
+        self._connect()
         return self.w3 is not None and self.w3.is_connected()
 
     def register_asset(
@@ -85,7 +119,7 @@ class BlockchainRegistry:
             Transaction hash if successful, None otherwise
         """
         if not self.is_available():
-            print("Blockchain not available, skipping registration")
+            logger.info("Blockchain not available, skipping registration", extra={"asset_id": asset_id})
             return None
 
         try:
@@ -100,7 +134,8 @@ class BlockchainRegistry:
                 fp_bytes = bytes.fromhex(fingerprint_hash)
 
             # Build transaction
-            nonce = self.w3.eth.get_transaction_count(account.address)
+            nonce = self._rpc("eth_getTransactionCount", self.w3.eth.get_transaction_count, account.address)
+            gas_price = self._rpc("eth_gasPrice", lambda: self.w3.eth.gas_price)
 
             tx = self.contract.functions.registerAsset(
                 asset_id,
@@ -111,20 +146,22 @@ class BlockchainRegistry:
                 'from': account.address,
                 'nonce': nonce,
                 'gas': 200000,
-                'gasPrice': self.w3.eth.gas_price
+                'gasPrice': gas_price
             })
 
             # Sign and send
             signed = self.w3.eth.account.sign_transaction(tx, self.private_key)
-            tx_hash = self.w3.eth.send_raw_transaction(signed.raw_transaction)
+            submitted = time.perf_counter()
+            tx_hash = self._rpc("eth_sendRawTransaction", self.w3.eth.send_raw_transaction, signed.raw_transaction)
 
             # Wait for receipt
             receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+            chain_tx_confirmation.observe(time.perf_counter() - submitted)
 
             return receipt.transactionHash.hex()
 
-        except Exception as e:
-            print(f"Blockchain registration error: {e}")
+        except Exception:
+            logger.exception("Blockchain registration failed", extra={"asset_id": asset_id})
             return None
 
     def get_asset(self, asset_id: int) -> Optional[dict]:
@@ -135,17 +172,17 @@ class BlockchainRegistry:
             return None
 
         try:
-            result = self.contract.functions.getAsset(asset_id).call()
+            result = self._rpc("eth_call", self.contract.functions.getAsset(asset_id).call)
             return {
                 "fingerprintHash": result[0].hex(),
                 "owner": result[1],
                 "consentFlags": result[2],
                 "timestamp": result[3]
             }
-        except Exception as e:
-            print(f"Blockchain get error: {e}")
+        except Exception:
+            logger.exception("Blockchain lookup failed", extra={"asset_id": asset_id})
             return None
 
 
-# Singleton instance
+# Singleton instance (connects lazily)
 registry = BlockchainRegistry()
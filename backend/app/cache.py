@@ -0,0 +1,123 @@
+"""
+Key-value caches that work across the server's worker processes.
+
+`CACHE_BACKEND=memory` (the default) keeps entries in a per-process dict,
+which is all a single worker needs. With several workers an invalidation
+in one process has to reach the others, so `python -m app.serve` selects
+`sqlite`: a WAL-mode SQLite file under RUN_DIR that every worker on the
+host reads and writes, with no extra service to run.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+RUN_DIR = Path(os.getenv("RUN_DIR") or Path(__file__).parent.parent / "run")
+SHARED_CACHE_PATH = RUN_DIR / "cache.db"
+
+
+class MemoryBackend:
+    """Process-local entries; values are stored as given."""
+
+    def __init__(self):
+        self._entries: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        return self._entries.get(key)
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = value
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteBackend:
+    """
+    Entries in a SQLite file shared by every process on the host, one
+    connection per thread. Values go through `dumps`/`loads` (JSON by
+    default), so they must round-trip through text.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        namespace: str,
+        dumps: Callable[[Any], str] = json.dumps,
+        loads: Callable[[str], Any] = json.loads
+    ):
+        self.path = Path(path)
+        self.namespace = namespace
+        self.dumps = dumps
+        self.loads = loads
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                "PRIMARY KEY (namespace, key)) WITHOUT ROWID"
+            )
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        row = self._conn().execute(
+            "SELECT value FROM cache_entries WHERE namespace = ? AND key = ?",
+            (self.namespace, key)
+        ).fetchone()
+        return self.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Any):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO cache_entries (namespace, key, value) VALUES (?, ?, ?)",
+            (self.namespace, key, self.dumps(value))
+        )
+
+    def delete(self, key: str):
+        self._conn().execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+            (self.namespace, key)
+        )
+
+    def clear(self):
+        self._conn().execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+
+
+def cache_backend(
+    namespace: str,
+    dumps: Callable[[Any], str] = json.dumps,
+    loads: Callable[[str], Any] = json.loads
+):
+    """Backend for one cache, as selected by CACHE_BACKEND."""
+    if CACHE_BACKEND == "memory":
+        return MemoryBackend()
+    if CACHE_BACKEND == "sqlite":
+        return SQLiteBackend(SHARED_CACHE_PATH, namespace, dumps, loads)
+    raise ValueError(f"Unknown CACHE_BACKEND {CACHE_BACKEND!r} (expected memory or sqlite)")
+
+
+def reset_shared():
+    """
+    Drop the shared cache file. Entries can outlive the database they were
+    read from, so the server clears it before starting workers.
+    """
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{SHARED_CACHE_PATH}{suffix}").unlink(missing_ok=True)
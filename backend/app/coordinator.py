@@ -0,0 +1,235 @@
+"""
+Background coordinator elected among the server's worker processes.
+
+Every worker starts a `Coordinator` in the app lifespan. The one holding
+the flock on COORDINATOR_LOCK does the work that must not run in several
+processes at once:
+
+    chain     - submit queued `ChainSubmission` rows one at a time, so a
+                single process owns the signing account's nonce sequence
+    features  - flag feature-store frames of deleted assets and compact
+                the store once enough of it is dead
+
+The others keep polling for the lock; the kernel drops a flock when its
+process exits, so a surviving worker takes over within one interval.
+Election is per host: workers on several hosts need COORDINATOR=0 on
+all but one of them.
+"""
+
+import fcntl
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from .events import hub as event_hub, record_event
+from .metrics import chain_submissions
+from .models import Asset, AssetEventKind, ChainSubmission, ChainSubmissionStatus
+
+logger = logging.getLogger(__name__)
+
+RUN_DIR = Path(os.getenv("RUN_DIR") or Path(__file__).parent.parent / "run")
+COORDINATOR_LOCK = RUN_DIR / "coordinator.lock"
+COORDINATOR_INTERVAL = float(os.getenv("COORDINATOR_INTERVAL") or 2.0)
+
+# Attempts before a registration is marked FAILED, and rows read per pass
+MAX_ATTEMPTS = 5
+SUBMISSION_BATCH_SIZE = 20
+
+# Feature store upkeep every this many seconds; compact past this dead share
+MAINTENANCE_INTERVAL = 3600.0
+COMPACT_DEAD_RATIO = 0.25
+
+
+class ProcessLock:
+    """
+    Non-blocking exclusive flock on a file, held until `release` or process
+    exit. Two opens of the same path conflict even within one process.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._fd: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def try_acquire(self) -> bool:
+        if self._fd is not None:
+            return True
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        # Holder's pid, for operators
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{os.getpid()}\n".encode())
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+            self._fd = None
+
+
+def enqueue_registration(db: Session, asset_id: int, fingerprint_hash: str) -> ChainSubmission:
+    """Queue an asset for on-chain registration. The caller owns the transaction."""
+    submission = ChainSubmission(asset_id=asset_id, fingerprint_hash=fingerprint_hash)
+    db.add(submission)
+    return submission
+
+
+def submit_pending(
+    db: Session,
+    chain,
+    limit: int = SUBMISSION_BATCH_SIZE,
+    should_stop: Callable[[], bool] = lambda: False
+) -> int:
+    """
+    Submit queued registrations oldest first; returns how many were attempted.
+
+    Each result is committed before the next submission so a restart never
+    re-sends a confirmed registration. Nothing is attempted while the chain
+    is unreachable, so an outage doesn't use up attempts.
+    """
+    if not chain.is_available():
+        return 0
+
+    pending = db.query(ChainSubmission).filter(
+        ChainSubmission.status == ChainSubmissionStatus.PENDING.value
+    ).order_by(ChainSubmission.created_at, ChainSubmission.asset_id).limit(limit).all()
+
+    attempted = 0
+    for submission in pending:
+        if should_stop():
+            break
+        tx_hash = chain.register_asset(submission.asset_id, submission.fingerprint_hash)
+        submission.attempts += 1
+        attempted += 1
+        if tx_hash:
+            submission.status = ChainSubmissionStatus.CONFIRMED.value
+            submission.tx_hash = tx_hash
+            submission.error = None
+            db.query(Asset).filter(Asset.id == submission.asset_id).update(
+                {"chain_tx_hash": tx_hash}, synchronize_session=False
+            )
+            record_event(db, submission.asset_id, AssetEventKind.CHAIN_CONFIRMED, chain_tx_hash=tx_hash)
+            chain_submissions.inc("confirmed")
+        else:
+            submission.error = "Registration failed"
+            if submission.attempts >= MAX_ATTEMPTS:
+                submission.status = ChainSubmissionStatus.FAILED.value
+            chain_submissions.inc("failed")
+        db.commit()
+        if tx_hash:
+            event_hub.notify()
+    return attempted
+
+
+def maintain_features(db: Session):
+    """Flag frames of assets no longer in the catalog; compact when mostly dead."""
+    from .features import feature_store, sync_deleted
+
+    flagged = sync_deleted(db)
+    store = feature_store()
+    total = len(store.frames())
+    live = int(store.entries()["n_frames"].sum())
+    if total and (total - live) / total >= COMPACT_DEAD_RATIO:
+        before, after = store.compact()
+        logger.info("Feature store compacted", extra={"rows_before": before, "rows_after": after})
+    elif flagged:
+        logger.info("Feature store entries flagged", extra={"flagged": flagged})
+
+
+class Coordinator:
+    """
+    Polling thread that does coordinator work while it holds the lock.
+
+    `chain` is any object with `is_available()` and `register_asset()`
+    (`BlockchainRegistry`, or `FakeChain` in benchmarks).
+    """
+
+    def __init__(
+        self,
+        chain,
+        session_factory: Optional[Callable[[], Session]] = None,
+        lock_path: Path = COORDINATOR_LOCK,
+        interval: float = COORDINATOR_INTERVAL
+    ):
+        if session_factory is None:
+            from .database import SessionLocal as session_factory
+        self.chain = chain
+        self.session_factory = session_factory
+        self.lock = ProcessLock(lock_path)
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._next_maintenance = time.monotonic() + MAINTENANCE_INTERVAL
+
+    @property
+    def is_leader(self) -> bool:
+        return self.lock.held
+
+    def run_once(self) -> int:
+        """One pass if elected; returns registrations attempted."""
+        if not self.lock.try_acquire():
+            return 0
+        db = self.session_factory()
+        try:
+            attempted = submit_pending(db, self.chain, should_stop=self._stop.is_set)
+            if time.monotonic() >= self._next_maintenance:
+                self._next_maintenance = time.monotonic() + MAINTENANCE_INTERVAL
+                maintain_features(db)
+            return attempted
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def submit_all(self) -> Optional[int]:
+        """
+        Drain the submission queue in the foreground (CLI use). Returns None
+        if another process is the coordinator.
+        """
+        if not self.lock.try_acquire():
+            return None
+        try:
+            total = 0
+            while attempted := self.run_once():
+                total += attempted
+            return total
+        finally:
+            self.lock.release()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                attempted = self.run_once()
+            except Exception:
+                logger.exception("Coordinator pass failed")
+                attempted = 0
+            # Keep going without a pause while there is a backlog
+            if not attempted and self._stop.wait(self.interval):
+                break
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="coordinator", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Finish the submission in progress, then give up the lock."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.lock.release()
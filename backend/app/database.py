@@ -1,13 +1,28 @@
-from sqlalchemy import create_engine
+import os
+from contextlib import contextmanager
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+load_dotenv()
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./issuance.db"
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./issuance.db")
+
+connect_args = {}
+if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
+    # Several server workers share the file; wait on their write locks
+    # instead of failing with "database is locked"
+    connect_args = {"check_same_thread": False, "timeout": 30}
 
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL, connect_args=connect_args
 )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Objects stay loaded after commit, so write endpoints can return what they
+# wrote without a refresh SELECT: every column default is client-side and
+# primary keys come back at flush (RETURNING / lastrowid)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 Base = declarative_base()
 
@@ -18,3 +33,42 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+@contextmanager
+def unit_of_work(db: Session):
+    """
+    One transaction for a write endpoint: flush inside the block when ids
+    are needed, commit once on exit, roll back if anything raises.
+    """
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def init_schema():
+    """
+    Create tables and search indexes, and backfill data the schema now
+    expects (genesis holding events). Idempotent, but it takes DDL locks,
+    so deployments run it once (`python -m app.serve migrate`) rather than
+    in every worker.
+    """
+    from . import models  # noqa: F401  (registers the tables on Base)
+    from .search import install_search
+
+    if engine.dialect.name == "sqlite":
+        # Readers don't block the writer; persists in the database file
+        with engine.connect() as conn:
+            conn.execute(text("PRAGMA journal_mode=WAL"))
+    Base.metadata.create_all(bind=engine)
+    install_search(engine)
+
+    from .holdings import backfill_genesis
+    db = SessionLocal()
+    try:
+        backfill_genesis(db)
+    finally:
+        db.close()
@@ -0,0 +1,282 @@
+"""
+Asset lifecycle events for server-sent event streams.
+
+Writers call `record_event` inside their own transaction, so an event
+exists exactly when the change it describes was committed; the row id is
+the SSE event id. Each worker runs one `EventHub` that polls
+`asset_events` for new rows (one query per EVENT_POLL_INTERVAL, however
+many clients are connected, and woken early by `notify` for events this
+process wrote) and fans them out to in-process subscriptions keyed by
+asset id. Events written by other workers, the coordinator or the import
+CLI arrive on the next poll.
+
+Each event is encoded once and shared by all subscribers, and an idle
+subscription is just a small queue, so thousands of connected clients
+per worker cost little. A client that falls behind is disconnected and
+resumes with Last-Event-ID: from the hub's ring of recent events, or from
+the table when the ring no longer reaches back that far.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from collections import deque
+from datetime import datetime
+from typing import Callable, Deque, Dict, Iterable, List, NamedTuple, Optional, Set
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from .models import Asset, AssetEvent, AssetEventKind, ClearanceStatus
+
+logger = logging.getLogger(__name__)
+
+EVENT_POLL_INTERVAL = float(os.getenv("EVENT_POLL_INTERVAL") or 0.5)
+MAX_SUBSCRIBERS = int(os.getenv("MAX_EVENT_SUBSCRIBERS") or 10000)
+
+# Comment line sent on idle streams so proxies keep them open
+HEARTBEAT_SECONDS = 15.0
+
+# Recent events kept for resumes, rows read per poll, and events replayed
+# from the table on a resume the ring can't serve
+RING_SIZE = 4096
+POLL_BATCH_SIZE = 1000
+REPLAY_LIMIT = 1000
+
+# Undelivered events per subscriber before it is disconnected
+SUBSCRIBER_QUEUE_SIZE = 256
+
+# Postgres can commit a lower id after a higher one has been read, so polls
+# re-read this many ids back and skip the ones already seen
+REORDER_WINDOW = 100
+
+
+# ============================================
+# Recording
+# ============================================
+
+def event_row(asset_id: int, kind: AssetEventKind, **data) -> dict:
+    """Insert parameters for an event; `data` holds the asset fields it changed."""
+    return {
+        "asset_id": asset_id,
+        "kind": kind.value,
+        "data_json": json.dumps(data, default=str, separators=(",", ":")),
+        "occurred_at": datetime.utcnow(),
+    }
+
+
+def record_events(db: Session, rows: List[dict]):
+    """
+    Append events with one executemany INSERT (their ids aren't needed
+    here). The caller owns the transaction.
+    """
+    if rows:
+        db.execute(insert(AssetEvent), rows)
+
+
+def record_event(db: Session, asset_id: int, kind: AssetEventKind, **data):
+    """Append a single event. The caller owns the transaction."""
+    record_events(db, [event_row(asset_id, kind, **data)])
+
+
+def analysis_events(asset: Asset) -> List[dict]:
+    """`fingerprinted` plus `cleared` or `flagged` from an asset's SINC fields."""
+    rows = [event_row(
+        asset.id, AssetEventKind.FINGERPRINTED,
+        fingerprint_hash=asset.fingerprint_hash,
+        duration_seconds=asset.duration_seconds,
+        risk_score=asset.risk_score
+    )]
+    if asset.clearance_status == ClearanceStatus.CLEARED.value:
+        rows.append(event_row(asset.id, AssetEventKind.CLEARED, clearance_status=asset.clearance_status))
+    elif asset.clearance_status == ClearanceStatus.FLAGGED.value:
+        rows.append(event_row(asset.id, AssetEventKind.FLAGGED, clearance_status=asset.clearance_status))
+    return rows
+
+
+# ============================================
+# Fan-out
+# ============================================
+
+class Event(NamedTuple):
+    id: int
+    asset_id: int
+    sse: bytes  # complete SSE frame, encoded once
+
+
+def _to_event(row: AssetEvent) -> Event:
+    payload = json.dumps({
+        "id": row.id,
+        "asset_id": row.asset_id,
+        "kind": row.kind,
+        "data": json.loads(row.data_json),
+        "occurred_at": row.occurred_at.isoformat(),
+    }, separators=(",", ":"))
+    return Event(row.id, row.asset_id, f"id: {row.id}\nevent: {row.kind}\ndata: {payload}\n\n".encode())
+
+
+def load_events(
+    db: Session,
+    after_id: int,
+    asset_ids: Optional[Iterable[int]] = None,
+    limit: int = REPLAY_LIMIT
+) -> List[Event]:
+    """Events after `after_id` from the table, oldest first."""
+    query = db.query(AssetEvent).filter(AssetEvent.id > after_id)
+    if asset_ids is not None:
+        query = query.filter(AssetEvent.asset_id.in_(list(asset_ids)))
+    return [_to_event(row) for row in query.order_by(AssetEvent.id).limit(limit)]
+
+
+class Subscription:
+    """A client's queue of events; None in the queue means the stream must end."""
+    __slots__ = ("asset_ids", "queue")
+
+    def __init__(self, asset_ids: Optional[frozenset]):
+        self.asset_ids = asset_ids
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+
+class EventHub:
+    """Per-process fan-out of `asset_events` rows to subscriptions."""
+
+    def __init__(self, session_factory: Optional[Callable[[], Session]] = None):
+        self.session_factory = session_factory
+        self._by_asset: Dict[int, Set[Subscription]] = {}
+        self._all: Set[Subscription] = set()
+        self._count = 0
+        self._ring: Deque[Event] = deque()
+        self._seen: Set[int] = set()
+        self._floor = 0  # events with id <= floor may be missing from the ring
+        self._cursor: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._closed = False
+
+    @property
+    def subscriber_count(self) -> int:
+        return self._count
+
+    @property
+    def full(self) -> bool:
+        return self._count >= MAX_SUBSCRIBERS
+
+    def subscribe(self, asset_ids: Optional[Iterable[int]] = None) -> Subscription:
+        subscription = Subscription(frozenset(asset_ids) if asset_ids is not None else None)
+        if subscription.asset_ids is None:
+            self._all.add(subscription)
+        else:
+            for asset_id in subscription.asset_ids:
+                self._by_asset.setdefault(asset_id, set()).add(subscription)
+        self._count += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        if subscription.asset_ids is None:
+            if subscription not in self._all:
+                return
+            self._all.discard(subscription)
+        else:
+            removed = False
+            for asset_id in subscription.asset_ids:
+                subscribers = self._by_asset.get(asset_id)
+                if subscribers and subscription in subscribers:
+                    removed = True
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._by_asset[asset_id]
+            if not removed:
+                return
+        self._count -= 1
+
+    def recent(self, after_id: int, asset_ids: Optional[Iterable[int]] = None) -> Optional[List[Event]]:
+        """Events after `after_id` from the ring, or None if it doesn't reach back that far."""
+        if self._cursor is None or after_id < self._floor:
+            return None
+        wanted = frozenset(asset_ids) if asset_ids is not None else None
+        return sorted(
+            (event for event in self._ring
+             if event.id > after_id and (wanted is None or event.asset_id in wanted)),
+            key=lambda event: event.id
+        )
+
+    def publish(self, events: Iterable[Event]):
+        for event in events:
+            if event.id in self._seen:
+                continue
+            self._ring.append(event)
+            self._seen.add(event.id)
+            if len(self._ring) > RING_SIZE:
+                evicted = self._ring.popleft()
+                self._seen.discard(evicted.id)
+                self._floor = max(self._floor, evicted.id)
+
+            targets = self._by_asset.get(event.asset_id, ())
+            for subscription in (*self._all, *targets):
+                try:
+                    subscription.queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    self._disconnect(subscription)
+
+    def _disconnect(self, subscription: Subscription):
+        # Too far behind: end the stream; the client resumes from its last id
+        self.unsubscribe(subscription)
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(None)
+
+    def notify(self):
+        """Poll now instead of at the next interval. Safe from any thread."""
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _poll(self) -> List[Event]:
+        db = self.session_factory()
+        try:
+            if self._cursor is None:
+                latest = db.query(AssetEvent.id).order_by(AssetEvent.id.desc()).first()
+                self._cursor = self._floor = latest[0] if latest else 0
+                return []
+            window = REORDER_WINDOW if db.bind.dialect.name == "postgresql" else 0
+            rows = db.query(AssetEvent).filter(
+                AssetEvent.id > self._cursor - window
+            ).order_by(AssetEvent.id).limit(POLL_BATCH_SIZE + window).all()
+            events = [_to_event(row) for row in rows if row.id not in self._seen]
+            if events:
+                self._cursor = max(self._cursor, events[-1].id)
+            return events
+        finally:
+            db.close()
+
+    async def run(self):
+        """Poll and fan out until `close`; started by the app lifespan."""
+        if self.session_factory is None:
+            from .database import SessionLocal
+            self.session_factory = SessionLocal
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        while not self._closed:
+            try:
+                events = await self._loop.run_in_executor(None, self._poll)
+                self.publish(events)
+                if len(events) >= POLL_BATCH_SIZE:
+                    continue
+            except Exception:
+                logger.exception("Event poll failed")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), EVENT_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def close(self):
+        """Stop polling and end every open stream."""
+        self._closed = True
+        for subscription in list(self._all) + [s for subs in self._by_asset.values() for s in subs]:
+            self._disconnect(subscription)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+
+hub = EventHub()
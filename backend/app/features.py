@@ -0,0 +1,118 @@
+"""
+Catalog-wide access to stored SINC MFCC frames.
+
+Issued assets have their MFCC frame matrices appended to a memory-mapped
+`sinc.featurestore.FeatureStore` under FEATURE_DIR, so catalog sweeps read
+zero-copy views instead of re-decoding uploads.
+
+    python -m app.features stats
+    python -m app.features backfill    # decode uploads of assets not yet stored
+    python -m app.features compact     # drop frames of assets no longer in the catalog
+"""
+
+import argparse
+import logging
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+# Add sinc to path (also needed when run as `python -m app.features`)
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from sinc.featurestore import FeatureStore
+from .models import Asset
+from .storage import local_audio_path
+
+logger = logging.getLogger(__name__)
+
+FEATURE_DIR = Path(os.getenv("FEATURE_DIR", Path(__file__).parent.parent / "features"))
+FEATURE_DTYPE = os.getenv("FEATURE_DTYPE", "float16")
+
+# Asset ids read per query while reconciling the store with the catalog
+SYNC_BATCH_SIZE = 10000
+
+_store: Optional[FeatureStore] = None
+_store_lock = threading.Lock()
+
+
+def feature_store() -> FeatureStore:
+    """The process-wide feature store, opened on first use."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                from sinc.fingerprint import N_MFCC
+                _store = FeatureStore(FEATURE_DIR, n_coeffs=N_MFCC, dtype=FEATURE_DTYPE)
+    return _store
+
+
+def store_features(asset_id: int, features: np.ndarray):
+    """Append an asset's (frames, coeffs) MFCC matrix, replacing any previous one."""
+    feature_store().append(asset_id, features)
+
+
+def sync_deleted(db: Session) -> int:
+    """Flag stored assets that are no longer in the catalog; returns how many."""
+    store = feature_store()
+    stored = np.sort(store.entries()["asset_id"])
+    missing = []
+    for i in range(0, len(stored), SYNC_BATCH_SIZE):
+        batch = stored[i:i + SYNC_BATCH_SIZE].tolist()
+        present = {asset_id for (asset_id,) in db.query(Asset.id).filter(Asset.id.in_(batch))}
+        missing.extend(asset_id for asset_id in batch if asset_id not in present)
+    for asset_id in missing:
+        store.delete(asset_id)
+    return len(missing)
+
+
+def backfill(db: Session) -> int:
+    """Decode and store features for catalog assets missing from the store."""
+    from sinc.decode import decode
+    from sinc.fingerprint import SAMPLE_RATE, compute_mfcc
+
+    store = feature_store()
+    stored = 0
+    for asset_id, file_path in db.query(Asset.id, Asset.file_path).order_by(Asset.id).yield_per(SYNC_BATCH_SIZE):
+        if asset_id in store:
+            continue
+        try:
+            path = local_audio_path(db, file_path)
+            if path is None:
+                continue
+            audio = decode(str(path), sr=SAMPLE_RATE)
+            store.append(asset_id, compute_mfcc(audio.y, audio.sr).T)
+            stored += 1
+        except Exception:
+            logger.exception("Feature backfill failed", extra={"asset_id": asset_id})
+    return stored
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the SINC feature store for the catalog")
+    parser.add_argument("command", choices=["stats", "backfill", "compact"])
+    args = parser.parse_args()
+
+    from .database import SessionLocal
+
+    store = feature_store()
+    db = SessionLocal()
+    try:
+        if args.command == "backfill":
+            print(f"stored features for {backfill(db)} assets")
+        elif args.command == "compact":
+            flagged = sync_deleted(db)
+            before, after = store.compact()
+            print(f"flagged {flagged} deleted assets; rows {before} -> {after}")
+        live = store.entries()
+        print(f"{FEATURE_DIR}: assets={len(live)} live_rows={int(live['n_frames'].sum())} total_rows={len(store.frames())}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
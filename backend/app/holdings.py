@@ -0,0 +1,279 @@
+"""
+Fraction holdings event log and point-in-time cap tables.
+
+`FractionHolding` rows hold the current state only. Every movement is also
+appended to `HoldingEvent`, and every SNAPSHOT_INTERVAL events a
+`HoldingSnapshot` of the full cap table is materialized, so a historical
+query loads the nearest snapshot and replays at most one interval of events.
+
+Assets fractionalized before the log existed have no mint event;
+`backfill_genesis` (run by `init_schema`) appends one per original holder,
+dated at fractionalization, so replays of their history start from it.
+"""
+
+import json
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .models import Asset, FractionHolding, HoldingEvent, HoldingSnapshot
+
+# Events replayed on top of a snapshot are bounded by this value
+SNAPSHOT_INTERVAL = 256
+
+VAULT_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+def _latest_snapshot(
+    db: Session,
+    asset_id: int,
+    as_of: Optional[datetime] = None
+) -> Optional[HoldingSnapshot]:
+    query = db.query(HoldingSnapshot).filter(HoldingSnapshot.asset_id == asset_id)
+    if as_of is not None:
+        query = query.filter(HoldingSnapshot.taken_at <= as_of)
+    return query.order_by(HoldingSnapshot.last_event_id.desc()).first()
+
+
+def _replay(
+    db: Session,
+    asset_id: int,
+    as_of: Optional[datetime] = None
+) -> Tuple[Dict[str, list], List[HoldingEvent]]:
+    """
+    Rebuild the cap table from the nearest snapshot plus the event delta.
+
+    Returns (holdings, replayed_events) where holdings maps
+    address -> [amount, label, last_event_id, last_event_iso].
+    """
+    snapshot = _latest_snapshot(db, asset_id, as_of)
+    holdings: Dict[str, list] = {}
+    after_id = 0
+    if snapshot:
+        holdings = json.loads(snapshot.holdings_json)
+        after_id = snapshot.last_event_id
+
+    query = db.query(HoldingEvent).filter(
+        HoldingEvent.asset_id == asset_id,
+        HoldingEvent.id > after_id
+    )
+    if as_of is not None:
+        query = query.filter(HoldingEvent.occurred_at <= as_of)
+    # Time order, mints first: backfilled genesis mints have later ids than
+    # the transfers they precede
+    events = query.order_by(
+        HoldingEvent.occurred_at.asc(),
+        HoldingEvent.from_address.isnot(None),
+        HoldingEvent.id.asc()
+    ).all()
+
+    for event in events:
+        stamp = event.occurred_at.isoformat()
+        if event.from_address:
+            source = holdings[event.from_address]
+            source[0] -= event.amount
+            source[2], source[3] = event.id, stamp
+            if source[0] <= 0:
+                del holdings[event.from_address]
+        target = holdings.setdefault(event.to_address, [0, event.to_label, event.id, stamp])
+        target[0] += event.amount
+        target[1] = event.to_label or target[1]
+        target[2], target[3] = event.id, stamp
+
+    return holdings, events
+
+
+def take_snapshot(db: Session, asset_id: int) -> Optional[HoldingSnapshot]:
+    """Materialize the current cap table for an asset."""
+    holdings, events = _replay(db, asset_id)
+    if not events:
+        return None
+
+    snapshot = HoldingSnapshot(
+        asset_id=asset_id,
+        last_event_id=max(event.id for event in events),
+        taken_at=events[-1].occurred_at,
+        holdings_json=json.dumps(holdings, separators=(",", ":"))
+    )
+    db.add(snapshot)
+    return snapshot
+
+
+def record_holding_event(
+    db: Session,
+    asset_id: int,
+    to_address: str,
+    amount: int,
+    from_address: Optional[str] = None,
+    to_label: Optional[str] = None
+) -> HoldingEvent:
+    """
+    Append a movement to the log and snapshot once the interval is reached.
+
+    The caller owns the transaction; nothing is committed here.
+    """
+    event = HoldingEvent(
+        asset_id=asset_id,
+        from_address=from_address,
+        to_address=to_address,
+        to_label=to_label,
+        amount=amount,
+        occurred_at=datetime.utcnow()
+    )
+    db.add(event)
+    db.flush()
+
+    # One round trip: events newer than the latest snapshot, if any
+    last_snapshot_id = db.query(
+        func.coalesce(func.max(HoldingSnapshot.last_event_id), 0)
+    ).filter(HoldingSnapshot.asset_id == asset_id).scalar_subquery()
+    pending = db.query(func.count(HoldingEvent.id)).filter(
+        HoldingEvent.asset_id == asset_id,
+        HoldingEvent.id > last_snapshot_id
+    ).scalar()
+    if pending >= SNAPSHOT_INTERVAL:
+        take_snapshot(db, asset_id)
+
+    return event
+
+
+def transfer_fractions(
+    db: Session,
+    asset: Asset,
+    from_address: str,
+    to_address: str,
+    amount: int,
+    to_label: Optional[str] = None
+) -> List[FractionHolding]:
+    """
+    Move fractions between holders, updating current state and the log.
+
+    Raises ValueError if the source does not hold enough fractions.
+    """
+    from_address = from_address.lower()
+    to_address = to_address.lower()
+
+    # Source and target in one round trip, locked so concurrent transfers
+    # from the same holder serialize instead of both spending the balance
+    by_address = {
+        holding.holder_address: holding
+        for holding in db.query(FractionHolding).filter(
+            FractionHolding.asset_id == asset.id,
+            FractionHolding.holder_address.in_((from_address, to_address))
+        ).with_for_update()
+    }
+    source = by_address.get(from_address)
+    if not source or source.fraction_amount < amount:
+        raise ValueError("Insufficient fractions")
+
+    target = by_address.get(to_address)
+    if not target:
+        target = FractionHolding(
+            asset_id=asset.id,
+            holder_address=to_address,
+            holder_label=to_label,
+            fraction_amount=0,
+            percentage=0.0
+        )
+        db.add(target)
+
+    source.fraction_amount -= amount
+    target.fraction_amount += amount
+    if to_label:
+        target.holder_label = to_label
+    for holding in (source, target):
+        holding.percentage = holding.fraction_amount / asset.fraction_count * 100
+
+    touched = [target]
+    if source.fraction_amount == 0:
+        db.delete(source)
+    else:
+        touched.append(source)
+
+    record_holding_event(
+        db,
+        asset.id,
+        to_address=to_address,
+        amount=amount,
+        from_address=from_address,
+        to_label=to_label
+    )
+    return touched
+
+
+def holdings_as_of(db: Session, asset: Asset, as_of: datetime, holder_ids: bool = True) -> List[dict]:
+    """
+    Cap table of an asset at a point in time.
+
+    Entries mirror `FractionHoldingResponse`. `id` identifies the holder
+    (the first event that credited them, which never changes) and
+    `acquired_at` is the time of the last event that touched them. Callers
+    that don't need ids pass `holder_ids=False` to skip that query.
+    """
+    holdings, _ = _replay(db, asset.id, as_of)
+    first_credit = {}
+    if holder_ids and holdings:
+        first_credit = dict(db.query(HoldingEvent.to_address, func.min(HoldingEvent.id)).filter(
+            HoldingEvent.asset_id == asset.id,
+            HoldingEvent.to_address.in_(list(holdings))
+        ).group_by(HoldingEvent.to_address).all())
+    entries = [
+        {
+            "id": first_credit.get(address),
+            "asset_id": asset.id,
+            "holder_address": address,
+            "holder_label": label,
+            "fraction_amount": amount,
+            "percentage": amount / asset.fraction_count * 100,
+            "acquired_at": datetime.fromisoformat(stamp)
+        }
+        for address, (amount, label, event_id, stamp) in holdings.items()
+    ]
+    entries.sort(key=lambda e: (-e["fraction_amount"], e["holder_address"]))
+    return entries
+
+
+def backfill_genesis(db: Session) -> int:
+    """
+    Append mint events for fractionalized assets that have none, so their
+    history replays. Each original holder's amount is the current holding
+    with logged transfers undone; the mints are dated at the earliest
+    holding or event. Idempotent; returns the number of assets backfilled.
+    """
+    minted = db.query(HoldingEvent.asset_id).filter(HoldingEvent.from_address.is_(None))
+    assets = db.query(Asset).filter(
+        Asset.is_fractionalized == 1,
+        Asset.id.notin_(minted)
+    ).all()
+
+    for asset in assets:
+        genesis: Dict[str, int] = defaultdict(int)
+        labels: Dict[str, Optional[str]] = {}
+        stamps = []
+        for holding in db.query(FractionHolding).filter(FractionHolding.asset_id == asset.id):
+            genesis[holding.holder_address] += holding.fraction_amount
+            labels[holding.holder_address] = holding.holder_label
+            stamps.append(holding.acquired_at)
+        for event in db.query(HoldingEvent).filter(HoldingEvent.asset_id == asset.id):
+            genesis[event.to_address] -= event.amount
+            genesis[event.from_address] += event.amount
+            labels.setdefault(event.to_address, event.to_label)
+            stamps.append(event.occurred_at)
+
+        minted_at = min(filter(None, stamps), default=asset.updated_at or datetime.utcnow())
+        db.add_all([
+            HoldingEvent(
+                asset_id=asset.id,
+                to_address=address,
+                to_label=labels.get(address),
+                amount=amount,
+                occurred_at=minted_at
+            )
+            for address, amount in genesis.items()
+            if amount > 0
+        ])
+    db.commit()
+    return len(assets)
@@ -0,0 +1,582 @@
+"""
+Bulk catalog import.
+
+A job takes a manifest (CSV or JSON list of objects with the AssetCreate
+fields plus `file`, a path relative to the audio root) and runs in two
+resumable phases, each committing per batch:
+
+    ingest  - store audio by content, insert Asset and initial CustodyEvent
+              rows for a whole batch with one flush per table
+    analyze - run SINC over imported assets in a process pool and apply
+              results (fingerprint, landmarks, queued chain registration)
+              per batch
+
+Every manifest row has an `import_rows` entry recording its status and any
+error, so a restarted job picks up exactly where it stopped. A job runs in
+at most one process at a time (a flock per job under IMPORT_DIR), and at
+server shutdown running jobs stop at the next batch boundary and go back
+to PENDING for a later resume.
+
+    python -m app.imports run manifest.csv --audio-dir /mnt/label [--workers 8]
+    python -m app.imports run manifest.json --archive label.zip
+    python -m app.imports resume JOB_ID [--retry-failed]
+    python -m app.imports status JOB_ID
+"""
+
+import argparse
+import csv
+import io
+import json
+import logging
+import multiprocessing
+import os
+import secrets
+import shutil
+import tarfile
+import threading
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from .coordinator import ProcessLock, enqueue_registration
+from .events import analysis_events, event_row, hub as event_hub, record_events
+from .features import store_features
+from .matching import store_landmarks
+from .models import Asset, AssetEventKind, CustodyEvent, ImportJob, ImportRow, ImportRowStatus, ImportStatus
+from .schemas import AssetCreate
+from .storage import AUDIO_EXTENSIONS, local_audio_path, stage_file
+
+logger = logging.getLogger(__name__)
+
+IMPORT_DIR = Path(os.getenv("IMPORT_DIR", Path(__file__).parent.parent / "imports"))
+# Server-side directories the API may import from (unset: archives only)
+IMPORT_SOURCE_DIR = os.getenv("IMPORT_SOURCE_DIR")
+IMPORT_WORKERS = int(os.getenv("IMPORT_WORKERS") or os.cpu_count() or 1)
+
+# Rows inserted per ingest transaction, and analysis results applied per commit
+IMPORT_BATCH_SIZE = 500
+ANALYSIS_COMMIT_SIZE = 50
+
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz")
+
+# Jobs running in this process, and the shutdown signal they check per batch
+_active_jobs = set()
+_active_lock = threading.Lock()
+_stopping = threading.Event()
+
+
+class ImportInterrupted(Exception):
+    """Raised at a batch boundary once `request_stop` has been called."""
+
+
+# ============================================
+# Manifests and archives
+# ============================================
+
+def parse_manifest(data: bytes, name: str) -> List[dict]:
+    """Rows of a CSV or JSON manifest as dicts (JSON: a list of objects)."""
+    text = data.decode("utf-8-sig")
+    if name.lower().endswith(".json"):
+        rows = json.loads(text)
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise ValueError("JSON manifest must be a list of objects")
+        return rows
+    if name.lower().endswith(".csv"):
+        return list(csv.DictReader(io.StringIO(text)))
+    raise ValueError("Manifest must be .csv or .json")
+
+
+def validate_row(raw: dict, audio_root: Path) -> Tuple[dict, Optional[str]]:
+    """(normalized row, error or None) for one manifest row."""
+    # CSV leaves empty cells as "", which means "not given"
+    fields = {key.strip(): value for key, value in raw.items() if key and value not in ("", None)}
+    fields.setdefault("edition_total", 1)
+    file_name = str(fields.pop("file", "")).strip()
+    if not file_name:
+        return raw, "Missing file"
+
+    path = (audio_root / file_name).resolve()
+    if not path.is_relative_to(audio_root.resolve()):
+        return raw, f"File outside the audio root: {file_name}"
+    if path.suffix.lower() not in AUDIO_EXTENSIONS:
+        return raw, f"Invalid audio format: {file_name}"
+    if not path.is_file():
+        return raw, f"File not found: {file_name}"
+
+    try:
+        asset = AssetCreate(**fields)
+    except ValidationError as e:
+        problems = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+        return raw, problems
+
+    data = asset.model_dump(mode="json")
+    data["file"] = file_name
+    return data, None
+
+
+def extract_archive(archive: Path, dest: Path):
+    """Unpack a zip or tar archive, refusing members that escape `dest`."""
+    dest.mkdir(parents=True, exist_ok=True)
+    if archive.name.lower().endswith(".zip"):
+        with zipfile.ZipFile(archive) as zf:
+            root = dest.resolve()
+            for member in zf.namelist():
+                if not (dest / member).resolve().is_relative_to(root):
+                    raise ValueError(f"Unsafe path in archive: {member}")
+            zf.extractall(dest)
+    elif archive.name.lower().endswith(ARCHIVE_SUFFIXES):
+        with tarfile.open(archive) as tf:
+            tf.extractall(dest, filter="data")
+    else:
+        raise ValueError(f"Archive must be one of {', '.join(ARCHIVE_SUFFIXES)}")
+
+
+def new_extract_dir() -> Path:
+    return IMPORT_DIR / secrets.token_hex(8)
+
+
+def source_dir(audio_dir: str) -> Path:
+    """Resolve an API-supplied audio directory inside IMPORT_SOURCE_DIR."""
+    if not IMPORT_SOURCE_DIR:
+        raise ValueError("Server-side audio directories are disabled; upload an archive")
+    root = Path(IMPORT_SOURCE_DIR).resolve()
+    path = (root / audio_dir).resolve()
+    if not path.is_relative_to(root) or not path.is_dir():
+        raise ValueError(f"Unknown audio directory: {audio_dir}")
+    return path
+
+
+# ============================================
+# Jobs
+# ============================================
+
+def create_job(db: Session, manifest: bytes, manifest_name: str, audio_root: Path) -> ImportJob:
+    """Validate a manifest and record the job with one row per entry."""
+    raw_rows = parse_manifest(manifest, manifest_name)
+    job = ImportJob(manifest_name=manifest_name, audio_root=str(audio_root), total_rows=len(raw_rows))
+    db.add(job)
+    db.flush()
+
+    failed = 0
+    for start in range(0, len(raw_rows), IMPORT_BATCH_SIZE):
+        values = []
+        for number, raw in enumerate(raw_rows[start:start + IMPORT_BATCH_SIZE], start=start + 1):
+            data, error = validate_row(raw, audio_root)
+            failed += error is not None
+            values.append({
+                "job_id": job.id,
+                "row_number": number,
+                "status": (ImportRowStatus.FAILED if error else ImportRowStatus.PENDING).value,
+                "data_json": json.dumps(data, default=str),
+                "error": error,
+            })
+        db.execute(insert(ImportRow), values)
+
+    job.failed_rows = failed
+    db.commit()
+    return job
+
+
+def _job_lock(job_id: int) -> ProcessLock:
+    return ProcessLock(IMPORT_DIR / ".locks" / f"{job_id}.lock")
+
+
+def is_active(job_id: int) -> bool:
+    """Whether any process on this host is running the job."""
+    lock = _job_lock(job_id)
+    if not lock.try_acquire():
+        return True
+    lock.release()
+    return False
+
+
+def retry_failed(db: Session, job: ImportJob) -> int:
+    """Queue rows whose asset exists but whose analysis failed for another pass."""
+    count = db.query(ImportRow).filter(
+        ImportRow.job_id == job.id,
+        ImportRow.status == ImportRowStatus.FAILED.value,
+        ImportRow.asset_id.isnot(None),
+    ).update({"status": ImportRowStatus.IMPORTED.value, "error": None}, synchronize_session=False)
+    job.failed_rows -= count
+    db.commit()
+    return count
+
+
+def run_job(
+    job_id: int,
+    register_on_chain: bool = True,
+    workers: int = IMPORT_WORKERS,
+    session_factory: Optional[Callable[[], Session]] = None,
+    on_progress: Optional[Callable[[ImportJob], None]] = None
+):
+    """
+    Run (or resume) a job to completion. Safe to call again after a crash:
+    only PENDING rows are ingested and only IMPORTED rows analyzed.
+
+    Cleared assets are queued for on-chain registration, which the
+    coordinator submits (see app/coordinator.py).
+    """
+    if session_factory is None:
+        from .database import SessionLocal as session_factory
+
+    lock = _job_lock(job_id)
+    if not lock.try_acquire():
+        raise RuntimeError(f"Import job {job_id} is already running")
+    with _active_lock:
+        _active_jobs.add(job_id)
+
+    db = session_factory()
+    try:
+        job = db.get(ImportJob, job_id)
+        job.status = ImportStatus.RUNNING.value
+        job.error = None
+        db.commit()
+
+        _ingest(db, job, on_progress)
+        _cleanup_extracted(job)
+        _analyze(db, job, register_on_chain, workers, on_progress)
+
+        job.status = ImportStatus.COMPLETED.value
+        job.finished_at = datetime.utcnow()
+        db.commit()
+    except ImportInterrupted:
+        logger.info("Import job interrupted by shutdown", extra={"job_id": job_id})
+        db.rollback()
+        job = db.get(ImportJob, job_id)
+        job.status = ImportStatus.PENDING.value
+        job.error = "Interrupted by server shutdown; resume to continue"
+        db.commit()
+    except Exception as e:
+        logger.exception("Import job failed", extra={"job_id": job_id})
+        db.rollback()
+        job = db.get(ImportJob, job_id)
+        job.status = ImportStatus.FAILED.value
+        job.error = str(e)
+        db.commit()
+    finally:
+        db.close()
+        lock.release()
+        with _active_lock:
+            _active_jobs.discard(job_id)
+
+
+def start_job(job_id: int, register_on_chain: bool = True) -> threading.Thread:
+    """
+    Run a job on a background thread of this process. Unlike a request's
+    background task, it doesn't hold the connection open, so server
+    shutdown isn't blocked by it and can call `request_stop` instead.
+    """
+    thread = threading.Thread(
+        target=run_job,
+        args=(job_id, register_on_chain),
+        name=f"import-{job_id}",
+        daemon=True
+    )
+    thread.start()
+    return thread
+
+
+def request_stop():
+    """Ask running jobs to stop at their next batch boundary."""
+    _stopping.set()
+
+
+def wait_idle(timeout: float) -> bool:
+    """Wait for this process's jobs to stop; False if some are still running."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with _active_lock:
+            if not _active_jobs:
+                return True
+        time.sleep(0.1)
+    with _active_lock:
+        return not _active_jobs
+
+
+def _check_stop():
+    if _stopping.is_set():
+        raise ImportInterrupted()
+
+
+def _cleanup_extracted(job: ImportJob):
+    # Extracted archives are only needed until their audio is in storage
+    root = Path(job.audio_root).resolve()
+    if root.is_relative_to(IMPORT_DIR.resolve()) and root != IMPORT_DIR.resolve():
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def _ingest(db: Session, job: ImportJob, on_progress):
+    audio_root = Path(job.audio_root)
+    while True:
+        _check_stop()
+        rows = db.query(ImportRow).filter(
+            ImportRow.job_id == job.id,
+            ImportRow.status == ImportRowStatus.PENDING.value,
+        ).order_by(ImportRow.row_number).limit(IMPORT_BATCH_SIZE).all()
+        if not rows:
+            return
+
+        # Upload the batch's audio before writing to the database, so no
+        # write lock is held during the uploads
+        staged = []
+        for row in rows:
+            data = json.loads(row.data_json)
+            path = audio_root / data.pop("file")
+            try:
+                writer = stage_file(path, path.suffix.lower())
+            except OSError as e:
+                row.status = ImportRowStatus.FAILED.value
+                row.error = f"Could not read audio: {e}"
+                job.failed_rows += 1
+                continue
+            staged.append((row, data, writer, path.suffix.lower()))
+
+        created = []
+        try:
+            for row, data, writer, extension in staged:
+                created.append((row, Asset(**data, file_path=writer.commit(db, extension))))
+        finally:
+            for _, _, writer, _ in staged:
+                writer.abort()
+
+        # One multi-row INSERT per table for the whole batch
+        db.add_all([asset for _, asset in created])
+        db.flush()
+        db.add_all([
+            CustodyEvent(asset_id=asset.id, from_holder_label="Origin", to_holder_label="Vault")
+            for _, asset in created
+        ])
+        for row, asset in created:
+            row.asset_id = asset.id
+            row.status = ImportRowStatus.IMPORTED.value
+        record_events(db, [
+            event_row(asset.id, AssetEventKind.UPLOADED, title=asset.title, artist_display=asset.artist_display)
+            for _, asset in created
+        ])
+        job.imported_rows += len(created)
+        db.commit()
+        event_hub.notify()
+        if on_progress:
+            on_progress(job)
+
+
+def _analyze_file(path: str) -> dict:
+    # Runs in worker processes
+    from sinc.fingerprint import analyze_audio
+    return analyze_audio(path)
+
+
+def _analyze(db: Session, job: ImportJob, register_on_chain: bool, workers: int, on_progress):
+    todo = db.query(ImportRow.id, Asset.id, Asset.file_path).join(
+        Asset, Asset.id == ImportRow.asset_id
+    ).filter(
+        ImportRow.job_id == job.id,
+        ImportRow.status == ImportRowStatus.IMPORTED.value,
+    ).order_by(ImportRow.row_number).all()
+    if not todo:
+        return
+
+    def jobs():
+        for row_id, asset_id, file_path in todo:
+            path = local_audio_path(db, file_path)
+            yield row_id, asset_id, str(path) if path else None
+
+    if workers <= 1:
+        done = []
+        for row_id, asset_id, path in jobs():
+            if _stopping.is_set():
+                break
+            done.append((row_id, asset_id, _run_inline(path)))
+            if len(done) >= ANALYSIS_COMMIT_SIZE:
+                _apply_results(db, job, done, register_on_chain, on_progress)
+                done = []
+        _apply_results(db, job, done, register_on_chain, on_progress)
+        _check_stop()
+        return
+
+    # Keep a bounded window in flight; results carry feature matrices
+    pending = jobs()
+    in_flight = {}
+    done = []
+    # spawn, not fork: the API server calls this from a threaded process
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        while True:
+            # At shutdown, submit nothing new and let the window drain
+            while len(in_flight) < workers * 2 and not _stopping.is_set():
+                item = next(pending, None)
+                if item is None:
+                    break
+                row_id, asset_id, path = item
+                if path is None:
+                    done.append((row_id, asset_id, FileNotFoundError("Audio missing from storage")))
+                    continue
+                in_flight[executor.submit(_analyze_file, path)] = (row_id, asset_id)
+            if not in_flight:
+                break
+
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                row_id, asset_id = in_flight.pop(future)
+                error = future.exception()
+                done.append((row_id, asset_id, error if error else future.result()))
+            if len(done) >= ANALYSIS_COMMIT_SIZE:
+                _apply_results(db, job, done, register_on_chain, on_progress)
+                done = []
+
+    _apply_results(db, job, done, register_on_chain, on_progress)
+    _check_stop()
+
+
+def _run_inline(path: Optional[str]):
+    if path is None:
+        return FileNotFoundError("Audio missing from storage")
+    try:
+        return _analyze_file(path)
+    except Exception as e:
+        return e
+
+
+def _apply_results(db: Session, job: ImportJob, done: list, register_on_chain: bool, on_progress):
+    if not done:
+        return
+
+    features = []
+    events = []
+    for row_id, asset_id, result in done:
+        row = db.get(ImportRow, row_id)
+        if isinstance(result, Exception):
+            row.status = ImportRowStatus.FAILED.value
+            row.error = f"SINC analysis failed: {result}"
+            job.failed_rows += 1
+            continue
+
+        asset = db.get(Asset, asset_id)
+        asset.fingerprint_hash = result["fingerprint_hash"]
+        asset.duration_seconds = result["duration_seconds"]
+        asset.risk_score = result["risk_score"]
+        asset.clearance_status = result["clearance_status"]
+        if result.get("landmarks"):
+            store_landmarks(db, asset_id, result["landmarks"])
+        events.extend(analysis_events(asset))
+
+        if register_on_chain and result["clearance_status"] == "CLEARED":
+            enqueue_registration(db, asset_id, result["fingerprint_hash"])
+
+        if result.get("features") is not None:
+            features.append((asset_id, result["features"]))
+        row.status = ImportRowStatus.ANALYZED.value
+        job.analyzed_rows += 1
+
+    record_events(db, events)
+    db.commit()
+    event_hub.notify()
+    for asset_id, matrix in features:
+        try:
+            store_features(asset_id, matrix)
+        except Exception:
+            logger.exception("Storing SINC features failed", extra={"asset_id": asset_id})
+    if on_progress:
+        on_progress(job)
+
+
+# ============================================
+# CLI
+# ============================================
+
+def _print_progress(job: ImportJob):
+    print(
+        f"job {job.id}: {job.imported_rows}/{job.total_rows} imported, "
+        f"{job.analyzed_rows} analyzed, {job.failed_rows} failed",
+        flush=True
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk catalog import")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="create and run an import job")
+    run.add_argument("manifest", type=Path)
+    source = run.add_mutually_exclusive_group(required=True)
+    source.add_argument("--audio-dir", type=Path)
+    source.add_argument("--archive", type=Path)
+    run.add_argument("--workers", type=int, default=IMPORT_WORKERS)
+    run.add_argument("--no-chain", action="store_true", help="skip on-chain registration")
+
+    resume = sub.add_parser("resume", help="continue an interrupted or failed job")
+    resume.add_argument("job_id", type=int)
+    resume.add_argument("--retry-failed", action="store_true", help="re-analyze rows whose SINC analysis failed")
+    resume.add_argument("--workers", type=int, default=IMPORT_WORKERS)
+    resume.add_argument("--no-chain", action="store_true")
+
+    status = sub.add_parser("status", help="show progress and failed rows")
+    status.add_argument("job_id", type=int)
+    args = parser.parse_args()
+
+    from .database import SessionLocal, init_schema
+
+    init_schema()
+
+    db = SessionLocal()
+    try:
+        if args.command == "status":
+            job = db.get(ImportJob, args.job_id)
+            if job is None:
+                raise SystemExit(f"No import job {args.job_id}")
+            print(f"status={job.status}")
+            _print_progress(job)
+            failures = db.query(ImportRow).filter(
+                ImportRow.job_id == job.id, ImportRow.status == ImportRowStatus.FAILED.value
+            ).order_by(ImportRow.row_number)
+            for row in failures:
+                print(f"  row {row.row_number}: {row.error}")
+            return
+
+        if args.command == "run":
+            audio_root = args.audio_dir
+            if args.archive:
+                audio_root = new_extract_dir()
+                extract_archive(args.archive, audio_root)
+            job = create_job(db, args.manifest.read_bytes(), args.manifest.name, audio_root.resolve())
+            job_id = job.id
+            print(f"created job {job_id} with {job.total_rows} rows ({job.failed_rows} invalid)")
+        else:
+            job_id = args.job_id
+            job = db.get(ImportJob, job_id)
+            if job is None:
+                raise SystemExit(f"No import job {job_id}")
+            if args.retry_failed:
+                print(f"retrying {retry_failed(db, job)} rows")
+    finally:
+        db.close()
+
+    run_job(job_id, register_on_chain=not args.no_chain, workers=args.workers, on_progress=_print_progress)
+    if not args.no_chain:
+        from .blockchain import registry
+        from .coordinator import Coordinator
+
+        # Submit queued registrations here unless a server's coordinator is running
+        submitted = Coordinator(chain=registry).submit_all()
+        if submitted is None:
+            print("chain registrations queued for the running server's coordinator")
+        else:
+            print(f"submitted {submitted} chain registrations")
+
+    db = SessionLocal()
+    try:
+        job = db.get(ImportJob, job_id)
+        print(f"status={job.status}" + (f" error={job.error}" if job.error else ""))
+        _print_progress(job)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
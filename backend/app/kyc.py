@@ -0,0 +1,131 @@
+"""
+KYC screening helpers: restriction checks, verified-address cache and
+bulk lookups.
+"""
+
+import json
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from .cache import cache_backend
+from .models import KYCRecord
+
+# Restricted countries for compliance
+RESTRICTED_COUNTRIES = frozenset({"KP", "IR", "CU", "SY", "RU"})  # North Korea, Iran, Cuba, Syria, Russia
+
+# Upper bound on addresses per bulk screening request
+MAX_BATCH_SIZE = 10000
+
+
+def is_restricted(country_code: Optional[str]) -> bool:
+    """Check a country code against the restricted set."""
+    return bool(country_code) and country_code.upper() in RESTRICTED_COUNTRIES
+
+
+def _dump_entry(entry: dict) -> str:
+    verified_at = entry["verified_at"]
+    return json.dumps({**entry, "verified_at": verified_at.isoformat() if verified_at else None})
+
+
+def _load_entry(value: str) -> dict:
+    entry = json.loads(value)
+    if entry["verified_at"]:
+        entry["verified_at"] = datetime.fromisoformat(entry["verified_at"])
+    return entry
+
+
+class VerifiedAddressCache:
+    """
+    Cache of VERIFIED KYC records keyed by lowercase address.
+
+    Only verified records are cached since pending ones change as soon as
+    they are reviewed; `verify_kyc` invalidates the entry it touches. The
+    backend comes from CACHE_BACKEND (see app/cache.py), so with several
+    server workers that invalidation reaches all of them.
+    """
+
+    def __init__(self, backend=None):
+        self._backend = backend or cache_backend("kyc.verified", dumps=_dump_entry, loads=_load_entry)
+
+    def get(self, wallet_address: str) -> Optional[dict]:
+        return self._backend.get(wallet_address)
+
+    def put(self, entry: dict):
+        if entry["status"] != "VERIFIED":
+            return
+        self._backend.set(entry["wallet_address"], entry)
+
+    def invalidate(self, wallet_address: str):
+        self._backend.delete(wallet_address.lower())
+
+    def clear(self):
+        self._backend.clear()
+
+
+verified_cache = VerifiedAddressCache()
+
+
+def _screen_entry(
+    wallet_address: str,
+    status: str,
+    verification_level: int,
+    country_code: Optional[str],
+    verified_at: Optional[datetime]
+) -> dict:
+    restricted = is_restricted(country_code)
+    return {
+        "wallet_address": wallet_address,
+        "status": status,
+        "verification_level": verification_level,
+        "country_code": country_code,
+        "verified_at": verified_at,
+        "restricted": restricted,
+        "eligible": status == "VERIFIED" and not restricted
+    }
+
+
+def lookup_verified(db: Session, wallet_address: str) -> Optional[dict]:
+    """Cached screening entry for a single address, or None if not on file."""
+    entries = screen_addresses(db, [wallet_address])
+    entry = entries[0]
+    return entry if entry["status"] != "NOT_FOUND" else None
+
+
+def screen_addresses(db: Session, wallet_addresses: Iterable[str]) -> List[dict]:
+    """
+    Screen many addresses with at most one KYCRecord query.
+
+    Verified addresses are served from the cache; the rest are fetched in a
+    single IN (...) query. Results keep the input order, and unknown
+    addresses come back with status NOT_FOUND.
+    """
+    addresses = [address.lower() for address in wallet_addresses]
+
+    found: Dict[str, dict] = {}
+    misses = []
+    for address in dict.fromkeys(addresses):
+        entry = verified_cache.get(address)
+        if entry is not None:
+            found[address] = entry
+        else:
+            misses.append(address)
+
+    if misses:
+        rows = db.query(
+            KYCRecord.wallet_address,
+            KYCRecord.status,
+            KYCRecord.verification_level,
+            KYCRecord.country_code,
+            KYCRecord.verified_at
+        ).filter(KYCRecord.wallet_address.in_(misses)).all()
+        for row in rows:
+            entry = _screen_entry(*row)
+            verified_cache.put(entry)
+            found[entry["wallet_address"]] = entry
+
+    return [
+        found.get(address) or _screen_entry(address, "NOT_FOUND", 0, None, None)
+        for address in addresses
+    ]
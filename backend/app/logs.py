@@ -0,0 +1,45 @@
+"""
+Structured JSON logging for the backend.
+
+Use module loggers and pass context through `extra`:
+
+    logger.warning("Chain registration failed", extra={"asset_id": asset.id})
+"""
+
+import json
+import logging
+import os
+from datetime import datetime, timezone
+
+# Attributes every LogRecord has; anything else came in through `extra`
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(level: str = None):
+    """Install the JSON handler on the `app` and `sinc` loggers (idempotent)."""
+    level = level or os.getenv("LOG_LEVEL", "INFO")
+    handler = logging.StreamHandler()
+    handler.setFormatter(JsonFormatter())
+
+    for name in ("app", "sinc"):
+        logger = logging.getLogger(name)
+        if not any(isinstance(h.formatter, JsonFormatter) for h in logger.handlers):
+            logger.addHandler(handler)
+        logger.setLevel(level)
+        logger.propagate = False
@@ -2,40 +2,127 @@
 ISSUANCE Backend API
 """
 
+import asyncio
 import os
 import sys
+import time
+import logging
 import secrets
+import shutil
+import tempfile
+from contextlib import asynccontextmanager
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import List, Optional
+from urllib.parse import quote
 
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Form, Header
+from fastapi import FastAPI, Depends, HTTPException, Request, UploadFile, File, Form, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 # Add sinc to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from .database import engine, get_db, Base
-from .models import Asset, CustodyEvent, SettlementEvent, InvitationToken, FractionHolding, KYCRecord
+from .database import SessionLocal, engine, get_db, init_schema, unit_of_work
+from .models import (
+    Asset, AssetEventKind, CustodyEvent, SettlementEvent, InvitationToken, FractionHolding, KYCRecord,
+    ImportJob, ImportRow, ImportRowStatus
+)
 from .schemas import (
-    AssetCreate, AssetResponse, CustodyEventResponse,
+    AssetCreate, AssetResponse, AssetSearchResponse, ClearanceStatus, SettlementRule,
+    CustodyEventResponse, ExcerptMatchResponse,
     SettlementEventCreate, SettlementEventResponse,
     InvitationValidate, InvitationResponse, SINCResult,
-    FractionHoldingResponse, FractionalizeRequest, KYCSubmit, KYCResponse
+    FractionHoldingResponse, FractionalizeRequest, FractionTransferRequest,
+    PayoutRunRequest, PayoutRunResponse, KYCSubmit, KYCResponse,
+    KYCBatchRequest, KYCBatchResponse, ImportJobResponse, ImportRowResponse
 )
 from .blockchain import registry as blockchain_registry
+from .coordinator import Coordinator, enqueue_registration
+from .holdings import VAULT_ADDRESS, record_holding_event, transfer_fractions, holdings_as_of
+from .payouts import run_payouts, payout_file_path
+from .search import search_assets
+from .matching import store_landmarks, match_excerpt
+from .features import store_features
+from .storage import AUDIO_EXTENSIONS, AUDIO_MEDIA_TYPES, CHUNK_SIZE, BlobWriter, resolve
+from . import analysis, imports
+from .admission import ADMISSION_CONTROL, AdmissionMiddleware, Overloaded
+from .serialization import MSGPACK_TYPES, Columns, encode
+from .events import (
+    HEARTBEAT_SECONDS, REPLAY_LIMIT, analysis_events, event_row, load_events, record_event, record_events,
+    hub as event_hub
+)
+from .kyc import is_restricted, verified_cache, lookup_verified, screen_addresses
+from .logs import configure_logging
+from .metrics import (
+    METRICS_MULTIPROCESS, MetricsMiddleware, instrument_engine, render_metrics, start_snapshots,
+    sinc_stage_duration, upload_bytes, upload_throughput
+)
+from sinc.instrumentation import set_stage_observer
+
+configure_logging()
+logger = logging.getLogger(__name__)
+
+instrument_engine(engine)
+set_stage_observer(lambda stage, seconds: sinc_stage_duration.observe(seconds, stage))
+
+# `python -m app.serve` creates the schema once and sets this to 0 for its workers
+SCHEMA_AUTO_CREATE = os.getenv("SCHEMA_AUTO_CREATE", "1") == "1"
+# COORDINATOR=0 keeps this process out of the election (other hosts)
+COORDINATOR_ENABLED = os.getenv("COORDINATOR", "1") == "1"
+# Seconds shutdown waits for running import jobs to reach a batch boundary
+SHUTDOWN_DRAIN_SECONDS = float(os.getenv("SHUTDOWN_DRAIN_SECONDS") or 30)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if SCHEMA_AUTO_CREATE:
+        init_schema()
+    coordinator = None
+    if COORDINATOR_ENABLED:
+        coordinator = Coordinator(chain=blockchain_registry)
+        coordinator.start()
+    event_poller = asyncio.create_task(event_hub.run())
+    stop_snapshots = start_snapshots() if METRICS_MULTIPROCESS else None
+    try:
+        yield
+    finally:
+        # The server has stopped taking requests; let background work settle
+        event_hub.close()
+        await event_poller
+        imports.request_stop()
+        if not await run_in_threadpool(imports.wait_idle, SHUTDOWN_DRAIN_SECONDS):
+            logger.warning("Import jobs still running at shutdown")
+        await run_in_threadpool(analysis.drain)
+        if coordinator is not None:
+            await run_in_threadpool(coordinator.stop)
+        if stop_snapshots is not None:
+            await run_in_threadpool(stop_snapshots)
 
-# Create tables
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="ISSUANCE",
     description="Luxury Sound Registry Platform",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# MVP Invitation tokens (in production, these would be in DB)
+MVP_TOKENS = {"VAULT-2024", "ISSUANCE-MVP", "SOUND-REGISTRY"}
+MVP_PASSPHRASE = "SOUND IS ISSUED"
+
+
+def is_valid_invitation(token: str) -> bool:
+    return token in MVP_TOKENS or token == MVP_PASSPHRASE
+
+
+# Rate limits and concurrency gates for upload, analysis and streaming
+# routes; innermost, so rejections still get CORS headers and metrics
+if ADMISSION_CONTROL:
+    app.add_middleware(AdmissionMiddleware, valid_token=is_valid_invitation)
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -44,14 +131,17 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware, expose_query_count=os.getenv("EXPOSE_QUERY_COUNT") == "1")
 
-# Upload directory
-UPLOAD_DIR = Path(__file__).parent.parent / "uploads"
-UPLOAD_DIR.mkdir(exist_ok=True)
 
-# MVP Invitation tokens (in production, these would be in DB)
-MVP_TOKENS = {"VAULT-2024", "ISSUANCE-MVP", "SOUND-REGISTRY"}
-MVP_PASSPHRASE = "SOUND IS ISSUED"
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    """A concurrency gate inside the request (SINC analysis) is saturated."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server busy, retry later"},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
 
 
 def validate_invitation(authorization: Optional[str] = Header(None)):
@@ -60,7 +150,7 @@ def validate_invitation(authorization: Optional[str] = Header(None)):
         raise HTTPException(status_code=401, detail="Invitation required")
 
     token = authorization.replace("Bearer ", "").strip()
-    if token not in MVP_TOKENS and token != MVP_PASSPHRASE:
+    if not is_valid_invitation(token):
         raise HTTPException(status_code=403, detail="Invalid invitation")
 
     return token
@@ -71,12 +161,18 @@ async def root():
     return {"name": "ISSUANCE", "status": "operational"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 @app.post("/api/auth/validate", response_model=InvitationResponse)
 async def validate_token(data: InvitationValidate, db: Session = Depends(get_db)):
     """Validate invitation token or passphrase."""
     token = data.token.strip()
 
-    if token in MVP_TOKENS or token == MVP_PASSPHRASE:
+    if is_valid_invitation(token):
         return {"valid": True, "message": "Access granted"}
 
     # Check database tokens
@@ -91,14 +187,47 @@ async def validate_token(data: InvitationValidate, db: Session = Depends(get_db)
     return {"valid": False, "message": "Invalid invitation"}
 
 
-@app.get("/api/assets", response_model=List[AssetResponse])
+ASSET_COLUMNS = Columns(Asset, AssetResponse)
+HOLDING_COLUMNS = Columns(FractionHolding, FractionHoldingResponse)
+MSGPACK_RESPONSE = {200: {"content": {MSGPACK_TYPES[0]: {}}}}
+
+
+@app.get("/api/assets", response_model=List[AssetResponse], responses=MSGPACK_RESPONSE)
 async def list_assets(
+    request: Request,
+    db: Session = Depends(get_db),
+    _: str = Depends(validate_invitation)
+):
+    """List all issued assets (JSON, or MessagePack via Accept)."""
+    rows = db.query(*ASSET_COLUMNS.columns).order_by(Asset.created_at.desc()).all()
+    return encode(request, ASSET_COLUMNS.dicts(rows))
+
+
+@app.get("/api/assets/search", response_model=AssetSearchResponse)
+async def search_asset_registry(
+    q: Optional[str] = Query(None, max_length=200),
+    year: Optional[int] = None,
+    clearance_status: Optional[ClearanceStatus] = None,
+    settlement_rule: Optional[SettlementRule] = None,
+    fractionalized: Optional[bool] = None,
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
     db: Session = Depends(get_db),
     _: str = Depends(validate_invitation)
 ):
-    """List all issued assets."""
-    assets = db.query(Asset).order_by(Asset.created_at.desc()).all()
-    return assets
+    """Full-text search over title, artist and provenance with facet counts."""
+    return search_assets(
+        db,
+        q=q,
+        filters={
+            "year": year,
+            "clearance_status": clearance_status.value if clearance_status else None,
+            "settlement_rule": settlement_rule.value if settlement_rule else None,
+            "fractionalized": fractionalized,
+        },
+        limit=limit,
+        offset=offset
+    )
 
 
 @app.get("/api/assets/{asset_id}", response_model=AssetResponse)
@@ -132,67 +261,108 @@ async def issue_asset(
 
     # Save audio file
     file_ext = Path(audio_file.filename).suffix.lower()
-    if file_ext not in [".wav", ".mp3", ".flac", ".aiff", ".m4a"]:
+    if file_ext not in AUDIO_EXTENSIONS:
         raise HTTPException(status_code=400, detail="Invalid audio format")
 
-    file_id = secrets.token_hex(16)
-    file_path = UPLOAD_DIR / f"{file_id}{file_ext}"
-
-    content = await audio_file.read()
-    with open(file_path, "wb") as f:
-        f.write(content)
-
-    # Create asset
-    asset = Asset(
-        title=title,
-        artist_display=artist_display,
-        year=year,
-        edition_total=edition_total,
-        provenance_text=provenance_text,
-        settlement_rule=settlement_rule,
-        file_path=str(file_path)
-    )
+    # Stream into content-addressed storage; identical masters share bytes
+    upload_start = time.perf_counter()
+    writer = BlobWriter(suffix=file_ext)
+    try:
+        while chunk := await audio_file.read(CHUNK_SIZE):
+            writer.write(chunk)
+        writer.close()
+        upload_seconds = time.perf_counter() - upload_start
+        upload_bytes.inc(amount=writer.size)
+        if upload_seconds > 0:
+            upload_throughput.observe(writer.size / upload_seconds)
+
+        # Run SINC analysis on the staged upload in the analysis pool, before
+        # the transaction opens so no DB lock is held while it runs
+        sinc_result = None
+        try:
+            sinc_result = await analysis.analyze(str(writer.path))
+        except Overloaded:
+            raise
+        except Exception:
+            logger.exception("SINC analysis failed", extra={"upload": audio_file.filename})
+            # Continue without fingerprint
+
+        # Store the bytes before the transaction too; it only takes a reference
+        await run_in_threadpool(writer.upload, file_ext)
+
+        # Asset, custody event and SINC results in one transaction
+        with unit_of_work(db):
+            asset = Asset(
+                title=title,
+                artist_display=artist_display,
+                year=year,
+                edition_total=edition_total,
+                provenance_text=provenance_text,
+                settlement_rule=settlement_rule,
+                file_path=writer.commit(db, file_ext)
+            )
+            if sinc_result:
+                asset.fingerprint_hash = sinc_result["fingerprint_hash"]
+                asset.duration_seconds = sinc_result["duration_seconds"]
+                asset.risk_score = sinc_result["risk_score"]
+                asset.clearance_status = sinc_result["clearance_status"]
+            db.add(asset)
+            db.flush()
+
+            # Create initial custody event
+            db.add(CustodyEvent(
+                asset_id=asset.id,
+                from_holder_label="Origin",
+                to_holder_label="Vault"
+            ))
+            record_events(db, [
+                event_row(asset.id, AssetEventKind.UPLOADED, title=asset.title, artist_display=asset.artist_display),
+                *(analysis_events(asset) if sinc_result else ())
+            ])
+            if sinc_result and sinc_result.get("landmarks"):
+                store_landmarks(db, asset.id, sinc_result["landmarks"], new=True)
+
+            # If cleared, queue on-chain registration; the coordinator submits
+            # it and fills in chain_tx_hash
+            if sinc_result and sinc_result["clearance_status"] == "CLEARED":
+                enqueue_registration(db, asset.id, sinc_result["fingerprint_hash"])
+    except Exception:
+        writer.abort()
+        raise
+    event_hub.notify()
+
+    if sinc_result and sinc_result.get("features") is not None:
+        try:
+            store_features(asset.id, sinc_result["features"])
+        except Exception:
+            logger.exception("Storing SINC features failed", extra={"asset_id": asset.id})
 
-    db.add(asset)
-    db.commit()
-    db.refresh(asset)
+    return asset
 
-    # Create initial custody event
-    custody_event = CustodyEvent(
-        asset_id=asset.id,
-        from_holder_label="Origin",
-        to_holder_label="Vault"
-    )
-    db.add(custody_event)
-    db.commit()
 
-    # Run SINC analysis in background (for MVP, sync)
-    try:
-        from sinc.fingerprint import analyze_audio
-        sinc_result = analyze_audio(str(file_path))
-
-        asset.fingerprint_hash = sinc_result["fingerprint_hash"]
-        asset.duration_seconds = sinc_result["duration_seconds"]
-        asset.risk_score = sinc_result["risk_score"]
-        asset.clearance_status = sinc_result["clearance_status"]
-
-        # If cleared, register on blockchain
-        if sinc_result["clearance_status"] == "CLEARED":
-            tx_hash = blockchain_registry.register_asset(
-                asset.id,
-                sinc_result["fingerprint_hash"]
-            )
-            if tx_hash:
-                asset.chain_tx_hash = tx_hash
+@app.post("/api/assets/match", response_model=ExcerptMatchResponse)
+async def match_audio_excerpt(
+    audio_file: UploadFile = File(...),
+    limit: int = Form(5),
+    db: Session = Depends(get_db),
+    _: str = Depends(validate_invitation)
+):
+    """Find catalog assets containing an audio excerpt and where it occurs."""
+    file_ext = Path(audio_file.filename).suffix.lower()
+    if file_ext not in AUDIO_EXTENSIONS:
+        raise HTTPException(status_code=400, detail="Invalid audio format")
 
-        db.commit()
-        db.refresh(asset)
+    with tempfile.NamedTemporaryFile(suffix=file_ext) as excerpt:
+        excerpt.write(await audio_file.read())
+        excerpt.flush()
+        blob = await analysis.landmark_blob(excerpt.name)
 
-    except Exception as e:
-        print(f"SINC analysis error: {e}")
-        # Continue without fingerprint
+    if blob is None:
+        raise HTTPException(status_code=503, detail="Audio decoding unavailable")
 
-    return asset
+    # Index load/refresh and the lookup are CPU and database work
+    matches = await run_in_threadpool(match_excerpt, db, blob, max(1, min(limit, 50)))
+    return {"matches": matches}
 
 
 @app.get("/api/assets/{asset_id}/audio")
@@ -206,14 +376,30 @@ async def get_audio(
     if not asset or not asset.file_path:
         raise HTTPException(status_code=404, detail="Audio not found")
 
-    file_path = Path(asset.file_path)
-    if not file_path.exists():
+    resolved = resolve(db, asset.file_path)
+    if resolved is None:
         raise HTTPException(status_code=404, detail="Audio file missing")
+    backend, name, stored = resolved
+
+    file_ext = Path(name).suffix.lower()
+    media_type = AUDIO_MEDIA_TYPES.get(file_ext, "audio/mpeg")
+    filename = f"{asset.title}{file_ext}"
+
+    local_file = Path(name) if backend is None else backend.local_file(name)
+    if local_file is not None:
+        if not local_file.exists():
+            raise HTTPException(status_code=404, detail="Audio file missing")
+        return FileResponse(local_file, media_type=media_type, filename=filename)
 
-    return FileResponse(
-        file_path,
-        media_type="audio/mpeg",
-        filename=f"{asset.title}.mp3"
+    if not backend.exists(name):
+        raise HTTPException(status_code=404, detail="Audio file missing")
+    return StreamingResponse(
+        backend.iter_chunks(name),
+        media_type=media_type,
+        headers={
+            "Content-Length": str(stored.size),
+            "Content-Disposition": f"attachment; filename*=utf-8''{quote(filename)}",
+        }
     )
 
 
@@ -243,22 +429,25 @@ async def create_settlement(
     if not asset:
         raise HTTPException(status_code=404, detail="Asset not found")
 
-    event = SettlementEvent(
-        asset_id=asset_id,
-        kind=data.kind
-    )
-    db.add(event)
-
-    # Update asset status based on settlement rule
-    if asset.settlement_rule == "IMMEDIATE":
-        asset.status = "SETTLED"
-    elif asset.settlement_rule == "ON_FIRST_PLAY" and data.kind == "PLAY":
-        asset.status = "SETTLED"
-    elif asset.settlement_rule == "ON_TRANSFER" and data.kind == "TRANSFER":
-        asset.status = "SETTLED"
+    with unit_of_work(db):
+        event = SettlementEvent(
+            asset_id=asset_id,
+            kind=data.kind
+        )
+        db.add(event)
 
-    db.commit()
-    db.refresh(event)
+        # Update asset status based on settlement rule
+        settles = (
+            asset.settlement_rule == "IMMEDIATE"
+            or (asset.settlement_rule == "ON_FIRST_PLAY" and data.kind == "PLAY")
+            or (asset.settlement_rule == "ON_TRANSFER" and data.kind == "TRANSFER")
+        )
+        settled = settles and asset.status != "SETTLED"
+        if settled:
+            asset.status = "SETTLED"
+            record_event(db, asset.id, AssetEventKind.SETTLED, status=asset.status)
+    if settled:
+        event_hub.notify()
 
     return event
 
@@ -284,9 +473,8 @@ async def create_invitation_token(
 ):
     """Create new invitation token (admin only)."""
     token = secrets.token_hex(16)
-    db_token = InvitationToken(token=token)
-    db.add(db_token)
-    db.commit()
+    with unit_of_work(db):
+        db.add(InvitationToken(token=token))
 
     return {"token": token}
 
@@ -313,49 +501,330 @@ async def fractionalize_asset(
     if asset.clearance_status != "CLEARED":
         raise HTTPException(status_code=400, detail="Asset must be cleared before fractionalization")
 
-    # Update asset
-    asset.is_fractionalized = 1
-    asset.fraction_count = data.fraction_count
-
-    # Create initial holding (100% to vault)
-    holding = FractionHolding(
-        asset_id=asset.id,
-        holder_address="0x0000000000000000000000000000000000000000",
-        holder_label="Vault",
-        fraction_amount=data.fraction_count,
-        percentage=100.0
-    )
-    db.add(holding)
+    with unit_of_work(db):
+        # Update asset
+        asset.is_fractionalized = 1
+        asset.fraction_count = data.fraction_count
+
+        # Create initial holding (100% to vault)
+        holding = FractionHolding(
+            asset_id=asset.id,
+            holder_address=VAULT_ADDRESS,
+            holder_label="Vault",
+            fraction_amount=data.fraction_count,
+            percentage=100.0
+        )
+        db.add(holding)
+        record_holding_event(
+            db,
+            asset.id,
+            to_address=VAULT_ADDRESS,
+            amount=data.fraction_count,
+            to_label="Vault"
+        )
 
-    # TODO: Call blockchain contract to fractionalize
-    # This would call IssuanceFractions.fractionalizeAsset()
+        record_event(
+            db, asset.id, AssetEventKind.FRACTIONALIZED,
+            is_fractionalized=True, fraction_count=data.fraction_count
+        )
 
-    db.commit()
-    db.refresh(asset)
+        # TODO: Call blockchain contract to fractionalize
+        # This would call IssuanceFractions.fractionalizeAsset()
+    event_hub.notify()
 
     return asset
 
 
-@app.get("/api/assets/{asset_id}/fractions", response_model=List[FractionHoldingResponse])
+@app.get("/api/assets/{asset_id}/fractions", response_model=List[FractionHoldingResponse], responses=MSGPACK_RESPONSE)
 async def get_fraction_holdings(
+    request: Request,
     asset_id: int,
+    as_of: Optional[datetime] = Query(None),
     db: Session = Depends(get_db),
     _: str = Depends(validate_invitation)
 ):
-    """Get all fraction holdings for an asset."""
-    holdings = db.query(FractionHolding).filter(
+    """
+    Get all fraction holdings for an asset.
+
+    With `as_of`, returns the cap table at that time, rebuilt from the
+    nearest holdings snapshot plus the events recorded after it.
+    """
+    if as_of is not None:
+        asset = db.query(Asset).filter(Asset.id == asset_id).first()
+        if not asset:
+            raise HTTPException(status_code=404, detail="Asset not found")
+        if not asset.is_fractionalized:
+            return encode(request, [])
+        if as_of.tzinfo is not None:
+            as_of = as_of.astimezone(timezone.utc).replace(tzinfo=None)
+        return encode(request, holdings_as_of(db, asset, as_of))
+
+    rows = db.query(*HOLDING_COLUMNS.columns).filter(
         FractionHolding.asset_id == asset_id
     ).order_by(FractionHolding.percentage.desc()).all()
 
+    return encode(request, HOLDING_COLUMNS.dicts(rows))
+
+
+@app.post("/api/assets/{asset_id}/fractions/transfer", response_model=List[FractionHoldingResponse])
+async def transfer_fraction_holdings(
+    asset_id: int,
+    data: FractionTransferRequest,
+    db: Session = Depends(get_db),
+    _: str = Depends(validate_invitation)
+):
+    """Transfer fractions between holders and record the movement."""
+    asset = db.query(Asset).filter(Asset.id == asset_id).first()
+    if not asset:
+        raise HTTPException(status_code=404, detail="Asset not found")
+
+    if not asset.is_fractionalized:
+        raise HTTPException(status_code=400, detail="Asset is not fractionalized")
+
+    if data.from_address.lower() == data.to_address.lower():
+        raise HTTPException(status_code=400, detail="Cannot transfer to the same holder")
+
+    try:
+        with unit_of_work(db):
+            holdings = transfer_fractions(
+                db,
+                asset,
+                from_address=data.from_address,
+                to_address=data.to_address,
+                amount=data.amount,
+                to_label=data.to_label
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     return holdings
 
 
 # ============================================
-# KYC/AML Endpoints
+# Royalty Payout Endpoints
 # ============================================
 
-# Restricted countries for compliance
-RESTRICTED_COUNTRIES = {"KP", "IR", "CU", "SY", "RU"}  # North Korea, Iran, Cuba, Syria, Russia
+@app.post("/api/payouts/run", response_model=PayoutRunResponse)
+async def run_payout_distribution(
+    data: PayoutRunRequest,
+    db: Session = Depends(get_db),
+    _: str = Depends(validate_invitation)
+):
+    """Distribute period revenue pro rata over fraction holders and write the payout file."""
+    as_of = data.as_of
+    if as_of is not None and as_of.tzinfo is not None:
+        as_of = as_of.astimezone(timezone.utc).replace(tzinfo=None)
+
+    try:
+        # NumPy allocation and the file write; keep them off the event loop
+        return await run_in_threadpool(
+            run_payouts,
+            db,
+            data.period,
+            data.revenues,
+            as_of=as_of,
+            decimals=data.currency_decimals
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/payouts/{period}/file")
+async def get_payout_file(
+    period: str,
+    _: str = Depends(validate_invitation)
+):
+    """Download the batched payout file for a period."""
+    file_path = payout_file_path(period)
+    if not file_path.exists():
+        raise HTTPException(status_code=404, detail="Payout file not found")
+
+    return FileResponse(file_path, media_type="text/csv", filename=file_path.name)
+
+
+# ============================================
+# Bulk Import Endpoints
+# ============================================
+
+@app.post("/api/imports", response_model=ImportJobResponse, status_code=202)
+async def create_import(
+    manifest: UploadFile = File(...),
+    archive: Optional[UploadFile] = File(None),
+    audio_dir: Optional[str] = Form(None),
+    db: Session = Depends(get_db),
+    _: str = Depends(validate_invitation)
+):
+    """Start a bulk import from a CSV/JSON manifest plus an audio archive or server directory."""
+    if (archive is None) == (audio_dir is None):
+        raise HTTPException(status_code=400, detail="Provide either an archive or audio_dir")
+
+    # Extraction, manifest validation (a stat per row) and the row inserts
+    # are blocking; run them in the threadpool, off the event loop
+    extracted = None
+    try:
+        if archive is not None:
+            audio_root = extracted = imports.new_extract_dir()
+            with tempfile.NamedTemporaryFile(suffix=Path(archive.filename).name) as upload:
+                while chunk := await archive.read(CHUNK_SIZE):
+                    await run_in_threadpool(upload.write, chunk)
+                upload.flush()
+                await run_in_threadpool(imports.extract_archive, Path(upload.name), audio_root)
+        else:
+            audio_root = await run_in_threadpool(imports.source_dir, audio_dir)
+
+        job = await run_in_threadpool(imports.create_job, db, await manifest.read(), manifest.filename, audio_root)
+    except Exception as e:
+        # No job owns the extracted audio yet
+        if extracted is not None:
+            await run_in_threadpool(shutil.rmtree, extracted, ignore_errors=True)
+        if isinstance(e, (ValueError, UnicodeDecodeError)):
+            raise HTTPException(status_code=400, detail=str(e))
+        raise
+
+    imports.start_job(job.id)
+    return job
+
+
+@app.get("/api/imports/{job_id}", response_model=ImportJobResponse)
+async def get_import(
+    job_id: int,
+    db: Session = Depends(get_db),
+    _: str = Depends(validate_invitation)
+):
+    """Import job progress."""
+    job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
+
+
+@app.get("/api/imports/{job_id}/rows", response_model=List[ImportRowResponse])
+async def get_import_rows(
+    job_id: int,
+    status: Optional[ImportRowStatus] = Query(ImportRowStatus.FAILED),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    _: str = Depends(validate_invitation)
+):
+    """Manifest rows of a job by status (failed rows, with errors, by default)."""
+    query = db.query(ImportRow).filter(ImportRow.job_id == job_id)
+    if status is not None:
+        query = query.filter(ImportRow.status == status.value)
+    return query.order_by(ImportRow.row_number).offset(offset).limit(limit).all()
+
+
+@app.post("/api/imports/{job_id}/resume", response_model=ImportJobResponse, status_code=202)
+async def resume_import(
+    job_id: int,
+    retry_failed: bool = Query(False),
+    db: Session = Depends(get_db),
+    _: str = Depends(validate_invitation)
+):
+    """Continue an interrupted or failed job; optionally re-analyze rows whose SINC step failed."""
+    job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    if imports.is_active(job_id):
+        raise HTTPException(status_code=409, detail="Import job is running")
+
+    if retry_failed:
+        await run_in_threadpool(imports.retry_failed, db, job)
+    imports.start_job(job.id)
+    return job
+
+
+# ============================================
+# Asset Event Stream
+# ============================================
+
+@app.get("/api/events")
+async def stream_asset_events(
+    asset_id: Optional[List[int]] = Query(None),
+    last_event_id: Optional[int] = Query(None, ge=0),
+    token: Optional[str] = Query(None),
+    last_event_id_header: Optional[int] = Header(None, alias="Last-Event-ID"),
+    authorization: Optional[str] = Header(None)
+):
+    """
+    Server-sent asset lifecycle events, for the given assets or all of them.
+
+    Each event's `data` holds the asset fields it changed. Reconnects resume
+    after the Last-Event-ID header; on a first connect, `last_event_id=0`
+    replays the assets' history. EventSource can't send headers, so the
+    invitation may also be passed as `token`.
+    """
+    validate_invitation(authorization or (f"Bearer {token}" if token else None))
+    if event_hub.full:
+        raise HTTPException(status_code=503, detail="Too many event subscribers", headers={"Retry-After": "30"})
+
+    resume_after = last_event_id_header if last_event_id_header is not None else last_event_id
+    subscription = event_hub.subscribe(asset_id)
+
+    async def stream():
+        try:
+            # Reconnect delay for EventSource, in milliseconds
+            yield b"retry: 3000\n\n"
+            # Live events the client already has are among the last replayed:
+            # the hub publishes new ids (REORDER_WINDOW aside) and drops a
+            # subscriber past SUBSCRIBER_QUEUE_SIZE queued, both under a page
+            previous, replayed = set(), set()
+            if resume_after is not None:
+                async for page in _replay(resume_after, asset_id):
+                    previous, replayed = replayed, {event.id for event in page}
+                    for event in page:
+                        yield event.sse
+            replayed |= previous
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if event is None:
+                    return
+                # The hub may publish events the client already has
+                if event.id not in replayed and (resume_after is None or event.id > resume_after):
+                    yield event.sse
+        finally:
+            event_hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _load_backlog(after_id: int, asset_ids: Optional[List[int]]):
+    db = SessionLocal()
+    try:
+        return load_events(db, after_id, asset_ids, limit=REPLAY_LIMIT)
+    finally:
+        db.close()
+
+
+async def _replay(after_id: int, asset_ids: Optional[List[int]]):
+    """
+    Pages of events after `after_id`: from the table, REPLAY_LIMIT at a
+    time, until the hub's ring reaches back far enough to serve the rest
+    or the table has no more.
+    """
+    while True:
+        page = event_hub.recent(after_id, asset_ids)
+        from_ring = page is not None
+        if not from_ring:
+            page = await run_in_threadpool(_load_backlog, after_id, asset_ids)
+        if page:
+            yield page
+            after_id = page[-1].id
+        if from_ring or len(page) < REPLAY_LIMIT:
+            return
+
+
+# ============================================
+# KYC/AML Endpoints
+# ============================================
 
 @app.post("/api/kyc/submit", response_model=KYCResponse)
 async def submit_kyc(
@@ -365,7 +834,7 @@ async def submit_kyc(
 ):
     """Submit KYC verification request."""
     # Check for restricted countries
-    if data.country_code.upper() in RESTRICTED_COUNTRIES:
+    if is_restricted(data.country_code):
         raise HTTPException(
             status_code=403,
             detail="Service not available in your jurisdiction"
@@ -380,15 +849,14 @@ async def submit_kyc(
         return existing
 
     # Create new KYC record (in production, this would trigger external verification)
-    kyc_record = KYCRecord(
-        wallet_address=data.wallet_address.lower(),
-        country_code=data.country_code.upper(),
-        status="PENDING",
-        verification_level=0
-    )
-    db.add(kyc_record)
-    db.commit()
-    db.refresh(kyc_record)
+    with unit_of_work(db):
+        kyc_record = KYCRecord(
+            wallet_address=data.wallet_address.lower(),
+            country_code=data.country_code.upper(),
+            status="PENDING",
+            verification_level=0
+        )
+        db.add(kyc_record)
 
     return kyc_record
 
@@ -400,9 +868,7 @@ async def get_kyc_status(
     _: str = Depends(validate_invitation)
 ):
     """Get KYC status for a wallet address."""
-    record = db.query(KYCRecord).filter(
-        KYCRecord.wallet_address == wallet_address.lower()
-    ).first()
+    record = lookup_verified(db, wallet_address)
 
     if not record:
         raise HTTPException(status_code=404, detail="KYC record not found")
@@ -410,6 +876,21 @@ async def get_kyc_status(
     return record
 
 
+@app.post("/api/kyc/batch", response_model=KYCBatchResponse)
+async def screen_kyc_batch(
+    data: KYCBatchRequest,
+    db: Session = Depends(get_db),
+    _: str = Depends(validate_invitation)
+):
+    """Screen a list of wallet addresses in one round trip."""
+    results = screen_addresses(db, data.wallet_addresses)
+
+    return {
+        "results": results,
+        "eligible_count": sum(1 for r in results if r["eligible"])
+    }
+
+
 @app.post("/api/kyc/{wallet_address}/verify")
 async def verify_kyc(
     wallet_address: str,
@@ -425,12 +906,12 @@ async def verify_kyc(
     if not record:
         raise HTTPException(status_code=404, detail="KYC record not found")
 
-    record.status = "VERIFIED"
-    record.verification_level = verification_level
-    record.verified_at = datetime.utcnow()
+    with unit_of_work(db):
+        record.status = "VERIFIED"
+        record.verification_level = verification_level
+        record.verified_at = datetime.utcnow()
 
-    db.commit()
-    db.refresh(record)
+    verified_cache.invalidate(record.wallet_address)
 
     return {"message": "KYC verified", "wallet_address": wallet_address}
 
@@ -452,5 +933,6 @@ def check_kyc_required(asset: Asset, transaction_value: float = 0) -> bool:
 
 
 if __name__ == "__main__":
+    # Single process for development; `python -m app.serve run` for N workers
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
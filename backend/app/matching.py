@@ -0,0 +1,124 @@
+"""
+Segment-level matching against the catalog's SINC landmark fingerprints.
+
+Packed landmarks are stored per asset in `asset_landmarks`; each process
+keeps an in-memory inverted index over them, loaded on first use. Every
+landmark write records a `fingerprinted` asset event in the same
+transaction, so before each match the index reloads the assets
+fingerprinted since the last event it saw, whichever process (another
+worker, the import CLI) wrote them.
+"""
+
+import threading
+from typing import List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from sinc.landmarks import LandmarkIndex, unpack
+from .models import Asset, AssetEvent, AssetEventKind, AssetLandmarks
+
+# Assets read per query while loading the index
+LOAD_BATCH_SIZE = 1000
+
+_index: Optional[LandmarkIndex] = None
+_index_lock = threading.Lock()
+# Last asset_events id reflected in the index
+_index_cursor = 0
+
+
+def _load_index(db: Session) -> LandmarkIndex:
+    index = LandmarkIndex()
+    last_id = 0
+    while True:
+        rows = db.query(AssetLandmarks.asset_id, AssetLandmarks.data).filter(
+            AssetLandmarks.asset_id > last_id
+        ).order_by(AssetLandmarks.asset_id).limit(LOAD_BATCH_SIZE).all()
+        if not rows:
+            return index
+        index.add_many({asset_id: unpack(data)[0] for asset_id, data in rows})
+        last_id = rows[-1].asset_id
+
+
+def _refresh(db: Session, index: LandmarkIndex, cursor: int) -> int:
+    """Reload assets fingerprinted after event `cursor`; returns the new cursor."""
+    latest = db.query(func.max(AssetEvent.id)).scalar() or 0
+    if latest <= cursor:
+        return cursor
+    asset_ids = {
+        asset_id for asset_id, in db.query(AssetEvent.asset_id).filter(
+            AssetEvent.id > cursor,
+            AssetEvent.id <= latest,
+            AssetEvent.kind == AssetEventKind.FINGERPRINTED.value
+        )
+    }
+    # Only re-analysed assets need removing; a removed id makes its next
+    # `add` purge the main tier, which new assets must not pay for
+    for asset_id in asset_ids:
+        if asset_id in index:
+            index.remove(asset_id)
+    for start in range(0, len(asset_ids), LOAD_BATCH_SIZE):
+        batch = sorted(asset_ids)[start:start + LOAD_BATCH_SIZE]
+        rows = db.query(AssetLandmarks.asset_id, AssetLandmarks.data).filter(
+            AssetLandmarks.asset_id.in_(batch)
+        ).all()
+        for asset_id, data in rows:
+            index.add(asset_id, unpack(data)[0])
+    return latest
+
+
+def get_index(db: Session) -> LandmarkIndex:
+    """
+    The process-wide landmark index: loaded from the database once, then
+    brought up to date with assets fingerprinted since.
+    """
+    global _index, _index_cursor
+    with _index_lock:
+        if _index is None:
+            # Cursor first: landmarks written during the load are reloaded
+            # by the next refresh rather than missed
+            _index_cursor = db.query(func.max(AssetEvent.id)).scalar() or 0
+            _index = _load_index(db)
+        else:
+            _index_cursor = _refresh(db, _index, _index_cursor)
+        return _index
+
+
+def store_landmarks(db: Session, asset_id: int, blob: bytes, new: bool = False):
+    """
+    Persist an asset's packed landmarks. The caller owns the transaction
+    and records the asset's `fingerprinted` event in it (`analysis_events`),
+    which is how loaded indexes pick the landmarks up.
+
+    `new` skips the existence check for an asset created in this
+    transaction.
+    """
+    landmarks, _ = unpack(blob)
+    row = AssetLandmarks(asset_id=asset_id, landmark_count=len(landmarks), data=blob)
+    if new:
+        db.add(row)
+    else:
+        db.merge(row)
+
+
+def match_excerpt(db: Session, blob: bytes, limit: int = 5) -> List[dict]:
+    """Rank catalog assets containing the excerpt, with where it starts in each."""
+    landmarks, frame_seconds = unpack(blob)
+    matches = get_index(db).query(landmarks, limit=limit)
+    if not matches:
+        return []
+
+    titles = dict(db.query(Asset.id, Asset.title).filter(
+        Asset.id.in_([m["asset_id"] for m in matches])
+    ).all())
+    return [
+        {
+            "asset_id": m["asset_id"],
+            "title": titles.get(m["asset_id"]),
+            "offset_seconds": round(m["offset_frames"] * frame_seconds, 3),
+            "score": m["score"],
+            "confidence": round(m["confidence"], 4),
+        }
+        for m in matches
+        if m["asset_id"] in titles
+    ]
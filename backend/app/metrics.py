@@ -0,0 +1,387 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Counters and histograms are plain dicts keyed by label values behind a lock;
+recording a sample is a dict lookup and a few additions, so instrumentation
+stays off the hot path's profile. `MetricsMiddleware` times every request by
+route template and attributes DB queries issued while it runs; streamed
+responses (audio, event streams) are timed separately so their lifetimes
+don't swamp request latency percentiles.
+
+With several worker processes (`python -m app.serve` sets
+METRICS_MULTIPROCESS=1) each worker writes its values to
+`RUN_DIR/metrics/<pid>.json` every METRICS_SNAPSHOT_INTERVAL seconds and
+whenever it answers a scrape, and `/metrics` renders the sum over all
+files. Totals then don't depend on which worker a scrape reaches; files of
+exited workers stay until the next server start, so sums never go
+backwards.
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+METRICS_MULTIPROCESS = os.getenv("METRICS_MULTIPROCESS") == "1"
+RUN_DIR = Path(os.getenv("RUN_DIR") or Path(__file__).parent.parent / "run")
+METRICS_DIR = RUN_DIR / "metrics"
+METRICS_SNAPSHOT_INTERVAL = float(os.getenv("METRICS_SNAPSHOT_INTERVAL") or 5.0)
+
+REGISTRY: List["_Metric"] = []
+
+
+def _escape(value: str, quote: bool = True) -> str:
+    # Text format escapes: backslash and newline everywhere, quotes in labels
+    value = value.replace("\\", "\\\\").replace("\n", "\\n")
+    return value.replace('"', '\\"') if quote else value
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+        REGISTRY.append(self)
+
+    def _labels(self, values: Tuple[str, ...]) -> str:
+        if not self.labelnames:
+            return ""
+        pairs = ",".join(
+            f'{name}="{_escape(str(value))}"' for name, value in zip(self.labelnames, values)
+        )
+        return "{" + pairs + "}"
+
+    def items(self) -> List[Tuple[Tuple[str, ...], object]]:
+        """(labels, value) pairs, copied."""
+        raise NotImplementedError
+
+    def render(self, items) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def items(self):
+        with self._lock:
+            return list(self._values.items())
+
+    def render(self, items) -> List[str]:
+        return [f"{self.name}{self._labels(labels)} {value}" for labels, value in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels: str):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                # [per-bucket counts..., +Inf count, sum]
+                state = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    def items(self):
+        with self._lock:
+            return [(labels, list(state)) for labels, state in self._values.items()]
+
+    def render(self, items) -> List[str]:
+        lines = []
+        for labels, state in items:
+            base = self._labels(labels)[1:-1]
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), state[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                sep = "," if base else ""
+                lines.append(f'{self.name}_bucket{{{base}{sep}le="{le}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{self._labels(labels)} {state[-1]}")
+            lines.append(f"{self.name}_count{self._labels(labels)} {cumulative}")
+        return lines
+
+
+def write_snapshot(directory: Path = METRICS_DIR):
+    """Write this process's values to `<pid>.json` (atomically)."""
+    directory.mkdir(parents=True, exist_ok=True)
+    snapshot = {metric.name: metric.items() for metric in REGISTRY}
+    path = directory / f"{os.getpid()}.json"
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(snapshot))
+    os.replace(tmp, path)
+
+
+def _add(total, value):
+    # Counter values are numbers, histogram states equal-length lists
+    if isinstance(total, list):
+        return [a + b for a, b in zip(total, value)]
+    return total + value
+
+
+def _read_snapshots(directory: Path) -> Dict[str, List[Tuple[Tuple[str, ...], object]]]:
+    """Per metric name, (labels, value) pairs summed over every worker's file."""
+    totals: Dict[str, Dict[Tuple[str, ...], object]] = {}
+    for path in directory.glob("*.json"):
+        try:
+            snapshot = json.loads(path.read_text())
+        except (OSError, ValueError):
+            # Removed or half-written by a process outside write_snapshot
+            continue
+        for name, items in snapshot.items():
+            merged = totals.setdefault(name, {})
+            for labels, value in items:
+                labels = tuple(labels)
+                merged[labels] = _add(merged[labels], value) if labels in merged else value
+    return {name: list(merged.items()) for name, merged in totals.items()}
+
+
+def render_metrics() -> str:
+    """Render every registered metric in Prometheus text format."""
+    if METRICS_MULTIPROCESS:
+        write_snapshot()
+        merged = _read_snapshots(METRICS_DIR)
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {_escape(metric.documentation, quote=False)}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render(merged.get(metric.name, []) if METRICS_MULTIPROCESS else metric.items()))
+    return "\n".join(lines) + "\n"
+
+
+def start_snapshots() -> Callable[[], None]:
+    """
+    Write snapshots every METRICS_SNAPSHOT_INTERVAL seconds in a daemon
+    thread; returns a function that stops it and writes a final one.
+    """
+    stopped = threading.Event()
+
+    def run():
+        while not stopped.wait(METRICS_SNAPSHOT_INTERVAL):
+            write_snapshot()
+
+    thread = threading.Thread(target=run, name="metrics-snapshots", daemon=True)
+    thread.start()
+
+    def stop():
+        stopped.set()
+        thread.join()
+        write_snapshot()
+    return stop
+
+
+def reset_shared():
+    """Drop all workers' snapshots; the server does this before starting workers."""
+    for path in METRICS_DIR.glob("*.json"):
+        path.unlink(missing_ok=True)
+
+
+# ============================================
+# Metric definitions
+# ============================================
+
+http_request_duration = Histogram(
+    "issuance_http_request_duration_seconds",
+    "Request latency by route template",
+    ("method", "route", "status")
+)
+http_stream_duration = Histogram(
+    "issuance_http_stream_duration_seconds",
+    "Lifetime of streamed responses (audio, event streams) by route template",
+    ("method", "route", "status"),
+    buckets=(0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+)
+db_queries_per_request = Histogram(
+    "issuance_db_queries_per_request",
+    "Database queries issued while serving a request",
+    ("route",),
+    buckets=(1, 2, 3, 5, 8, 13, 21, 50, 100)
+)
+db_time_per_request = Histogram(
+    "issuance_db_time_per_request_seconds",
+    "Time spent in database queries while serving a request",
+    ("route",)
+)
+db_query_duration = Histogram(
+    "issuance_db_query_duration_seconds",
+    "Individual database query latency",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0)
+)
+sinc_stage_duration = Histogram(
+    "issuance_sinc_stage_duration_seconds",
+    "SINC analysis time per stage (decode, mfcc, hash, providers)",
+    ("stage",)
+)
+chain_rpc_duration = Histogram(
+    "issuance_chain_rpc_duration_seconds",
+    "Blockchain RPC latency by method",
+    ("method",)
+)
+chain_tx_confirmation = Histogram(
+    "issuance_chain_tx_confirmation_seconds",
+    "Time from transaction submission to receipt",
+    buckets=(0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+)
+chain_submissions = Counter(
+    "issuance_chain_submissions_total",
+    "On-chain registrations attempted by the coordinator, by result",
+    ("result",)
+)
+admission_rejected = Counter(
+    "issuance_admission_rejected_total",
+    "Requests refused by admission control, by route class or gate and reason",
+    ("target", "reason")
+)
+admission_queued = Counter(
+    "issuance_admission_queued_total",
+    "Requests that waited for a gate slot",
+    ("gate",)
+)
+admission_wait = Histogram(
+    "issuance_admission_wait_seconds",
+    "Time queued for a gate slot",
+    ("gate",)
+)
+upload_bytes = Counter(
+    "issuance_upload_bytes_total",
+    "Audio bytes received"
+)
+upload_throughput = Histogram(
+    "issuance_upload_throughput_bytes_per_second",
+    "Per-upload receive and store throughput",
+    buckets=(1e5, 1e6, 5e6, 1e7, 5e7, 1e8, 5e8, 1e9)
+)
+
+
+# ============================================
+# Request and DB instrumentation
+# ============================================
+
+class RequestStats:
+    __slots__ = ("queries", "commits", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.commits = 0
+        self.db_seconds = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """DB counters for the request being served, if any."""
+    return _request_stats.get()
+
+
+def instrument_engine(engine: Engine):
+    """Time every cursor execution and attribute it to the current request."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        db_query_duration.observe(elapsed)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        # A failed execute never reaches _after; drop its start time so the
+        # next query on this pooled connection isn't timed against it
+        if context.connection is not None and context.statement is not None:
+            starts = context.connection.info.get("query_start")
+            if starts:
+                starts.pop()
+
+    @event.listens_for(engine, "commit")
+    def _commit(conn):
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.commits += 1
+
+
+QUERY_COUNT_HEADER = b"x-db-queries"
+COMMIT_COUNT_HEADER = b"x-db-commits"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency and DB usage per route template.
+
+    With `expose_query_count`, responses carry the number of DB queries and
+    commits issued before the response started (`X-DB-Queries`,
+    `X-DB-Commits`), so tests and benchmarks can assert each endpoint's
+    round-trip budget.
+    """
+
+    def __init__(self, app, expose_query_count: bool = False):
+        self.app = app
+        self.expose_query_count = expose_query_count
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+        streamed = [False]
+        stats = RequestStats()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.body" and message.get("more_body"):
+                streamed[0] = True
+            elif message["type"] == "http.response.start":
+                status[0] = message["status"]
+                if self.expose_query_count:
+                    headers = list(message.get("headers", []))
+                    headers.append((QUERY_COUNT_HEADER, str(stats.queries).encode()))
+                    headers.append((COMMIT_COUNT_HEADER, str(stats.commits).encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        token = _request_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_stats.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            duration = http_stream_duration if streamed[0] else http_request_duration
+            duration.observe(elapsed, scope["method"], path, str(status[0]))
+            db_queries_per_request.observe(stats.queries, path)
+            db_time_per_request.observe(stats.db_seconds, path)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Enum, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, Enum, DateTime, ForeignKey, Text, Index, LargeBinary
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -24,6 +24,36 @@ class ClearanceStatus(str, enum.Enum):
     FLAGGED = "FLAGGED"
 
 
+class ImportStatus(str, enum.Enum):
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
+
+class ImportRowStatus(str, enum.Enum):
+    PENDING = "PENDING"      # validated, not yet inserted
+    IMPORTED = "IMPORTED"    # asset and custody event created, awaiting SINC
+    ANALYZED = "ANALYZED"
+    FAILED = "FAILED"
+
+
+class ChainSubmissionStatus(str, enum.Enum):
+    PENDING = "PENDING"      # queued for the coordinator
+    CONFIRMED = "CONFIRMED"  # receipt received, tx hash on the asset
+    FAILED = "FAILED"        # gave up after MAX_ATTEMPTS
+
+
+class AssetEventKind(str, enum.Enum):
+    UPLOADED = "uploaded"
+    FINGERPRINTED = "fingerprinted"
+    CLEARED = "cleared"
+    FLAGGED = "flagged"
+    CHAIN_CONFIRMED = "chain_confirmed"
+    SETTLED = "settled"
+    FRACTIONALIZED = "fractionalized"
+
+
 class Asset(Base):
     __tablename__ = "assets"
 
@@ -54,6 +84,25 @@ class Asset(Base):
     fraction_holdings = relationship("FractionHolding", back_populates="asset")
 
 
+class AssetFacetCount(Base):
+    """Per-value asset counts for search facets, maintained by DB triggers."""
+    __tablename__ = "asset_facet_counts"
+
+    facet = Column(String(50), primary_key=True)
+    value = Column(String(50), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class AssetLandmarks(Base):
+    """Packed SINC landmark fingerprint (uint32 hash + frame offset pairs)."""
+    __tablename__ = "asset_landmarks"
+
+    asset_id = Column(Integer, ForeignKey("assets.id"), primary_key=True)
+    landmark_count = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
 class CustodyEvent(Base):
     __tablename__ = "custody_events"
 
@@ -100,6 +149,40 @@ class FractionHolding(Base):
     asset = relationship("Asset", back_populates="fraction_holdings")
 
 
+class HoldingEvent(Base):
+    """Append-only log of fraction movements; never updated in place."""
+    __tablename__ = "holding_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    asset_id = Column(Integer, ForeignKey("assets.id"), nullable=False)
+    from_address = Column(String(42), nullable=True)  # NULL on mint
+    to_address = Column(String(42), nullable=False)
+    to_label = Column(String(255), nullable=True)
+    amount = Column(Integer, nullable=False)
+    occurred_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_holding_events_asset_id_id", "asset_id", "id"),
+    )
+
+
+class HoldingSnapshot(Base):
+    """Materialized cap table for an asset as of `last_event_id`."""
+    __tablename__ = "holding_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    asset_id = Column(Integer, ForeignKey("assets.id"), nullable=False)
+    last_event_id = Column(Integer, nullable=False)
+    taken_at = Column(DateTime, nullable=False)
+    # {address: [amount, label, last_event_id, last_event_iso]}; the last two
+    # are the id and ISO time of the holder's latest holding event
+    holdings_json = Column(Text, nullable=False)
+
+    __table_args__ = (
+        Index("ix_holding_snapshots_asset_id_taken_at", "asset_id", "taken_at"),
+    )
+
+
 class KYCRecord(Base):
     __tablename__ = "kyc_records"
 
@@ -110,3 +193,89 @@ class KYCRecord(Base):
     country_code = Column(String(3), nullable=True)
     verified_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class StoredObject(Base):
+    """Content-addressed upload; `refcount` assets reference its bytes."""
+    __tablename__ = "stored_objects"
+
+    sha256 = Column(String(64), primary_key=True)
+    extension = Column(String(10), nullable=False)  # of the first upload; names the object
+    size = Column(Integer, nullable=False)
+    refcount = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ImportJob(Base):
+    """Bulk catalog import; progress counters are updated per committed batch."""
+    __tablename__ = "import_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String(20), default=ImportStatus.PENDING.value)
+    manifest_name = Column(String(255), nullable=True)
+    audio_root = Column(String(500), nullable=False)
+    total_rows = Column(Integer, nullable=False, default=0)
+    imported_rows = Column(Integer, nullable=False, default=0)
+    analyzed_rows = Column(Integer, nullable=False, default=0)
+    failed_rows = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class ImportRow(Base):
+    """One manifest row of an import job and where it got to."""
+    __tablename__ = "import_rows"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("import_jobs.id"), nullable=False)
+    row_number = Column(Integer, nullable=False)  # 1-based position in the manifest
+    status = Column(String(20), default=ImportRowStatus.PENDING.value)
+    data_json = Column(Text, nullable=False)  # validated AssetCreate fields plus "file"
+    asset_id = Column(Integer, ForeignKey("assets.id"), nullable=True)
+    error = Column(Text, nullable=True)
+
+    __table_args__ = (
+        Index("ix_import_rows_job_id_status_row_number", "job_id", "status", "row_number"),
+    )
+
+
+class ChainSubmission(Base):
+    """
+    Outbox entry for an on-chain registration. API workers insert these in
+    the issuing transaction; only the elected coordinator submits them, so
+    one process owns the signing account's nonce sequence.
+    """
+    __tablename__ = "chain_submissions"
+
+    asset_id = Column(Integer, ForeignKey("assets.id"), primary_key=True)
+    fingerprint_hash = Column(String(64), nullable=False)
+    status = Column(String(20), default=ChainSubmissionStatus.PENDING.value)
+    attempts = Column(Integer, nullable=False, default=0)
+    tx_hash = Column(String(66), nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_chain_submissions_status_created_at", "status", "created_at"),
+    )
+
+
+class AssetEvent(Base):
+    """
+    Asset lifecycle event; `id` is the SSE event id clients resume from and
+    `data_json` holds the asset fields the event changed.
+    """
+    __tablename__ = "asset_events"
+
+    id = Column(Integer, primary_key=True)
+    asset_id = Column(Integer, ForeignKey("assets.id"), nullable=False)
+    kind = Column(String(30), nullable=False)
+    data_json = Column(Text, nullable=False)
+    occurred_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_asset_events_asset_id_id", "asset_id", "id"),
+    )
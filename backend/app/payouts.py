@@ -0,0 +1,277 @@
+"""
+Royalty payout distribution over fraction holders.
+
+Revenue is converted to integer minor units (cents by default) and split
+pro rata with the largest-remainder method: every holder receives the floor
+of their exact share, and the leftover units of each asset go one by one to
+the holders with the largest remainders (ties broken by address), so totals
+always reconcile exactly and reruns are reproducible. The allocation runs
+over flat NumPy arrays for the whole catalog at once, in int64 or, when
+amounts could overflow it (e.g. 18-decimal tokens), exact Python ints.
+"""
+
+import csv
+import re
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from .holdings import holdings_as_of
+from .models import Asset, FractionHolding
+
+# Rows per payout batch (one multisend / bank batch each)
+PAYOUT_BATCH_SIZE = 500
+
+# Assets per IN (...) clause when loading holdings
+LOAD_CHUNK_SIZE = 500
+
+PAYOUT_DIR = Path(__file__).parent.parent / "payouts"
+
+INT64_MAX = np.iinfo(np.int64).max
+
+
+def to_minor_units(amount: Decimal, decimals: int = 2) -> int:
+    """Convert a currency amount to integer minor units, rejecting sub-unit precision."""
+    scaled = Decimal(amount).scaleb(decimals)
+    if scaled != scaled.to_integral_value():
+        raise ValueError(f"Amount {amount} has more than {decimals} decimal places")
+    if scaled < 0:
+        raise ValueError("Amount must not be negative")
+    return int(scaled)
+
+
+def format_minor_units(units: int, decimals: int = 2) -> str:
+    """Render non-negative integer minor units as a fixed-point decimal string."""
+    if decimals == 0:
+        return str(int(units))
+    whole, fraction = divmod(int(units), 10 ** decimals)
+    return f"{whole}.{fraction:0{decimals}d}"
+
+
+def _group_sum(group: np.ndarray, values: np.ndarray, n_groups: int) -> np.ndarray:
+    # Integer accumulation; bincount weights would round through float64
+    totals = np.zeros(n_groups, dtype=values.dtype)
+    np.add.at(totals, group, values)
+    return totals
+
+
+def _int_array(values: Sequence[int]) -> np.ndarray:
+    """int64 array, or an object array of Python ints if a value doesn't fit."""
+    values = list(values)
+    if max(values, default=0) > INT64_MAX:
+        return np.array(values, dtype=object)
+    return np.array(values, dtype=np.int64)
+
+
+def allocate(
+    revenue: np.ndarray,
+    group: np.ndarray,
+    shares: np.ndarray,
+    tiebreak: np.ndarray
+) -> np.ndarray:
+    """
+    Split per-group revenue across holders pro rata to their shares.
+
+    Args:
+        revenue: minor units per group, shape (groups,); int64 or object
+        group: group index of each holder, shape (holders,)
+        shares: fraction amount of each holder, shape (holders,)
+        tiebreak: deterministic rank of each holder for equal remainders
+
+    Returns:
+        Minor units owed to each holder; sums to `revenue` for every group
+        that has at least one share.
+    """
+    revenue = np.asarray(revenue)
+    if revenue.dtype != object:
+        revenue = revenue.astype(np.int64)
+    group = np.asarray(group, dtype=np.intp)
+    shares = np.asarray(shares, dtype=np.int64)
+    n_groups = len(revenue)
+
+    totals = _group_sum(group, shares, n_groups)
+    dtype = np.int64
+    if revenue.dtype == object or (
+        len(shares) and int(revenue.max(initial=0)) * int(shares.max()) > INT64_MAX
+    ):
+        # Fall back to arbitrary precision; exact but slower
+        dtype = object
+        revenue = revenue.astype(object)
+
+    numerator = revenue[group] * shares.astype(dtype)
+    denominator = np.maximum(totals[group], 1)
+    base = (numerator // denominator).astype(dtype)
+    # Both below the holder's group share total, so they fit in int64
+    remainder = (numerator % denominator).astype(np.int64)
+
+    distributed = _group_sum(group, base, n_groups)
+    leftover = np.where(totals > 0, revenue - distributed, 0).astype(np.int64)
+
+    # Order holders by group, then largest remainder, then tiebreak rank
+    order = np.lexsort((tiebreak, -remainder, group))
+    sorted_group = group[order]
+    group_start = np.searchsorted(sorted_group, sorted_group, side="left")
+    position = np.arange(len(order)) - group_start
+
+    payouts = base
+    payouts[order] += (position < leftover[sorted_group]).astype(dtype)
+    return payouts
+
+
+def load_holdings(
+    db: Session,
+    asset_ids: Sequence[int],
+    as_of: Optional[datetime] = None
+) -> Dict[str, list]:
+    """
+    Load holders for the given assets as flat column lists.
+
+    Current holdings are read in chunked column queries; with `as_of`, each
+    asset's historical cap table is rebuilt from the holdings event log.
+    """
+    columns = {"asset_id": [], "holder_address": [], "holder_label": [], "fraction_amount": []}
+    asset_ids = list(asset_ids)
+
+    if as_of is None:
+        for i in range(0, len(asset_ids), LOAD_CHUNK_SIZE):
+            rows = db.query(
+                FractionHolding.asset_id,
+                FractionHolding.holder_address,
+                FractionHolding.holder_label,
+                FractionHolding.fraction_amount
+            ).filter(
+                FractionHolding.asset_id.in_(asset_ids[i:i + LOAD_CHUNK_SIZE]),
+                FractionHolding.fraction_amount > 0
+            ).all()
+            for row in rows:
+                for key, value in zip(columns, row):
+                    columns[key].append(value)
+        return columns
+
+    for i in range(0, len(asset_ids), LOAD_CHUNK_SIZE):
+        assets = db.query(Asset).filter(
+            Asset.id.in_(asset_ids[i:i + LOAD_CHUNK_SIZE]),
+            Asset.is_fractionalized == 1
+        ).all()
+        for asset in assets:
+            for entry in holdings_as_of(db, asset, as_of, holder_ids=False):
+                for key in columns:
+                    columns[key].append(entry[key])
+    return columns
+
+
+def compute_distribution(revenues: Dict[int, int], holders: Dict[str, list]) -> dict:
+    """
+    Allocate minor-unit revenues per asset over the loaded holders.
+
+    Returns the `payout` array aligned with the holder columns, a stable
+    output order (asset, then address), and the assets that had revenue but
+    no holders.
+    """
+    asset_ids = np.fromiter(revenues.keys(), dtype=np.int64, count=len(revenues))
+    revenue = _int_array(revenues.values())
+    order = np.argsort(asset_ids)
+    asset_ids, revenue = asset_ids[order], revenue[order]
+
+    holder_assets = np.asarray(holders["asset_id"], dtype=np.int64)
+    group = np.searchsorted(asset_ids, holder_assets)
+    # Address rank. Unicode, not bytes: a non-ASCII address left by an
+    # old transfer must not fail the whole run
+    addresses = np.asarray(holders["holder_address"], dtype=str)
+    tiebreak = np.empty(len(addresses), dtype=np.intp)
+    tiebreak[np.argsort(addresses, kind="stable")] = np.arange(len(addresses))
+
+    payout = allocate(
+        revenue,
+        group,
+        np.asarray(holders["fraction_amount"], dtype=np.int64),
+        tiebreak
+    )
+
+    held = np.zeros(len(asset_ids), dtype=bool)
+    held[group] = True
+    return {
+        "group_order": np.lexsort((tiebreak, group)),
+        "payout": payout,
+        "unallocated_assets": asset_ids[~held & (revenue > 0)].tolist()
+    }
+
+
+def write_payout_file(
+    path: Path,
+    holders: Dict[str, list],
+    distribution: dict,
+    decimals: int = 2,
+    batch_size: int = PAYOUT_BATCH_SIZE
+) -> int:
+    """
+    Write non-zero payouts to CSV, grouped by asset, in numbered batches.
+
+    Returns the number of batches written.
+    """
+    payout = distribution["payout"]
+    order = distribution["group_order"]
+    order = order[payout[order] > 0]
+    amounts = payout.tolist()
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["batch", "asset_id", "holder_address", "holder_label", "amount"])
+        for start in range(0, len(order), batch_size):
+            batch = start // batch_size + 1
+            writer.writerows(
+                (
+                    batch,
+                    holders["asset_id"][i],
+                    holders["holder_address"][i],
+                    holders["holder_label"][i] or "",
+                    format_minor_units(amounts[i], decimals)
+                )
+                for i in order[start:start + batch_size].tolist()
+            )
+
+    return -(-len(order) // batch_size)
+
+
+def payout_file_path(period: str) -> Path:
+    """Payout file location for a period label."""
+    safe_period = re.sub(r"[^A-Za-z0-9_.-]", "_", period)
+    return PAYOUT_DIR / f"payouts_{safe_period}.csv"
+
+
+def run_payouts(
+    db: Session,
+    period: str,
+    revenues: Dict[int, Decimal],
+    as_of: Optional[datetime] = None,
+    decimals: int = 2
+) -> dict:
+    """
+    Distribute revenue for a period and write the batched payout file.
+
+    Raises ValueError for revenue amounts that cannot be represented
+    exactly in minor units.
+    """
+    minor = {asset_id: to_minor_units(amount, decimals) for asset_id, amount in revenues.items()}
+    holders = load_holdings(db, minor.keys(), as_of)
+    distribution = compute_distribution(minor, holders)
+
+    path = payout_file_path(period)
+    batches = write_payout_file(path, holders, distribution, decimals)
+    payout = distribution["payout"]
+
+    return {
+        "period": period,
+        "asset_count": len(minor),
+        "holder_count": int(np.count_nonzero(payout)),
+        "total_distributed": format_minor_units(int(payout.sum()), decimals),
+        "batches": batches,
+        "unallocated_assets": distribution["unallocated_assets"],
+        "file": path.name
+    }
+
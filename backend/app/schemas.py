@@ -1,9 +1,15 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
+import re
+
+from pydantic import BaseModel, Field, field_validator
+from typing import Optional, List, Dict
+from decimal import Decimal
 from datetime import datetime
 from enum import Enum
 
 
+ADDRESS_PATTERN = re.compile(r"0x[0-9a-f]{40}")
+
+
 class SettlementRule(str, Enum):
     IMMEDIATE = "IMMEDIATE"
     ON_FIRST_PLAY = "ON_FIRST_PLAY"
@@ -56,6 +62,24 @@ class AssetResponse(BaseModel):
         from_attributes = True
 
 
+class AssetSearchResponse(BaseModel):
+    total: int
+    results: List[AssetResponse]
+    facets: Dict[str, Dict[str, int]]  # facet -> value -> count
+
+
+class ExcerptMatch(BaseModel):
+    asset_id: int
+    title: Optional[str]
+    offset_seconds: float  # where the excerpt starts within the asset
+    score: int  # landmarks agreeing on that offset
+    confidence: float
+
+
+class ExcerptMatchResponse(BaseModel):
+    matches: List[ExcerptMatch]
+
+
 class CustodyEventResponse(BaseModel):
     id: int
     asset_id: int
@@ -115,6 +139,39 @@ class FractionalizeRequest(BaseModel):
     price_per_fraction: Optional[float] = None
 
 
+class FractionTransferRequest(BaseModel):
+    from_address: str
+    to_address: str
+    to_label: Optional[str] = None
+    amount: int = Field(ge=1)
+
+    @field_validator("from_address", "to_address")
+    @classmethod
+    def normalize_address(cls, value: str) -> str:
+        # One holder per address: casing and whitespace variants are the same wallet
+        address = value.strip().lower()
+        if not ADDRESS_PATTERN.fullmatch(address):
+            raise ValueError("must be a 0x-prefixed 40-hex-digit address")
+        return address
+
+
+class PayoutRunRequest(BaseModel):
+    period: str = Field(min_length=1, max_length=64)
+    revenues: Dict[int, Decimal]  # asset_id -> revenue for the period
+    as_of: Optional[datetime] = None  # cap table date; defaults to current holdings
+    currency_decimals: int = Field(2, ge=0, le=18)
+
+
+class PayoutRunResponse(BaseModel):
+    period: str
+    asset_count: int
+    holder_count: int
+    total_distributed: str
+    batches: int
+    unallocated_assets: List[int]
+    file: str
+
+
 class KYCSubmit(BaseModel):
     wallet_address: str
     country_code: str
@@ -128,3 +185,48 @@ class KYCResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class KYCBatchRequest(BaseModel):
+    wallet_addresses: List[str] = Field(min_length=1, max_length=10000)
+
+
+class KYCScreenResult(BaseModel):
+    wallet_address: str
+    status: str  # PENDING, VERIFIED, REJECTED, NOT_FOUND
+    verification_level: int
+    country_code: Optional[str]
+    restricted: bool
+    eligible: bool
+
+
+class KYCBatchResponse(BaseModel):
+    results: List[KYCScreenResult]
+    eligible_count: int
+
+
+class ImportJobResponse(BaseModel):
+    id: int
+    status: str  # PENDING, RUNNING, COMPLETED, FAILED
+    manifest_name: Optional[str]
+    total_rows: int
+    imported_rows: int
+    analyzed_rows: int
+    failed_rows: int
+    error: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+
+class ImportRowResponse(BaseModel):
+    row_number: int
+    status: str  # PENDING, IMPORTED, ANALYZED, FAILED
+    asset_id: Optional[int]
+    error: Optional[str]
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,229 @@
+"""
+Full-text and faceted search over the asset registry.
+
+The text index is chosen by database backend: an external-content FTS5 table
+on SQLite, a generated tsvector column with a GIN index on Postgres. Both are
+kept current by the database itself on insert/update/delete, as are the
+per-value counts in `asset_facet_counts` that answer unfiltered facet queries
+without scanning `assets`.
+"""
+
+import re
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, column, func, literal_column, table, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from .models import Asset, AssetFacetCount
+
+# Facet name -> asset column
+FACETS = {
+    "year": Asset.year,
+    "clearance_status": Asset.clearance_status,
+    "settlement_rule": Asset.settlement_rule,
+    "fractionalized": Asset.is_fractionalized,
+}
+
+FACET_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_assets_year ON assets (year)",
+    "CREATE INDEX IF NOT EXISTS ix_assets_clearance_status ON assets (clearance_status)",
+    "CREATE INDEX IF NOT EXISTS ix_assets_settlement_rule ON assets (settlement_rule)",
+    "CREATE INDEX IF NOT EXISTS ix_assets_is_fractionalized ON assets (is_fractionalized)",
+    "CREATE INDEX IF NOT EXISTS ix_assets_created_at ON assets (created_at)",
+]
+
+# (facet, SQL expression over a row alias) for trigger bodies
+_FACET_EXPRESSIONS = [
+    ("year", "CAST({row}.year AS TEXT)"),
+    ("clearance_status", "COALESCE({row}.clearance_status, '')"),
+    ("settlement_rule", "COALESCE({row}.settlement_rule, '')"),
+    ("fractionalized", "CAST(COALESCE({row}.is_fractionalized, 0) AS TEXT)"),
+]
+
+_FACET_COLUMNS = "year, clearance_status, settlement_rule, is_fractionalized"
+
+assets_fts = table("assets_fts", column("rowid"), column("rank"))
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _facet_upserts(row: str, delta: str) -> List[str]:
+    return [
+        f"INSERT INTO asset_facet_counts (facet, value, count) "
+        f"VALUES ('{facet}', {expression.format(row=row)}, {delta}) "
+        f"ON CONFLICT (facet, value) DO UPDATE SET count = asset_facet_counts.count + ({delta});"
+        for facet, expression in _FACET_EXPRESSIONS
+    ]
+
+
+def _facet_rebuild() -> List[str]:
+    return ["DELETE FROM asset_facet_counts"] + [
+        f"INSERT INTO asset_facet_counts (facet, value, count) "
+        f"SELECT '{facet}', {expression.format(row='assets')}, COUNT(*) FROM assets "
+        f"GROUP BY {expression.format(row='assets')}"
+        for facet, expression in _FACET_EXPRESSIONS
+    ]
+
+
+def _sqlite_ddl() -> List[str]:
+    inc, dec = _facet_upserts("new", "1"), _facet_upserts("old", "-1")
+    return [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS assets_fts USING fts5("
+        "title, artist_display, provenance_text, content='assets', content_rowid='id')",
+        "CREATE TRIGGER IF NOT EXISTS assets_search_ai AFTER INSERT ON assets BEGIN "
+        "INSERT INTO assets_fts (rowid, title, artist_display, provenance_text) "
+        "VALUES (new.id, new.title, new.artist_display, new.provenance_text); "
+        + " ".join(inc) + " END",
+        "CREATE TRIGGER IF NOT EXISTS assets_search_ad AFTER DELETE ON assets BEGIN "
+        "INSERT INTO assets_fts (assets_fts, rowid, title, artist_display, provenance_text) "
+        "VALUES ('delete', old.id, old.title, old.artist_display, old.provenance_text); "
+        + " ".join(dec) + " END",
+        "CREATE TRIGGER IF NOT EXISTS assets_search_au "
+        "AFTER UPDATE OF title, artist_display, provenance_text ON assets BEGIN "
+        "INSERT INTO assets_fts (assets_fts, rowid, title, artist_display, provenance_text) "
+        "VALUES ('delete', old.id, old.title, old.artist_display, old.provenance_text); "
+        "INSERT INTO assets_fts (rowid, title, artist_display, provenance_text) "
+        "VALUES (new.id, new.title, new.artist_display, new.provenance_text); END",
+        f"CREATE TRIGGER IF NOT EXISTS assets_facets_au AFTER UPDATE OF {_FACET_COLUMNS} ON assets BEGIN "
+        + " ".join(dec + inc) + " END",
+    ]
+
+
+def _postgres_ddl() -> List[str]:
+    inc, dec = _facet_upserts("NEW", "1"), _facet_upserts("OLD", "-1")
+    return [
+        "ALTER TABLE assets ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(artist_display, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(provenance_text, '')), 'C')) STORED",
+        "CREATE INDEX IF NOT EXISTS ix_assets_search_vector ON assets USING GIN (search_vector)",
+        "CREATE OR REPLACE FUNCTION assets_facet_counts() RETURNS trigger AS $$ BEGIN "
+        "IF TG_OP IN ('UPDATE', 'DELETE') THEN " + " ".join(dec) + " END IF; "
+        "IF TG_OP IN ('UPDATE', 'INSERT') THEN " + " ".join(inc) + " END IF; "
+        "RETURN NULL; END $$ LANGUAGE plpgsql",
+        "DROP TRIGGER IF EXISTS assets_facets_aiud ON assets",
+        "CREATE TRIGGER assets_facets_aiud AFTER INSERT OR DELETE OR "
+        f"UPDATE OF {_FACET_COLUMNS} ON assets FOR EACH ROW EXECUTE FUNCTION assets_facet_counts()",
+    ]
+
+
+def install_search(engine: Engine):
+    """
+    Create the text index, facet indexes and maintenance triggers.
+
+    Idempotent. The first install on an existing database also backfills the
+    text index and facet counts from the rows already in `assets`.
+    """
+    dialect = engine.dialect.name
+    with engine.begin() as conn:
+        if dialect == "sqlite":
+            fresh = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'assets_fts'"
+            )).first() is None
+            statements = _sqlite_ddl()
+            if fresh:
+                statements.append("INSERT INTO assets_fts (assets_fts) VALUES ('rebuild')")
+        elif dialect == "postgresql":
+            fresh = conn.execute(text(
+                "SELECT 1 FROM pg_trigger WHERE tgname = 'assets_facets_aiud'"
+            )).first() is None
+            statements = _postgres_ddl()
+        else:
+            raise RuntimeError(f"Asset search is not supported on {dialect}")
+
+        statements += FACET_INDEXES
+        if fresh:
+            statements += _facet_rebuild()
+        for statement in statements:
+            conn.exec_driver_sql(statement)
+
+
+def _fts5_query(q: str) -> Optional[str]:
+    # Quote every token so user input can't inject FTS5 syntax; prefix-match the last
+    tokens = _TOKEN_RE.findall(q)
+    if not tokens:
+        return None
+    quoted = [f'"{token}"' for token in tokens]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def _filters(filters: Dict[str, object]) -> list:
+    clauses = []
+    for name, value in filters.items():
+        if value is None:
+            continue
+        if name == "fractionalized":
+            value = int(bool(value))
+        clauses.append(FACETS[name] == value)
+    return clauses
+
+
+def _facet_key(name: str, value) -> str:
+    if name == "fractionalized":
+        return "true" if str(value) not in ("0", "") else "false"
+    return str(value)
+
+
+def search_assets(
+    db: Session,
+    q: Optional[str] = None,
+    filters: Optional[Dict[str, object]] = None,
+    limit: int = 50,
+    offset: int = 0
+) -> dict:
+    """
+    Search assets by text and facet filters.
+
+    Returns {"total", "results", "facets"}; results are relevance-ordered
+    when `q` is given, newest first otherwise. Facet counts reflect the
+    text query and all filters.
+    """
+    clauses = _filters(filters or {})
+    dialect = db.get_bind().dialect.name
+
+    query = db.query(Asset)
+    rank = None
+    matched = False
+    if q and q.strip():
+        if dialect == "sqlite":
+            match = _fts5_query(q)
+            if match is None:
+                return {"total": 0, "results": [], "facets": {name: {} for name in FACETS}}
+            query = query.join(assets_fts, assets_fts.c.rowid == Asset.id)
+            clauses.append(text("assets_fts MATCH :match").bindparams(match=match))
+            rank = assets_fts.c.rank.asc()
+        else:
+            tsquery = func.websearch_to_tsquery("english", q)
+            vector = literal_column("assets.search_vector")
+            clauses.append(vector.op("@@")(tsquery))
+            rank = func.ts_rank(vector, tsquery).desc()
+        matched = True
+
+    if clauses:
+        query = query.filter(and_(*clauses))
+
+    ordering = [rank, Asset.id.desc()] if rank is not None else [Asset.created_at.desc(), Asset.id.desc()]
+    results = query.order_by(*ordering).offset(offset).limit(limit).all()
+
+    facets = {name: {} for name in FACETS}
+    if not matched and not clauses:
+        # Unfiltered: read the trigger-maintained counts instead of scanning
+        rows = db.query(AssetFacetCount).filter(AssetFacetCount.count > 0).all()
+        for row in rows:
+            facets[row.facet][_facet_key(row.facet, row.value)] = row.count
+        total = sum(facets["clearance_status"].values())
+    else:
+        # One pass over the matches grouped by every facet column at once;
+        # the combinations are few, so rolling them up here is cheap
+        columns = list(FACETS.values())
+        combos = query.with_entities(*columns, func.count()).order_by(None).group_by(*columns).all()
+        total = 0
+        for *values, count in combos:
+            total += count
+            for name, value in zip(FACETS, values):
+                key = _facet_key(name, value)
+                facets[name][key] = facets[name].get(key, 0) + count
+
+    return {"total": total, "results": results, "facets": facets}
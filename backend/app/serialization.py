@@ -0,0 +1,125 @@
+"""
+Fast path for large list responses.
+
+Routes returning thousands of rows skip ORM object loading and per-row
+Pydantic validation: `Columns` selects just the columns a response schema
+exposes, as plain row tuples, and `encode` renders the resulting dicts with
+orjson, or as MessagePack when msgpack is installed and the client's
+Accept header prefers it to JSON (q-values, then listing order). Routes keep their
+`response_model` for the OpenAPI schema; the output matches it field for
+field.
+"""
+
+from datetime import date
+from typing import Any, Iterable, List, Sequence, Tuple, Type
+
+from fastapi import Request
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+class Columns:
+    """
+    The columns of `model` named by the fields of `schema`, in schema order.
+    Query with `db.query(*cols.columns)` and pass the rows to `dicts`.
+    """
+
+    def __init__(self, model: Type, schema: Type[BaseModel]):
+        self.fields = tuple(schema.model_fields)
+        self.columns = [getattr(model, name) for name in self.fields]
+        # Integer flag columns the schema declares as bool
+        self._bools = [
+            i for i, name in enumerate(self.fields)
+            if schema.model_fields[name].annotation is bool
+        ]
+
+    def dicts(self, rows: Iterable[Sequence]) -> List[dict]:
+        fields = self.fields
+        if not self._bools:
+            return [dict(zip(fields, row)) for row in rows]
+        out = []
+        for row in rows:
+            values = list(row)
+            for i in self._bools:
+                values[i] = bool(values[i])
+            out.append(dict(zip(fields, values)))
+        return out
+
+
+def _msgpack_default(value: Any):
+    # Same representation as the JSON body
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _media_ranges(accept: str) -> List[Tuple[str, float]]:
+    """(media range, q) pairs of an Accept header, in listing order."""
+    ranges = []
+    for part in accept.split(","):
+        media_range, *params = [item.strip() for item in part.split(";")]
+        if not media_range:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = min(1.0, max(0.0, float(value)))
+                except ValueError:
+                    q = 0.0
+        ranges.append((media_range.lower(), q))
+    return ranges
+
+
+def _preference(ranges: List[Tuple[str, float]], media_type: str) -> Tuple[float, int]:
+    """
+    (q, -position) from the most specific range matching `media_type`;
+    q is 0 when nothing matches. Higher is preferred.
+    """
+    best = None
+    for position, (media_range, q) in enumerate(ranges):
+        if media_range == media_type:
+            specificity = 2
+        elif media_range == media_type.split("/")[0] + "/*":
+            specificity = 1
+        elif media_range == "*/*":
+            specificity = 0
+        else:
+            continue
+        if best is None or specificity > best[0]:
+            best = (specificity, q, position)
+    if best is None:
+        return 0.0, -len(ranges)
+    return best[1], -best[2]
+
+
+def wants_msgpack(request: Request) -> bool:
+    """
+    MessagePack if it has a non-zero q-value above JSON's, or an equal one
+    and is listed first. A missing header or `*/*` gets JSON.
+    """
+    if msgpack is None:
+        return False
+    ranges = _media_ranges(request.headers.get("accept", ""))
+    packed = max(_preference(ranges, media_type) for media_type in MSGPACK_TYPES)
+    return packed[0] > 0 and packed > _preference(ranges, "application/json")
+
+
+def encode(request: Request, content: Any) -> Response:
+    """Render already-plain content as MessagePack if negotiated, else orjson."""
+    headers = {"Vary": "Accept"}
+    if wants_msgpack(request):
+        return Response(
+            msgpack.packb(content, default=_msgpack_default),
+            media_type=MSGPACK_TYPES[0],
+            headers=headers
+        )
+    return ORJSONResponse(content, headers=headers)
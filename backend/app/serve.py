@@ -0,0 +1,71 @@
+"""
+Production entry point: one-shot schema setup, then N uvicorn workers.
+
+    python -m app.serve migrate                          # schema only, then exit
+    python -m app.serve run --workers 4 --port 8000
+    python -m app.serve run --workers 4 --no-migrate     # a deploy step already migrated
+
+`run` creates the schema once in the parent process, then starts the
+workers with SCHEMA_AUTO_CREATE=0 so they never race on DDL. With more
+than one worker it selects the shared SQLite cache backend (app/cache.py)
+and clears it, switches metrics to per-worker snapshot files summed at
+scrape time (app/metrics.py), and each worker's lifespan joins the
+coordinator election (app/coordinator.py). SIGTERM stops accepting connections, waits for
+in-flight requests, then drains import jobs and SINC analyses.
+"""
+
+import argparse
+import os
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the ISSUANCE API")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("migrate", help="create tables and search indexes")
+
+    run = sub.add_parser("run", help="serve the API with N worker processes")
+    run.add_argument("--host", default="0.0.0.0")
+    run.add_argument("--port", type=int, default=8000)
+    run.add_argument(
+        "--workers", type=int,
+        default=int(os.getenv("WEB_CONCURRENCY") or os.cpu_count() or 1)
+    )
+    run.add_argument("--no-migrate", action="store_true", help="skip the schema step")
+    run.add_argument(
+        "--graceful-timeout", type=int, default=30,
+        help="seconds to wait for in-flight requests on shutdown"
+    )
+    args = parser.parse_args()
+
+    if args.command == "migrate" or not args.no_migrate:
+        from .database import init_schema
+        init_schema()
+    if args.command == "migrate":
+        return
+
+    # Inherited by the worker processes
+    os.environ["SCHEMA_AUTO_CREATE"] = "0"
+    os.environ["WEB_CONCURRENCY"] = str(args.workers)
+    if args.workers > 1:
+        os.environ.setdefault("CACHE_BACKEND", "sqlite")
+        os.environ.setdefault("METRICS_MULTIPROCESS", "1")
+
+    from . import cache, metrics
+    if cache.CACHE_BACKEND == "sqlite":
+        cache.reset_shared()
+    if metrics.METRICS_MULTIPROCESS:
+        metrics.reset_shared()
+
+    import uvicorn
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_graceful_shutdown=args.graceful_timeout,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,506 @@
+"""
+Content-addressed storage for uploaded masters.
+
+Uploads are streamed to a staging file while being hashed, then stored once
+under their SHA-256 in a sharded layout (`ab/cd/abcd...{ext}`), so identical
+masters share bytes and no directory grows past a few thousand entries.
+`stored_objects` counts the assets referencing each object; assets point at
+their audio with a `sha256:<digest>` reference in `file_path`.
+
+Bytes are uploaded before the caller's transaction opens (`BlobWriter.upload`)
+and the reference is taken inside it (`BlobWriter.commit`), so no database
+lock is held during a slow upload. An upload whose transaction rolls back
+leaves an object with no row; `gc` removes those once they are older than
+ORPHAN_GRACE_SECONDS, along with objects no asset references any more.
+
+Backends (STORAGE_BACKEND):
+    local - sharded tree under UPLOAD_DIR (default)
+    s3    - S3-compatible bucket (S3_BUCKET, S3_PREFIX, S3_ENDPOINT_URL for
+            MinIO and similar); requires boto3. Decoders get a local copy
+            from STORAGE_CACHE_DIR.
+
+    python -m app.storage migrate   # move legacy flat uploads into the store
+    python -m app.storage gc        # delete objects no asset references
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+from sqlalchemy import exists, func
+from sqlalchemy.orm import Session
+
+from .models import Asset, StoredObject
+
+UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", Path(__file__).parent.parent / "uploads"))
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local")
+STORAGE_CACHE_DIR = Path(os.getenv("STORAGE_CACHE_DIR") or Path(tempfile.gettempdir()) / "issuance-storage-cache")
+
+CHUNK_SIZE = 1 << 20
+REF_PREFIX = "sha256:"
+
+# Objects without a row are left alone this long, so `gc` never removes the
+# bytes of an upload whose transaction hasn't committed yet
+ORPHAN_GRACE_SECONDS = 3600
+
+# `object_name` output; anything else under the root (legacy flat uploads,
+# staging) is not an object
+OBJECT_NAME = re.compile(r"([0-9a-f]{2})/([0-9a-f]{2})/(\1\2[0-9a-f]{60})(\.[^/]*)?")
+
+AUDIO_MEDIA_TYPES = {
+    ".wav": "audio/wav",
+    ".mp3": "audio/mpeg",
+    ".flac": "audio/flac",
+    ".aiff": "audio/aiff",
+    ".m4a": "audio/mp4",
+}
+AUDIO_EXTENSIONS = set(AUDIO_MEDIA_TYPES)
+
+
+def object_name(digest: str, extension: str) -> str:
+    """Sharded object name for a content hash."""
+    return f"{digest[:2]}/{digest[2:4]}/{digest}{extension}"
+
+
+def is_ref(file_path: Optional[str]) -> bool:
+    return bool(file_path) and file_path.startswith(REF_PREFIX)
+
+
+def _link_or_copy(source: Path, target: Path):
+    """Place `source` at `target` without consuming it (hard link when possible)."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(source, target)
+    except FileExistsError:
+        # Identical content (same name) stored concurrently
+        pass
+    except OSError:
+        with tempfile.NamedTemporaryFile(dir=target.parent, delete=False) as tmp:
+            shutil.copyfile(source, tmp.name)
+        os.replace(tmp.name, target)
+
+
+# ============================================
+# Backends
+# ============================================
+
+class LocalBackend:
+    """Sharded directory tree on the local filesystem."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.staging = self.root / ".staging"
+        self.staging.mkdir(parents=True, exist_ok=True)
+
+    def exists(self, name: str) -> bool:
+        return (self.root / name).exists()
+
+    def put(self, name: str, staged: Path):
+        """Link a fully written staging file into place; the staged file is kept."""
+        _link_or_copy(staged, self.root / name)
+
+    def list_objects(self) -> Iterator[Tuple[str, float]]:
+        """(object name, modification time) of every stored object."""
+        for directory, subdirs, files in os.walk(self.root):
+            if Path(directory) == self.root:
+                subdirs[:] = [d for d in subdirs if d != self.staging.name]
+            for filename in files:
+                path = Path(directory) / filename
+                yield path.relative_to(self.root).as_posix(), path.stat().st_mtime
+
+    def open(self, name: str) -> BinaryIO:
+        return open(self.root / name, "rb")
+
+    def iter_chunks(self, name: str) -> Iterator[bytes]:
+        with self.open(name) as f:
+            while chunk := f.read(CHUNK_SIZE):
+                yield chunk
+
+    def size(self, name: str) -> int:
+        return (self.root / name).stat().st_size
+
+    def delete(self, name: str):
+        (self.root / name).unlink(missing_ok=True)
+
+    def local_path(self, name: str) -> Path:
+        return self.root / name
+
+    def local_file(self, name: str) -> Optional[Path]:
+        """Path servable directly (sendfile), or None for remote backends."""
+        return self.root / name
+
+
+class S3Backend:
+    """
+    S3-compatible bucket. `client` defaults to a boto3 client for
+    `endpoint_url`; any object with the same methods can stand in.
+    """
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None, client=None, cache_dir: Path = STORAGE_CACHE_DIR):
+        if client is None:
+            try:
+                import boto3
+            except ImportError:
+                raise RuntimeError("STORAGE_BACKEND=s3 requires boto3")
+            client = boto3.client("s3", endpoint_url=endpoint_url)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.cache_dir = Path(cache_dir)
+        self.staging = self.cache_dir / ".staging"
+        self.staging.mkdir(parents=True, exist_ok=True)
+
+    def _key(self, name: str) -> str:
+        return self.prefix + name
+
+    @staticmethod
+    def _not_found(error: Exception) -> bool:
+        code = getattr(error, "response", {}).get("Error", {}).get("Code")
+        return code in ("404", "NoSuchKey", "NotFound")
+
+    def exists(self, name: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(name))
+            return True
+        except Exception as e:
+            if self._not_found(e):
+                return False
+            raise
+
+    def put(self, name: str, staged: Path):
+        self.client.upload_file(str(staged), self.bucket, self._key(name))
+        # Keep the staged bytes as the cache entry; SINC reads them right after upload
+        _link_or_copy(staged, self.cache_dir / name)
+
+    def list_objects(self) -> Iterator[Tuple[str, float]]:
+        kwargs = {"Bucket": self.bucket, "Prefix": self.prefix}
+        while True:
+            page = self.client.list_objects_v2(**kwargs)
+            for item in page.get("Contents", ()):
+                yield item["Key"][len(self.prefix):], item["LastModified"].timestamp()
+            if not page.get("IsTruncated"):
+                return
+            kwargs["ContinuationToken"] = page["NextContinuationToken"]
+
+    def open(self, name: str) -> BinaryIO:
+        return self.client.get_object(Bucket=self.bucket, Key=self._key(name))["Body"]
+
+    def iter_chunks(self, name: str) -> Iterator[bytes]:
+        body = self.open(name)
+        try:
+            while chunk := body.read(CHUNK_SIZE):
+                yield chunk
+        finally:
+            body.close()
+
+    def size(self, name: str) -> int:
+        return self.client.head_object(Bucket=self.bucket, Key=self._key(name))["ContentLength"]
+
+    def delete(self, name: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(name))
+        (self.cache_dir / name).unlink(missing_ok=True)
+
+    def local_path(self, name: str) -> Path:
+        """Download into the cache once; objects are immutable, so a cached copy never goes stale."""
+        path = self.cache_dir / name
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=self.staging, delete=False) as tmp:
+                self.client.download_fileobj(self.bucket, self._key(name), tmp)
+            os.replace(tmp.name, path)
+        return path
+
+    def local_file(self, name: str) -> Optional[Path]:
+        return None
+
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def get_storage():
+    """The configured storage backend, created on first use."""
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                if STORAGE_BACKEND == "local":
+                    _storage = LocalBackend(UPLOAD_DIR)
+                elif STORAGE_BACKEND == "s3":
+                    _storage = S3Backend(
+                        os.environ["S3_BUCKET"],
+                        prefix=os.getenv("S3_PREFIX", ""),
+                        endpoint_url=os.getenv("S3_ENDPOINT_URL") or None,
+                    )
+                else:
+                    raise RuntimeError(f"Unknown STORAGE_BACKEND: {STORAGE_BACKEND}")
+    return _storage
+
+
+def set_storage(backend):
+    """Replace the storage backend (benchmarks, alternative deployments)."""
+    global _storage
+    _storage = backend
+
+
+# ============================================
+# Writes and reference counting
+# ============================================
+
+def _acquire(db: Session, digest: str, extension: str, size: int) -> Tuple[str, int]:
+    """Take a reference on an object; returns its (extension, refcount)."""
+    # Insert-or-increment in one statement so concurrent duplicate uploads cannot collide
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        statement = insert(StoredObject).values(sha256=digest, extension=extension, size=size, refcount=1)
+        statement = statement.on_conflict_do_update(
+            index_elements=[StoredObject.sha256],
+            set_={"refcount": StoredObject.refcount + 1},
+        ).returning(StoredObject.extension, StoredObject.refcount)
+        return tuple(db.execute(statement).one())
+
+    stored = db.get(StoredObject, digest, with_for_update=True)
+    if stored is None:
+        stored = StoredObject(sha256=digest, extension=extension, size=size, refcount=0)
+        db.add(stored)
+    stored.refcount += 1
+    db.flush()
+    return stored.extension, stored.refcount
+
+
+class BlobWriter:
+    """
+    Streams an upload to a staging file while hashing it.
+
+        writer = BlobWriter(suffix=".wav")
+        for chunk in chunks:
+            writer.write(chunk)
+        writer.close()                  # optional: `path` is now complete
+        writer.upload(".wav")           # store the bytes, before the transaction
+        with unit_of_work(db):
+            ref = writer.commit(db, ".wav")
+        # on error: writer.abort()
+    """
+
+    def __init__(self, backend=None, suffix: str = ""):
+        self.backend = backend or get_storage()
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._file = tempfile.NamedTemporaryFile(dir=self.backend.staging, suffix=suffix, delete=False)
+        self.path = Path(self._file.name)
+
+    def write(self, chunk: bytes):
+        self._hash.update(chunk)
+        self._file.write(chunk)
+        self.size += len(chunk)
+
+    def close(self):
+        self._file.close()
+
+    def abort(self):
+        self._file.close()
+        self.path.unlink(missing_ok=True)
+
+    @property
+    def digest(self) -> str:
+        return self._hash.hexdigest()
+
+    def upload(self, extension: str):
+        """
+        Store the bytes unless an identical object exists. No database
+        access, so call it before the transaction opens.
+        """
+        self._file.close()
+        name = object_name(self.digest, extension)
+        if not self.backend.exists(name):
+            self.backend.put(name, self.path)
+
+    def commit(self, db: Session, extension: str) -> str:
+        """
+        Take a reference on the uploaded object and return it as a
+        `sha256:` ref. The caller owns the transaction.
+        """
+        self._file.close()
+        digest = self.digest
+        try:
+            stored_extension, refcount = _acquire(db, digest, extension, self.size)
+            if refcount == 1:
+                # New or revived row: `gc` may have removed the bytes since
+                # `upload`; re-store them (rare, and usually a cheap check)
+                name = object_name(digest, stored_extension)
+                if not self.backend.exists(name):
+                    self.backend.put(name, self.path)
+        finally:
+            self.path.unlink(missing_ok=True)
+        return REF_PREFIX + digest
+
+
+def stage_file(path: Path, extension: str, backend=None) -> BlobWriter:
+    """
+    Hash and upload a local file; `commit` the returned writer inside the
+    transaction that records the reference (or `abort` it).
+    """
+    writer = BlobWriter(backend)
+    try:
+        with open(path, "rb") as f:
+            while chunk := f.read(CHUNK_SIZE):
+                writer.write(chunk)
+        writer.upload(extension)
+    except Exception:
+        writer.abort()
+        raise
+    return writer
+
+
+def store_file(db: Session, path: Path, extension: str, backend=None) -> str:
+    """Store a local file by content; returns its `sha256:` ref."""
+    writer = stage_file(path, extension, backend)
+    try:
+        return writer.commit(db, extension)
+    except Exception:
+        writer.abort()
+        raise
+
+
+# ============================================
+# Reads
+# ============================================
+
+def resolve(db: Session, file_path: Optional[str]):
+    """
+    (backend, object name, StoredObject) for an asset's `file_path`, or None.
+
+    Legacy plain paths resolve to (None, path, None).
+    """
+    if not file_path:
+        return None
+    if not is_ref(file_path):
+        return (None, file_path, None) if Path(file_path).exists() else None
+
+    stored = db.get(StoredObject, file_path[len(REF_PREFIX):])
+    if stored is None:
+        return None
+    backend = get_storage()
+    name = object_name(stored.sha256, stored.extension)
+    return backend, name, stored
+
+
+def local_audio_path(db: Session, file_path: Optional[str]) -> Optional[Path]:
+    """A local filesystem path for decoding an asset's audio, or None if missing."""
+    resolved = resolve(db, file_path)
+    if resolved is None:
+        return None
+    backend, name, _ = resolved
+    if backend is None:
+        return Path(name)
+    return backend.local_path(name) if backend.exists(name) else None
+
+
+# ============================================
+# Maintenance
+# ============================================
+
+def migrate_legacy(db: Session) -> int:
+    """Move flat `{hex}{ext}` uploads into the store and rewrite asset refs."""
+    by_path = {}
+    assets = db.query(Asset).filter(Asset.file_path.isnot(None), ~Asset.file_path.startswith(REF_PREFIX)).all()
+    for asset in assets:
+        by_path.setdefault(asset.file_path, []).append(asset)
+
+    migrated = 0
+    for file_path, referencing in by_path.items():
+        path = Path(file_path)
+        if not path.exists():
+            continue
+        ref = store_file(db, path, path.suffix.lower())
+        stored = db.get(StoredObject, ref[len(REF_PREFIX):])
+        stored.refcount += len(referencing) - 1
+        for asset in referencing:
+            asset.file_path = ref
+        db.commit()
+        path.unlink()
+        migrated += 1
+    return migrated
+
+
+def collect_garbage(db: Session, grace_seconds: float = ORPHAN_GRACE_SECONDS) -> int:
+    """
+    Delete objects no asset references; returns how many.
+
+    Refcounts are reconciled with the assets' `file_path` refs, so objects
+    of assets removed by any means are collected. Objects with no row at
+    all (an upload whose transaction rolled back) are deleted once older
+    than `grace_seconds`.
+    """
+    backend = get_storage()
+    referenced = dict(
+        db.query(Asset.file_path, func.count(Asset.id))
+        .filter(Asset.file_path.startswith(REF_PREFIX))
+        .group_by(Asset.file_path)
+    )
+    candidates = []
+    for stored in db.query(StoredObject):
+        refcount = referenced.get(REF_PREFIX + stored.sha256, 0)
+        stored.refcount = refcount
+        if refcount == 0:
+            candidates.append((stored.sha256, object_name(stored.sha256, stored.extension)))
+    db.commit()
+
+    removed = 0
+    for digest, name in candidates:
+        # Re-checked in the DELETE itself: an upload may have referenced the
+        # object since. Deleting the row first takes its lock, so a
+        # concurrent upload of the same content waits, then re-inserts the
+        # row and re-stores the bytes
+        deleted = db.query(StoredObject).filter(
+            StoredObject.sha256 == digest,
+            ~exists().where(Asset.file_path == REF_PREFIX + digest)
+        ).delete(synchronize_session=False)
+        if deleted:
+            backend.delete(name)
+            removed += 1
+        db.commit()
+
+    cutoff = time.time() - grace_seconds
+    for name, modified in list(backend.list_objects()):
+        match = OBJECT_NAME.fullmatch(name)
+        if match is None or modified > cutoff:
+            continue
+        stored = db.get(StoredObject, match.group(3))
+        if stored is None or object_name(stored.sha256, stored.extension) != name:
+            backend.delete(name)
+            removed += 1
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain content-addressed upload storage")
+    parser.add_argument("command", choices=["migrate", "gc"])
+    args = parser.parse_args()
+
+    from .database import SessionLocal, init_schema
+
+    init_schema()
+    db = SessionLocal()
+    try:
+        if args.command == "migrate":
+            print(f"migrated {migrate_legacy(db)} uploads")
+        else:
+            print(f"removed {collect_garbage(db)} unreferenced objects")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# ISSUANCE Benchmarks
@@ -0,0 +1,50 @@
+"""
+Compare two benchmark result files.
+
+    cd backend && python -m benchmarks.compare baseline.json candidate.json --threshold 10
+
+Exits non-zero if any scenario's p95 regressed by more than the threshold
+percentage.
+"""
+
+import argparse
+import json
+import sys
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed p95 regression in percent")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    print(f"baseline  {baseline['meta'].get('git_revision')}  candidate  {candidate['meta'].get('git_revision')}")
+    regressions = []
+    for name in sorted(set(baseline["results"]) | set(candidate["results"])):
+        old = baseline["results"].get(name, {})
+        new = candidate["results"].get(name, {})
+        if "p95_ms" not in old or "p95_ms" not in new:
+            print(f"{name:32s} (not comparable)")
+            continue
+
+        deltas = []
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            change = (new[key] - old[key]) / old[key] * 100 if old[key] else 0.0
+            deltas.append(f"{key[:3]} {old[key]:9.2f} -> {new[key]:9.2f} ({change:+6.1f}%)")
+            if key == "p95_ms" and change > args.threshold:
+                regressions.append(name)
+        print(f"{name:32s} " + "  ".join(deltas))
+
+    if regressions:
+        print(f"\nRegressed beyond {args.threshold}% p95: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
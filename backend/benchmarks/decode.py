@@ -0,0 +1,76 @@
+"""
+SINC decode path timing: legacy librosa.load vs sinc.decode backends.
+
+    cd backend && python -m benchmarks.decode --lengths 30,180 --iterations 5
+
+Each row decodes a synthetic 44.1 kHz stereo WAV to 22050 Hz mono. Rows
+whose backend or resampler is not installed are reported as skipped.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from sinc import decode as sinc_decode  # noqa: E402
+
+from .fakes import synthetic_wav  # noqa: E402
+from .harness import measure  # noqa: E402
+
+SR = 22050
+
+VARIANTS = [
+    ("soundfile", "soxr_hq", None),
+    ("soundfile", "soxr_lq", None),
+    ("soundfile", "polyphase", None),
+    ("soundfile", "linear", None),
+    ("soundfile", "soxr_hq", 30.0),
+    ("ffmpeg", None, None),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lengths", default="30,180", help="comma-separated seconds")
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+
+    # What SINC no longer pays at module import: librosa plus numba JIT on first feature call
+    start = time.perf_counter()
+    import librosa
+    librosa.feature.mfcc(y=np.zeros(SR, dtype=np.float32), sr=SR)
+    print(f"librosa first use (import + JIT): {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for seconds in [float(x) for x in args.lengths.split(",") if x]:
+            path = Path(tmp) / f"{seconds}.wav"
+            path.write_bytes(synthetic_wav(seconds))
+            print(f"\n{seconds:.0f}s stereo 44.1kHz WAV")
+
+            legacy = measure(lambda i: librosa.load(str(path), sr=SR, mono=True), args.iterations)
+            print(f"  {'librosa.load (legacy)':34s} p50 {legacy['p50_ms']:8.1f}ms")
+
+            for backend, resampler, max_duration in VARIANTS:
+                label = f"{backend}/{resampler or 'native'}" + (f" first {max_duration:.0f}s" if max_duration else "")
+                if backend not in sinc_decode.available_backends():
+                    print(f"  {label:34s} skipped (backend unavailable)")
+                    continue
+                try:
+                    stats = measure(
+                        lambda i: sinc_decode.decode(str(path), SR, max_duration, backend, resampler),
+                        args.iterations,
+                    )
+                except ImportError as e:
+                    print(f"  {label:34s} skipped ({e})")
+                    continue
+                speedup = legacy["p50_ms"] / stats["p50_ms"] if stats["p50_ms"] else float("inf")
+                print(f"  {label:34s} p50 {stats['p50_ms']:8.1f}ms  ({speedup:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
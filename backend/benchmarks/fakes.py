@@ -0,0 +1,123 @@
+"""
+In-process stand-ins for external systems used by the benchmark suite.
+"""
+
+import hashlib
+import io
+import shutil
+import time
+import wave
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+
+class FakeChain:
+    """Drop-in for `BlockchainRegistry` that confirms instantly (or after `latency`)."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.registered = {}
+
+    def is_available(self) -> bool:
+        return True
+
+    def register_asset(self, asset_id, fingerprint_hash, owner_address=None, consent_flags=0xFF):
+        if self.latency:
+            time.sleep(self.latency)
+        tx_hash = "0x" + hashlib.sha256(f"{asset_id}:{fingerprint_hash}".encode()).hexdigest()
+        self.registered[asset_id] = (fingerprint_hash, tx_hash)
+        return tx_hash
+
+    def get_asset(self, asset_id):
+        entry = self.registered.get(asset_id)
+        if not entry:
+            return None
+        return {"fingerprintHash": entry[0], "owner": None, "consentFlags": 0xFF, "timestamp": 0}
+
+
+def synthetic_signal(seconds: float, sr: int = 44100, seed: int = 0) -> np.ndarray:
+    """Deterministic stereo test signal: a few drifting partials plus noise."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr)) / sr
+    tone = sum(
+        np.sin(2 * np.pi * (f0 + 3 * np.sin(0.5 * t)) * t) / (k + 1)
+        for k, f0 in enumerate(rng.uniform(110, 880, size=4))
+    )
+    noise = rng.normal(0, 0.05, size=(2, len(t)))
+    return np.clip(0.3 * tone + noise, -1.0, 1.0).astype(np.float32)
+
+
+def synthetic_wav(seconds: float, sr: int = 44100, seed: int = 0) -> bytes:
+    """16-bit stereo PCM WAV bytes."""
+    pcm = (synthetic_signal(seconds, sr, seed).T * 32767).astype("<i2")
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(2)
+        w.setsampwidth(2)
+        w.setframerate(sr)
+        w.writeframes(pcm.tobytes())
+    return buf.getvalue()
+
+
+def synthetic_flac(seconds: float, sr: int = 44100, seed: int = 0) -> bytes:
+    """FLAC bytes; requires soundfile (raises ImportError otherwise)."""
+    import soundfile
+
+    buf = io.BytesIO()
+    soundfile.write(buf, synthetic_signal(seconds, sr, seed).T, sr, format="FLAC")
+    return buf.getvalue()
+
+
+class FakeS3Error(Exception):
+    def __init__(self, code: str):
+        super().__init__(code)
+        self.response = {"Error": {"Code": code}}
+
+
+class FakeS3Client:
+    """
+    Directory-backed stand-in for the boto3 S3 client methods `S3Backend`
+    uses, for exercising the S3 path without MinIO.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def _path(self, bucket, key):
+        return self.root / bucket / key
+
+    def head_object(self, Bucket, Key):
+        path = self._path(Bucket, Key)
+        if not path.exists():
+            raise FakeS3Error("404")
+        return {"ContentLength": path.stat().st_size}
+
+    def upload_file(self, filename, bucket, key):
+        path = self._path(bucket, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(filename, path)
+
+    def get_object(self, Bucket, Key):
+        self.head_object(Bucket, Key)
+        return {"Body": open(self._path(Bucket, Key), "rb")}
+
+    def download_fileobj(self, bucket, key, fileobj):
+        with self.get_object(bucket, key)["Body"] as body:
+            shutil.copyfileobj(body, fileobj)
+
+    def delete_object(self, Bucket, Key):
+        self._path(Bucket, Key).unlink(missing_ok=True)
+
+    def list_objects_v2(self, Bucket, Prefix="", ContinuationToken=None):
+        bucket = self.root / Bucket
+        contents = [
+            {
+                "Key": path.relative_to(bucket).as_posix(),
+                "LastModified": datetime.fromtimestamp(path.stat().st_mtime, timezone.utc),
+            }
+            for path in sorted(bucket.rglob("*"))
+            if path.is_file() and path.relative_to(bucket).as_posix().startswith(Prefix)
+        ]
+        return {"Contents": contents, "IsTruncated": False}
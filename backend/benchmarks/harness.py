@@ -0,0 +1,78 @@
+"""
+Timing and reporting helpers shared by the benchmark suite.
+"""
+
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+
+def summarize(samples: List[float], wall_seconds: float) -> Dict[str, float]:
+    """Latency percentiles (ms) and throughput (ops/s) for a list of sample durations."""
+    values = np.asarray(samples) * 1000
+    return {
+        "n": len(samples),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "mean_ms": round(float(values.mean()), 3),
+        "max_ms": round(float(values.max()), 3),
+        "throughput_per_s": round(len(samples) / wall_seconds, 2) if wall_seconds > 0 else None,
+    }
+
+
+def measure(fn: Callable[[int], object], iterations: int, warmup: int = 1) -> Dict[str, float]:
+    """
+    Call fn(i) `iterations` times after `warmup` unrecorded calls.
+
+    Raises if a call returns an HTTP response with an error status, so a
+    broken endpoint can't masquerade as a fast one.
+    """
+    for i in range(warmup):
+        _check(fn(-1 - i))
+
+    samples = []
+    wall_start = time.perf_counter()
+    for i in range(iterations):
+        start = time.perf_counter()
+        _check(fn(i))
+        samples.append(time.perf_counter() - start)
+    return summarize(samples, time.perf_counter() - wall_start)
+
+
+def _check(result):
+    status = getattr(result, "status_code", None)
+    if status is not None and status >= 400:
+        raise RuntimeError(f"Benchmark request failed with {status}: {result.text[:200]}")
+
+
+def environment() -> Dict[str, str]:
+    """Metadata identifying the code and machine a result came from."""
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = "unknown"
+
+    return {
+        "git_revision": revision,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+    }
+
+
+def write_results(path: Path, meta: Dict[str, object], results: Dict[str, dict]):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2, sort_keys=True)
@@ -0,0 +1,107 @@
+"""
+Database round-trip budgets for the write endpoints.
+
+Calls each endpoint in-process against a scratch SQLite database and reads
+the `X-DB-Queries` / `X-DB-Commits` headers MetricsMiddleware adds when
+EXPOSE_QUERY_COUNT=1. `tests/test_roundtrips.py` asserts the budgets, so a
+change that adds round trips fails the test suite; run as a script it
+prints the counts and exits non-zero when an endpoint is over budget.
+
+    cd backend && python -m benchmarks.roundtrips
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from .fakes import FakeChain, synthetic_wav
+
+AUTH = {"Authorization": "Bearer VAULT-2024"}
+VAULT = "0x0000000000000000000000000000000000000000"
+HOLDER = "0x00000000000000000000000000000000000000aa"
+
+# endpoint: (max queries, max commits); issue and fractionalize include
+# one batched asset_events INSERT
+BUDGETS = {
+    "issue": (6, 1),
+    "settlement": (2, 1),
+    "fractionalize": (6, 1),
+    "transfer": (5, 1),
+    "kyc.submit": (2, 1),
+    "kyc.verify": (2, 1),
+    "admin.tokens": (1, 1),
+}
+
+
+def observe(client) -> dict:
+    """
+    {endpoint: (queries, commits)} for one call of each endpoint. `client`
+    is a TestClient for an app started with EXPOSE_QUERY_COUNT=1 and a
+    fake chain. Fractionalize and transfer are skipped when the uploaded
+    audio doesn't clear.
+    """
+    def call(method, url, **kwargs):
+        response = client.request(method, url, headers=AUTH, **kwargs)
+        response.raise_for_status()
+        return response
+
+    observed = {}
+
+    def record(name, response):
+        observed[name] = (int(response.headers["x-db-queries"]), int(response.headers["x-db-commits"]))
+        return response.json()
+
+    asset = record("issue", call(
+        "POST", "/api/assets/issue",
+        data={"title": "Budget", "artist_display": "Bench", "year": 2024, "settlement_rule": "ON_TRANSFER"},
+        files={"audio_file": ("budget.wav", synthetic_wav(3))},
+    ))
+    record("settlement", call("POST", f"/api/assets/{asset['id']}/settlement", json={"kind": "PLAY"}))
+    if asset["clearance_status"] == "CLEARED":
+        record("fractionalize", call("POST", f"/api/assets/{asset['id']}/fractionalize", json={"fraction_count": 1000}))
+        call("POST", f"/api/assets/{asset['id']}/fractions/transfer", json={"from_address": VAULT, "to_address": HOLDER, "amount": 1})
+        record("transfer", call(
+            "POST", f"/api/assets/{asset['id']}/fractions/transfer",
+            json={"from_address": VAULT, "to_address": HOLDER, "amount": 1},
+        ))
+    record("kyc.submit", call("POST", "/api/kyc/submit", json={"wallet_address": HOLDER, "country_code": "US"}))
+    record("kyc.verify", call("POST", f"/api/kyc/{HOLDER}/verify"))
+    record("admin.tokens", call("POST", "/api/admin/tokens"))
+    return observed
+
+
+def within_budget(name: str, queries: int, commits: int) -> bool:
+    max_queries, max_commits = BUDGETS[name]
+    return queries <= max_queries and commits <= max_commits
+
+
+def main():
+    workdir = tempfile.mkdtemp(prefix="issuance-roundtrips-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/roundtrips.db"
+    os.environ["UPLOAD_DIR"] = str(Path(workdir) / "uploads")
+    os.environ["FEATURE_DIR"] = str(Path(workdir) / "features")
+    os.environ["EXPOSE_QUERY_COUNT"] = "1"
+
+    from fastapi.testclient import TestClient
+    from app import main as api
+    from app.database import init_schema
+
+    # No lifespan (and so no coordinator thread) in the measured process
+    init_schema()
+    api.blockchain_registry = FakeChain()
+    observed = observe(TestClient(api.app))
+
+    over = False
+    for name, (queries, commits) in observed.items():
+        max_queries, max_commits = BUDGETS[name]
+        ok = within_budget(name, queries, commits)
+        over |= not ok
+        print(f"{name:14s} queries {queries:3d}/{max_queries:<3d} commits {commits}/{max_commits}  {'ok' if ok else 'OVER BUDGET'}")
+    for name in BUDGETS.keys() - observed.keys():
+        print(f"{name:14s} skipped")
+    sys.exit(1 if over else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Serialization cost of large list responses.
+
+Seeds a scratch SQLite catalog and times producing the `GET /api/assets`
+body both ways, database fetch included:
+
+    pydantic  - ORM objects, `AssetResponse` validation, stdlib json
+                (what FastAPI does for a returned list with response_model)
+    columns   - column tuples from `Columns`, orjson
+    msgpack   - column tuples, MessagePack (if msgpack is installed)
+
+Prints milliseconds per 10k assets and body size, best of --repeat runs.
+
+    cd backend && python -m benchmarks.serialization --assets 10000
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+import orjson
+
+
+def seed(n_assets: int):
+    from app.database import SessionLocal, init_schema
+    from app.models import Asset
+
+    init_schema()
+    db = SessionLocal()
+    try:
+        db.add_all([
+            Asset(
+                title=f"Track {i}", artist_display=f"Artist {i % 97}", year=2000 + i % 25, edition_total=1,
+                duration_seconds=180.0 + i % 60, provenance_text=f"Master tape {i}", risk_score=0.05,
+                clearance_status="CLEARED", fingerprint_hash=f"{i:064x}", chain_tx_hash=f"0x{i:064x}",
+                created_at=datetime(2024, 1, 1), updated_at=datetime(2024, 1, 1)
+            )
+            for i in range(n_assets)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--assets", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="issuance-serialization-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/serialization.db"
+    os.environ["UPLOAD_DIR"] = str(Path(workdir) / "uploads")
+    os.environ["FEATURE_DIR"] = str(Path(workdir) / "features")
+    seed(args.assets)
+
+    from pydantic import TypeAdapter
+
+    from app.database import SessionLocal
+    from app.main import ASSET_COLUMNS
+    from app.models import Asset
+    from app.schemas import AssetResponse
+    from app.serialization import _msgpack_default, msgpack
+
+    adapter = TypeAdapter(List[AssetResponse])
+
+    def pydantic_body(db) -> bytes:
+        assets = db.query(Asset).order_by(Asset.created_at.desc()).all()
+        content = adapter.dump_python(adapter.validate_python(assets), mode="json")
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+    def column_rows(db) -> list:
+        rows = db.query(*ASSET_COLUMNS.columns).order_by(Asset.created_at.desc()).all()
+        return ASSET_COLUMNS.dicts(rows)
+
+    variants = {
+        "pydantic": pydantic_body,
+        "columns": lambda db: orjson.dumps(column_rows(db)),
+    }
+    if msgpack is not None:
+        variants["msgpack"] = lambda db: msgpack.packb(column_rows(db), default=_msgpack_default)
+
+    per = 10000 / args.assets
+    baseline = None
+    print(f"{'variant':10s} {'ms/10k':>10s} {'speedup':>8s} {'bytes':>10s}  ({args.assets} assets)")
+    for name, body in variants.items():
+        best = float("inf")
+        for _ in range(args.repeat):
+            # Fresh session so no run reuses another's identity map
+            db = SessionLocal()
+            try:
+                start = time.perf_counter()
+                size = len(body(db))
+                best = min(best, time.perf_counter() - start)
+            finally:
+                db.close()
+        ms = best * 1000 * per
+        baseline = baseline or ms
+        print(f"{name:10s} {ms:10.1f} {baseline / ms:7.1f}x {size:10d}")
+
+
+if __name__ == "__main__":
+    main()
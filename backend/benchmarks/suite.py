@@ -0,0 +1,267 @@
+"""
+End-to-end benchmark suite for the issuance backend.
+
+Runs the API in-process against a scratch database (SQLite by default, or
+any DATABASE_URL) with the chain replaced by `FakeChain`, and writes
+p50/p95/p99 latency and throughput per scenario to a JSON file that
+`benchmarks.compare` can diff between versions.
+
+    cd backend && python -m benchmarks.suite --out bench/results.json
+    python -m benchmarks.suite --list-sizes 1000,100000,1000000
+    python -m benchmarks.suite --database-url postgresql://localhost/issuance_bench
+
+Requires httpx (see benchmarks/requirements.txt).
+"""
+
+import argparse
+import os
+import random
+import tempfile
+from pathlib import Path
+
+from .fakes import FakeChain, FakeS3Client, synthetic_flac, synthetic_wav
+from .harness import environment, measure, write_results
+
+AUTH = {"Authorization": "Bearer VAULT-2024"}
+VAULT = "0x0000000000000000000000000000000000000000"
+SEED_BATCH = 10000
+WAV_DATA_OFFSET = 44  # first sample in the canonical PCM header written by synthetic_wav
+
+
+def _iterations_for(size: int) -> int:
+    if size <= 10_000:
+        return 20
+    if size <= 100_000:
+        return 5
+    return 3
+
+
+def bench_issue(client, lengths, iterations, results):
+    formats = {"wav": synthetic_wav}
+    try:
+        synthetic_flac(0.1)
+        formats["flac"] = synthetic_flac
+    except ImportError:
+        results["issue.flac"] = {"skipped": "soundfile not installed"}
+
+    for fmt, encode in formats.items():
+        for seconds in lengths:
+            payload = encode(seconds)
+
+            def issue(i, payload=payload, fmt=fmt):
+                if fmt == "wav":
+                    # Vary the first sample so every upload is new content, not a dedup hit
+                    payload = payload[:WAV_DATA_OFFSET] + (i & 0xFFFFFFFF).to_bytes(4, "little") + payload[WAV_DATA_OFFSET + 4:]
+                return client.post(
+                    "/api/assets/issue",
+                    data={"title": f"Bench {fmt} {i}", "artist_display": "Bench", "year": 2024},
+                    files={"audio_file": (f"bench.{fmt}", payload)},
+                    headers=AUTH,
+                )
+
+            results[f"issue.{fmt}.{seconds}s"] = measure(issue, iterations)
+
+
+def bench_storage(workdir, session_factory, sizes_mb, iterations, results):
+    """Store unique and duplicate blobs and stream them back, per backend."""
+    from app.storage import BlobWriter, LocalBackend, S3Backend, object_name
+
+    backends = {
+        "local": LocalBackend(Path(workdir) / "storage-local"),
+        "s3": S3Backend(
+            "bench",
+            client=FakeS3Client(Path(workdir) / "storage-s3"),
+            cache_dir=Path(workdir) / "storage-s3-cache",
+        ),
+    }
+    for label, backend in backends.items():
+        for size_mb in sizes_mb:
+            base = os.urandom(int(size_mb * (1 << 20)))
+
+            def put(i, content):
+                db = session_factory()
+                writer = BlobWriter(backend)
+                try:
+                    for start in range(0, len(content), 1 << 20):
+                        writer.write(content[start:start + (1 << 20)])
+                    writer.upload(".bin")
+                    ref = writer.commit(db, ".bin")
+                    db.commit()
+                    return ref
+                finally:
+                    db.close()
+
+            refs = []
+            results[f"storage.{label}.put_unique.{size_mb}mb"] = measure(
+                lambda i: refs.append(put(i, (i & 0xFFFFFFFFFFFFFFFF).to_bytes(8, "little") + base[8:])), iterations
+            )
+            results[f"storage.{label}.put_duplicate.{size_mb}mb"] = measure(
+                lambda i: put(i, base), iterations
+            )
+            name = object_name(refs[-1].split(":", 1)[1], ".bin")
+            results[f"storage.{label}.read.{size_mb}mb"] = measure(
+                lambda i: sum(len(chunk) for chunk in backend.iter_chunks(name)), iterations
+            )
+
+
+def bench_settlements(client, seed_asset, iterations, results):
+    asset_id = seed_asset(settlement_rule="ON_TRANSFER")
+    results["settlement.ingest"] = measure(
+        lambda i: client.post(
+            f"/api/assets/{asset_id}/settlement",
+            json={"kind": "PLAY" if i % 2 else "TRANSFER"},
+            headers=AUTH,
+        ),
+        iterations,
+    )
+
+
+def bench_ownership_reads(client, seed_asset, transfers, iterations, results):
+    asset_id = seed_asset(clearance_status="CLEARED")
+    client.post(f"/api/assets/{asset_id}/fractionalize", json={"fraction_count": 10000}, headers=AUTH)
+    for i in range(transfers):
+        client.post(
+            f"/api/assets/{asset_id}/fractions/transfer",
+            json={"from_address": VAULT, "to_address": f"0x{i % 200:040x}", "amount": 1},
+            headers=AUTH,
+        )
+
+    results["custody.read"] = measure(
+        lambda i: client.get(f"/api/assets/{asset_id}/custody", headers=AUTH), iterations
+    )
+    results["fractions.read"] = measure(
+        lambda i: client.get(f"/api/assets/{asset_id}/fractions", headers=AUTH), iterations
+    )
+    results["fractions.read_as_of"] = measure(
+        lambda i: client.get(
+            f"/api/assets/{asset_id}/fractions",
+            params={"as_of": "2100-01-01T00:00:00"},
+            headers=AUTH,
+        ),
+        iterations,
+    )
+
+
+def bench_list_assets(client, engine, asset_table, sizes, results):
+    from sqlalchemy import func, insert, select
+
+    rng = random.Random(11)
+    with engine.connect() as conn:
+        current = conn.execute(select(func.count()).select_from(asset_table)).scalar()
+
+    for size in sorted(sizes):
+        while current < size:
+            batch = min(SEED_BATCH, size - current)
+            rows = [
+                {
+                    "title": f"Seed {current + n}",
+                    "artist_display": rng.choice(["Aurora", "Caribou", "Bench"]),
+                    "year": rng.randint(1960, 2024),
+                    "edition_total": 1,
+                    "clearance_status": rng.choice(["CLEARED", "FLAGGED", "UNCHECKED"]),
+                }
+                for n in range(batch)
+            ]
+            with engine.begin() as conn:
+                conn.execute(insert(asset_table), rows)
+            current += batch
+
+        results[f"list_assets.{size}"] = measure(
+            lambda i: client.get("/api/assets", headers=AUTH), _iterations_for(size)
+        )
+
+
+def bench_fingerprint(workdir, lengths, iterations, results):
+    from sinc import fingerprint
+
+    if not fingerprint.LIBROSA_AVAILABLE:
+        results["fingerprint"] = {"skipped": "librosa not installed"}
+        return
+
+    for seconds in lengths:
+        path = Path(workdir) / f"fp_{seconds}.wav"
+        path.write_bytes(synthetic_wav(seconds))
+        results[f"fingerprint.compute.{seconds}s"] = measure(
+            lambda i, path=path: fingerprint.compute_fingerprint(str(path)), iterations
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", type=Path, default=Path("bench/results.json"))
+    parser.add_argument("--database-url", default=None, help="defaults to a scratch SQLite file")
+    parser.add_argument("--list-sizes", default="1000,100000", help="comma-separated asset counts")
+    parser.add_argument("--audio-lengths", default="5,30,120", help="comma-separated seconds")
+    parser.add_argument("--storage-sizes", default="1,50", help="comma-separated blob sizes in MiB")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--transfers", type=int, default=500, help="fraction transfers before ownership reads")
+    parser.add_argument("--skip", default="", help="comma-separated scenario groups to skip")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="issuance-bench-")
+    database_url = args.database_url or f"sqlite:///{workdir}/bench.db"
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["UPLOAD_DIR"] = str(Path(workdir) / "uploads")
+    os.environ["FEATURE_DIR"] = str(Path(workdir) / "features")
+    os.environ["IMPORT_DIR"] = str(Path(workdir) / "imports")
+    os.environ["RUN_DIR"] = str(Path(workdir) / "run")
+    # Measure the endpoints themselves, not rate limits and queueing
+    os.environ["ADMISSION_CONTROL"] = "0"
+
+    # Import after the environment points at the scratch database
+    from fastapi.testclient import TestClient
+    from app import main as api
+    from app.database import SessionLocal, engine, init_schema
+    from app.models import Asset
+
+    init_schema()
+    api.blockchain_registry = FakeChain()
+    client = TestClient(api.app)
+
+    def seed_asset(**fields):
+        db = SessionLocal()
+        try:
+            asset = Asset(title="Bench seed", artist_display="Bench", year=2024, edition_total=1, **fields)
+            db.add(asset)
+            db.commit()
+            return asset.id
+        finally:
+            db.close()
+
+    lengths = [float(x) for x in args.audio_lengths.split(",") if x]
+    skip = set(filter(None, args.skip.split(",")))
+    results = {}
+
+    if "issue" not in skip:
+        bench_issue(client, lengths, args.iterations, results)
+    if "settlement" not in skip:
+        bench_settlements(client, seed_asset, args.iterations * 10, results)
+    if "ownership" not in skip:
+        bench_ownership_reads(client, seed_asset, args.transfers, args.iterations * 10, results)
+    if "storage" not in skip:
+        sizes_mb = [float(x) for x in args.storage_sizes.split(",") if x]
+        bench_storage(workdir, SessionLocal, sizes_mb, args.iterations, results)
+    if "fingerprint" not in skip:
+        bench_fingerprint(workdir, lengths, args.iterations, results)
+    if "list" not in skip:
+        sizes = [int(x) for x in args.list_sizes.split(",") if x]
+        bench_list_assets(client, engine, Asset.__table__, sizes, results)
+
+    meta = environment()
+    meta["database"] = engine.dialect.name
+    meta["args"] = vars(args) | {"out": str(args.out)}
+    write_results(args.out, meta, results)
+
+    for name, stats in results.items():
+        if "skipped" in stats:
+            print(f"{name:32s} skipped: {stats['skipped']}")
+        else:
+            print(
+                f"{name:32s} p50 {stats['p50_ms']:9.2f}ms  p95 {stats['p95_ms']:9.2f}ms  "
+                f"p99 {stats['p99_ms']:9.2f}ms  {stats['throughput_per_s']} ops/s"
+            )
+    print(f"wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+API throughput as the server's worker count grows.
+
+Seeds a scratch SQLite catalog, starts `python -m app.serve run` with each
+worker count on a free port, and drives asset reads from separate client
+processes for a fixed time. Prints requests per second and the scaling
+efficiency relative to one worker. No reference numbers are recorded yet;
+the result depends on cores, client load and the database, so measure on
+the deployment hardware before sizing --workers.
+
+    cd backend && python -m benchmarks.workers --workers 1,2,4,8 --seconds 15
+"""
+
+import argparse
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import httpx
+
+AUTH = {"Authorization": "Bearer VAULT-2024"}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def seed(n_assets: int):
+    from app.database import SessionLocal, init_schema
+    from app.models import Asset
+
+    init_schema()
+    db = SessionLocal()
+    try:
+        db.add_all([
+            Asset(title=f"Track {i}", artist_display=f"Artist {i % 97}", year=2000 + i % 25, edition_total=1)
+            for i in range(n_assets)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+def drive(base_url: str, n_assets: int, seconds: float, seed_value: int) -> int:
+    """One client process: sequential keep-alive requests until the deadline."""
+    rng = random.Random(seed_value)
+    done = 0
+    with httpx.Client(base_url=base_url, headers=AUTH) as client:
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            client.get(f"/api/assets/{rng.randint(1, n_assets)}").raise_for_status()
+            done += 1
+    return done
+
+
+def wait_ready(base_url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(base_url + "/", timeout=1.0).raise_for_status()
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+def measure(workers: int, clients: int, n_assets: int, seconds: float, env: dict) -> float:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "app.serve", "run", "--no-migrate",
+         "--workers", str(workers), "--host", "127.0.0.1", "--port", str(port)],
+        cwd=Path(__file__).parent.parent,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_ready(base_url)
+        # Warm every worker's connection pool and caches
+        drive(base_url, n_assets, 1.0, 0)
+        with ProcessPoolExecutor(max_workers=clients) as pool:
+            counts = pool.map(drive, [base_url] * clients, [n_assets] * clients, [seconds] * clients, range(clients))
+            return sum(counts) / seconds
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--clients", type=int, default=None, help="client processes (default: 2x max workers)")
+    parser.add_argument("--assets", type=int, default=10000)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    counts = [int(x) for x in args.workers.split(",") if x]
+    clients = args.clients or 2 * max(counts)
+
+    workdir = tempfile.mkdtemp(prefix="issuance-workers-")
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{workdir}/workers.db",
+        "UPLOAD_DIR": str(Path(workdir) / "uploads"),
+        "FEATURE_DIR": str(Path(workdir) / "features"),
+        "RUN_DIR": str(Path(workdir) / "run"),
+    }
+    os.environ.update(env)
+    seed(args.assets)
+
+    baseline = None
+    print(f"{'workers':>7s} {'req/s':>10s} {'efficiency':>10s}  ({clients} client processes, {os.cpu_count()} cores)")
+    for workers in counts:
+        rate = measure(workers, clients, args.assets, args.seconds, env)
+        baseline = baseline or rate / workers
+        print(f"{workers:7d} {rate:10.1f} {rate / (baseline * workers):10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""
+Test settings: a scratch database and storage tree per session, set before
+any `app` module reads its configuration, and the repo root on sys.path
+for `sinc`.
+
+    cd backend && python -m pytest
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+WORKDIR = Path(tempfile.mkdtemp(prefix="issuance-tests-"))
+
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{WORKDIR}/tests.db",
+    "UPLOAD_DIR": str(WORKDIR / "uploads"),
+    "FEATURE_DIR": str(WORKDIR / "features"),
+    "IMPORT_DIR": str(WORKDIR / "imports"),
+    "RUN_DIR": str(WORKDIR / "run"),
+    "ADMISSION_CONTROL": "0",
+    "COORDINATOR": "0",
+    # X-DB-Queries / X-DB-Commits headers for test_roundtrips
+    "EXPOSE_QUERY_COUNT": "1",
+})
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
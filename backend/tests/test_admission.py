@@ -0,0 +1,56 @@
+"""Rate limiting keys, the shared per-route bucket and bucket eviction."""
+
+from app import admission
+from app.admission import RateLimiter, _caller
+
+
+def scope(authorization=None, client="10.0.0.1"):
+    headers = [(b"authorization", authorization.encode())] if authorization else []
+    return {"headers": headers, "client": (client, 50000)}
+
+
+def valid(token):
+    return token == "GOOD"
+
+
+def test_caller_uses_only_valid_tokens():
+    assert _caller(scope("Bearer GOOD"), valid) == ("token:GOOD", True)
+    # Made-up tokens share their address's bucket instead of getting fresh ones
+    assert _caller(scope("Bearer random-1"), valid) == ("10.0.0.1", False)
+    assert _caller(scope("Bearer random-2"), valid) == ("10.0.0.1", False)
+    assert _caller(scope(), valid) == ("10.0.0.1", False)
+
+
+def test_unauthenticated_callers_leave_global_bucket_alone():
+    limiter = RateLimiter({"ingest": (0.001, 5)}, global_limits={"ingest": (0.001, 1)})
+    for address in ("10.0.0.1", "10.0.0.2", "10.0.0.3"):
+        assert limiter.take(address, "ingest", shared=False) == 0.0
+    assert limiter.take("token:GOOD", "ingest") == 0.0
+
+
+def test_global_bucket_limits_all_callers():
+    limiter = RateLimiter({"ingest": (0.001, 2)}, global_limits={"ingest": (0.001, 3)})
+    results = [limiter.take(f"caller-{i}", "ingest") for i in range(4)]
+    assert results[:3] == [0.0, 0.0, 0.0]
+    assert results[3] > 0
+
+
+def test_rejected_request_takes_no_tokens():
+    limiter = RateLimiter({"ingest": (0.001, 1)}, global_limits={"ingest": (0.001, 2)})
+    assert limiter.take("a", "ingest") == 0.0
+    # a's own bucket is empty: the shared token stays for b
+    assert limiter.take("a", "ingest") > 0
+    assert limiter.take("b", "ingest") == 0.0
+
+
+def test_buckets_evicted_least_recently_used(monkeypatch):
+    monkeypatch.setattr(admission, "MAX_BUCKETS", 3)
+    limiter = RateLimiter({"ingest": (0.001, 1)})
+    for caller in ("a", "b", "c"):
+        limiter.take(caller, "ingest")
+    assert limiter.take("a", "ingest") > 0      # a is now most recent
+    limiter.take("d", "ingest")                 # evicts b, not a
+
+    assert len(limiter._buckets) == 3
+    assert ("b", "ingest") not in limiter._buckets
+    assert limiter.take("a", "ingest") > 0
@@ -0,0 +1,28 @@
+"""Fingerprints must not depend on which decode backend read the file."""
+
+import pytest
+
+from benchmarks.fakes import synthetic_flac
+from sinc.decode import available_backends, decode
+from sinc.fingerprint import SAMPLE_RATE, fingerprint_signal
+
+
+@pytest.fixture(scope="module")
+def flac_path(tmp_path_factory):
+    # Stereo 44.1 kHz, so every backend has to downmix and resample
+    path = tmp_path_factory.mktemp("decode") / "fixture.flac"
+    path.write_bytes(synthetic_flac(4.0))
+    return str(path)
+
+
+@pytest.mark.parametrize("backend", ["ffmpeg", "librosa"])
+def test_backend_matches_soundfile_hash(flac_path, backend):
+    if backend not in available_backends():
+        pytest.skip(f"{backend} not installed")
+
+    reference = decode(flac_path, sr=SAMPLE_RATE, backend="soundfile")
+    audio = decode(flac_path, sr=SAMPLE_RATE, backend=backend)
+
+    assert audio.sr == reference.sr
+    assert audio.duration_seconds == pytest.approx(reference.duration_seconds, abs=1e-3)
+    assert fingerprint_signal(audio.y, audio.sr)[0] == fingerprint_signal(reference.y, reference.sr)[0]
@@ -0,0 +1,27 @@
+"""Bulk import job creation."""
+
+import io
+import zipfile
+
+from fastapi.testclient import TestClient
+
+from app import imports, main
+from app.database import init_schema
+
+AUTH = {"Authorization": "Bearer VAULT-2024"}
+
+
+def test_rejected_manifest_leaves_no_extracted_audio():
+    init_schema()
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as z:
+        z.writestr("x.wav", b"RIFF")
+    before = set(imports.IMPORT_DIR.iterdir()) if imports.IMPORT_DIR.exists() else set()
+
+    response = TestClient(main.app).post("/api/imports", headers=AUTH, files={
+        "manifest": ("m.txt", b"title\nx\n"),
+        "archive": ("a.zip", archive.getvalue()),
+    })
+
+    assert response.status_code == 400
+    assert {p for p in imports.IMPORT_DIR.iterdir() if not p.name.startswith(".")} <= before
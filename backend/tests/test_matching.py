@@ -0,0 +1,76 @@
+"""The landmark index picks up assets fingerprinted by other processes."""
+
+import pytest
+
+from app import matching
+from app.database import SessionLocal, init_schema
+from app.events import analysis_events, record_events
+from app.models import Asset, AssetLandmarks
+from benchmarks.fakes import synthetic_signal
+from sinc.fingerprint import SAMPLE_RATE
+from sinc.landmarks import compute_landmarks, pack
+
+
+def signal(seed: int):
+    return synthetic_signal(20.0, sr=SAMPLE_RATE, seed=seed).mean(axis=0)
+
+
+def landmarks(seed: int) -> bytes:
+    return pack(compute_landmarks(signal(seed)), SAMPLE_RATE)
+
+
+def excerpt(seed: int) -> bytes:
+    return pack(compute_landmarks(signal(seed)[5 * SAMPLE_RATE:12 * SAMPLE_RATE]), SAMPLE_RATE)
+
+
+def fingerprint(db, asset: Asset, blob: bytes):
+    # What the issue route and import analysis write, in one transaction,
+    # without going through this process's index (as another worker would)
+    asset.fingerprint_hash, asset.duration_seconds, asset.risk_score = "f" * 64, 20.0, 0.0
+    db.merge(AssetLandmarks(asset_id=asset.id, landmark_count=0, data=blob))
+    record_events(db, analysis_events(asset))
+    db.commit()
+
+
+@pytest.fixture
+def db(monkeypatch):
+    init_schema()
+    monkeypatch.setattr(matching, "_index", None)
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def test_index_sees_later_writes(db):
+    first = Asset(title="first", artist_display="a", year=2024)
+    later = Asset(title="later", artist_display="a", year=2024)
+    db.add_all([first, later])
+    db.commit()
+    fingerprint(db, later, landmarks(1))
+
+    # Loaded here, then another writer fingerprints an older asset id
+    assert [m["asset_id"] for m in matching.match_excerpt(db, excerpt(1))] == [later.id]
+    other = SessionLocal()
+    try:
+        fingerprint(other, other.get(Asset, first.id), landmarks(2))
+    finally:
+        other.close()
+
+    assert matching.match_excerpt(db, excerpt(2))[0]["asset_id"] == first.id
+
+
+def test_refresh_only_removes_indexed_assets(db):
+    old, new = Asset(title="old", artist_display="a", year=2024), Asset(title="new", artist_display="a", year=2024)
+    db.add_all([old, new])
+    db.commit()
+    fingerprint(db, old, landmarks(3))
+    index = matching.get_index(db)
+
+    fingerprint(db, new, landmarks(4))
+    matching.get_index(db)
+    # A new asset goes straight in: no removal, so no purge on the next add
+    assert new.id in index and not index._removed
+
+    fingerprint(db, old, landmarks(5))
+    matching.get_index(db)
+    assert matching.match_excerpt(db, excerpt(5))[0]["asset_id"] == old.id
@@ -0,0 +1,44 @@
+"""Metrics summed across worker snapshot files, and query timing."""
+
+from sqlalchemy import create_engine, exc, text
+
+from app import metrics
+
+
+def test_snapshots_sum_across_workers(tmp_path, monkeypatch):
+    counter = metrics.Counter("test_requests_total", "test", ("route",))
+    histogram = metrics.Histogram("test_latency_seconds", "test", buckets=(0.1, 1.0))
+    try:
+        counter.inc("/a", amount=2)
+        histogram.observe(0.05)
+        metrics.write_snapshot(tmp_path)
+        # Another worker's snapshot
+        (tmp_path / "1.json").write_text(
+            '{"test_requests_total": [[["/a"], 3.0], [["/b"], 1.0]],'
+            ' "test_latency_seconds": [[[], [0, 1, 0, 0.5]]]}'
+        )
+        monkeypatch.setattr(metrics, "METRICS_MULTIPROCESS", True)
+        monkeypatch.setattr(metrics, "METRICS_DIR", tmp_path)
+
+        lines = metrics.render_metrics().splitlines()
+        assert 'test_requests_total{route="/a"} 5.0' in lines
+        assert 'test_requests_total{route="/b"} 1.0' in lines
+        assert 'test_latency_seconds_bucket{le="0.1"} 1' in lines
+        assert 'test_latency_seconds_bucket{le="1.0"} 2' in lines
+        assert "test_latency_seconds_count 2" in lines
+    finally:
+        metrics.REGISTRY.remove(counter)
+        metrics.REGISTRY.remove(histogram)
+
+
+def test_failed_query_leaves_no_start_time():
+    engine = create_engine("sqlite://")
+    metrics.instrument_engine(engine)
+    with engine.connect() as conn:
+        try:
+            conn.execute(text("SELECT * FROM missing"))
+        except exc.OperationalError:
+            pass
+        assert not conn.info.get("query_start")
+        conn.execute(text("SELECT 1"))
+        assert not conn.info.get("query_start")
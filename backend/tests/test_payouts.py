@@ -0,0 +1,16 @@
+"""Payout allocation over holder columns."""
+
+from app.payouts import compute_distribution
+
+
+def test_non_ascii_holder_address_does_not_fail_the_run():
+    holders = {
+        "asset_id": [1, 1, 1],
+        "holder_address": ["0xbb", "ünï", "0xaa"],
+        "fraction_amount": [1, 1, 1],
+    }
+    result = compute_distribution({1: 100}, holders)
+
+    assert sorted(result["payout"].tolist()) == [33, 33, 34]
+    # Ties go by address order
+    assert [holders["holder_address"][i] for i in result["group_order"]] == ["0xaa", "0xbb", "ünï"]
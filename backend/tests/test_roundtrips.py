@@ -0,0 +1,30 @@
+"""Write endpoints stay within their SQL statement and commit budgets."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main as api
+from app.database import init_schema
+from benchmarks.fakes import FakeChain
+from benchmarks.roundtrips import BUDGETS, observe, within_budget
+
+
+@pytest.fixture(scope="module")
+def observed():
+    # No lifespan (and so no coordinator thread), as in benchmarks.roundtrips
+    init_schema()
+    registry, api.blockchain_registry = api.blockchain_registry, FakeChain()
+    try:
+        yield observe(TestClient(api.app))
+    finally:
+        api.blockchain_registry = registry
+
+
+@pytest.mark.parametrize("name", sorted(BUDGETS))
+def test_within_budget(observed, name):
+    if name not in observed:
+        pytest.skip("fixture audio did not clear")
+    queries, commits = observed[name]
+    assert within_budget(name, queries, commits), (
+        f"{name}: {queries} queries / {commits} commits, budget {BUDGETS[name]}"
+    )
@@ -0,0 +1,19 @@
+"""Request validation."""
+
+import pytest
+from pydantic import ValidationError
+
+from app.schemas import FractionTransferRequest
+
+HOLDER = "0x00000000000000000000000000000000000000AA"
+
+
+def test_transfer_addresses_are_normalized():
+    request = FractionTransferRequest(from_address=f"  {HOLDER} ", to_address=HOLDER.lower(), amount=1)
+    assert request.from_address == request.to_address == HOLDER.lower()
+
+
+@pytest.mark.parametrize("address", ["ünï", "0xab", "0x" + "g" * 40, HOLDER[2:], HOLDER + "0"])
+def test_transfer_rejects_malformed_addresses(address):
+    with pytest.raises(ValidationError):
+        FractionTransferRequest(from_address=HOLDER, to_address=address, amount=1)
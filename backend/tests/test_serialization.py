@@ -0,0 +1,34 @@
+"""Accept negotiation between JSON and MessagePack."""
+
+import pytest
+from starlette.requests import Request
+
+from app import serialization
+
+
+def request(accept=None):
+    headers = [(b"accept", accept.encode())] if accept is not None else []
+    return Request({"type": "http", "headers": headers})
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, False),
+    ("*/*", False),
+    ("application/*", False),
+    ("application/json", False),
+    ("application/msgpack", True),
+    ("application/x-msgpack", True),
+    ("application/msgpack;q=0", False),
+    ("application/msgpack;q=0, */*", False),
+    ("application/msgpack, application/json", True),
+    ("application/json, application/msgpack", False),
+    ("application/json;q=0.5, application/msgpack", True),
+    ("application/msgpack;q=0.4, application/json;q=0.9", False),
+    ("application/msgpack, */*;q=0.1", True),
+    ("text/html, application/msgpack-foo", False),
+    ("application/msgpack;q=oops", False),
+])
+def test_wants_msgpack(accept, expected):
+    if serialization.msgpack is None:
+        pytest.skip("msgpack not installed")
+    assert serialization.wants_msgpack(request(accept)) is expected
@@ -0,0 +1,111 @@
+"""Content-addressed storage: uploads outside transactions, and `gc`."""
+
+import os
+import time
+
+import pytest
+
+from app import storage
+from app.database import SessionLocal, init_schema
+from app.models import Asset, StoredObject
+from benchmarks.fakes import FakeS3Client
+
+
+@pytest.fixture(params=["local", "s3"])
+def backend(request, tmp_path, monkeypatch):
+    if request.param == "local":
+        backend = storage.LocalBackend(tmp_path / "objects")
+    else:
+        backend = storage.S3Backend("test", client=FakeS3Client(tmp_path / "s3"), cache_dir=tmp_path / "cache")
+    monkeypatch.setattr(storage, "_storage", backend)
+    return backend
+
+
+@pytest.fixture
+def db():
+    init_schema()
+    session = SessionLocal()
+    yield session
+    session.query(Asset).delete()
+    session.query(StoredObject).delete()
+    session.commit()
+    session.close()
+
+
+def write(backend, content: bytes) -> storage.BlobWriter:
+    writer = storage.BlobWriter(backend)
+    writer.write(content)
+    writer.upload(".bin")
+    return writer
+
+
+def names(backend):
+    return {name for name, _ in backend.list_objects()}
+
+
+def age(backend, name):
+    # Backdate past the orphan grace period
+    path = backend.local_path(name) if isinstance(backend, storage.LocalBackend) else (
+        backend.client._path(backend.bucket, backend._key(name))
+    )
+    old = time.time() - storage.ORPHAN_GRACE_SECONDS - 60
+    os.utime(path, (old, old))
+
+
+def test_upload_then_reference(backend, db):
+    writer = write(backend, b"master")
+    name = storage.object_name(writer.digest, ".bin")
+    assert backend.exists(name)
+
+    ref = writer.commit(db, ".bin")
+    db.add(Asset(title="t", artist_display="a", year=2024, file_path=ref))
+    db.commit()
+
+    assert not writer.path.exists()
+    assert storage.collect_garbage(db) == 0
+    assert b"".join(backend.iter_chunks(name)) == b"master"
+
+
+def test_gc_removes_rolled_back_upload_after_grace(backend, db):
+    writer = write(backend, b"rolled back")
+    name = storage.object_name(writer.digest, ".bin")
+    writer.commit(db, ".bin")
+    db.rollback()
+    writer.abort()
+
+    # Too recent: may belong to a transaction that hasn't committed yet
+    assert storage.collect_garbage(db) == 0
+    assert name in names(backend)
+
+    age(backend, name)
+    assert storage.collect_garbage(db) == 1
+    assert name not in names(backend)
+
+
+def test_gc_removes_objects_no_asset_references(backend, db):
+    kept, dropped = write(backend, b"kept"), write(backend, b"dropped")
+    db.add(Asset(title="t", artist_display="a", year=2024, file_path=kept.commit(db, ".bin")))
+    dropped_ref = dropped.commit(db, ".bin")
+    db.add(Asset(title="t", artist_display="a", year=2024, file_path=dropped_ref))
+    db.commit()
+
+    # Removing the asset is enough; no route has to release the reference
+    db.query(Asset).filter(Asset.file_path == dropped_ref).delete()
+    db.commit()
+
+    assert storage.collect_garbage(db) == 1
+    assert names(backend) == {storage.object_name(kept.digest, ".bin")}
+    assert db.get(StoredObject, dropped.digest) is None
+    assert db.get(StoredObject, kept.digest).refcount == 1
+
+
+def test_gc_leaves_non_objects_alone(backend, db, tmp_path):
+    if not isinstance(backend, storage.LocalBackend):
+        pytest.skip("legacy flat uploads only exist locally")
+    legacy = backend.root / ("ab" * 16 + ".wav")
+    legacy.write_bytes(b"legacy")
+    old = time.time() - storage.ORPHAN_GRACE_SECONDS - 60
+    os.utime(legacy, (old, old))
+
+    assert storage.collect_garbage(db) == 0
+    assert legacy.exists()
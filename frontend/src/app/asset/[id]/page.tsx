@@ -5,7 +5,7 @@ import { motion, AnimatePresence } from 'framer-motion';
 import { useRouter, useParams } from 'next/navigation';
 import { VaultHeader } from '@/components/VaultHeader';
 import { FractionalOwnership } from '@/components/FractionalOwnership';
-import { getAsset, getCustodyChain, createSettlement, getAudioUrl } from '@/lib/api';
+import { getAsset, getCustodyChain, createSettlement, getAudioUrl, subscribeAssetEvents } from '@/lib/api';
 import { formatDuration, formatDate, truncateHash } from '@/lib/utils';
 import { Asset, CustodyEvent } from '@/types';
 import { Play, Pause, Volume2, ExternalLink, Settings } from 'lucide-react';
@@ -36,6 +36,14 @@ export default function AssetDetailPage() {
     loadAsset();
   }, [router, assetId]);
 
+  // Keep fingerprint, clearance, chain and settlement fields live
+  useEffect(() => {
+    if (!assetId) return;
+    return subscribeAssetEvents([assetId], (event) => {
+      setAsset((current) => (current ? { ...current, ...event.data } : current));
+    });
+  }, [assetId]);
+
   const loadAsset = async () => {
     try {
       const [assetData, custodyData] = await Promise.all([
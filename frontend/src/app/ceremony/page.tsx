@@ -4,7 +4,7 @@ import { useState, useRef, useEffect } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 import { useRouter } from 'next/navigation';
 import { VaultHeader } from '@/components/VaultHeader';
-import { issueAsset } from '@/lib/api';
+import { issueAsset, subscribeAssetEvents } from '@/lib/api';
 import { Upload, X, Check, ChevronRight, Shield, Fingerprint, Link2 } from 'lucide-react';
 
 type CeremonyStep = 'upload' | 'metadata' | 'verify' | 'issue' | 'complete';
@@ -42,6 +42,15 @@ export default function CeremonyPage() {
     }
   }, [router]);
 
+  // Registration is confirmed in the background; show the tx hash when it lands
+  const issuedAssetId = issuedAsset?.id;
+  useEffect(() => {
+    if (!issuedAssetId) return;
+    return subscribeAssetEvents([issuedAssetId], (event) => {
+      setIssuedAsset((current: any) => (current ? { ...current, ...event.data } : current));
+    });
+  }, [issuedAssetId]);
+
   const handleInputChange = (
     e: React.ChangeEvent<HTMLInputElement | HTMLTextAreaElement | HTMLSelectElement>
   ) => {
@@ -1,4 +1,4 @@
-import { Asset, CustodyEvent, SettlementEvent } from '@/types';
+import { Asset, AssetEvent, AssetEventKind, AssetSearchParams, AssetSearchResult, CustodyEvent, SettlementEvent } from '@/types';
 
 const API_BASE = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 
@@ -44,6 +44,14 @@ export async function getAssets(): Promise<Asset[]> {
   return fetchWithAuth('/api/assets');
 }
 
+export async function searchAssets(params: AssetSearchParams): Promise<AssetSearchResult> {
+  const query = new URLSearchParams();
+  Object.entries(params).forEach(([key, value]) => {
+    if (value !== undefined && value !== '') query.set(key, String(value));
+  });
+  return fetchWithAuth(`/api/assets/search?${query.toString()}`);
+}
+
 export async function getAsset(id: number): Promise<Asset> {
   return fetchWithAuth(`/api/assets/${id}`);
 }
@@ -89,3 +97,25 @@ export function getAudioUrl(assetId: number): string {
   const token = getToken();
   return `${API_BASE}/api/assets/${assetId}/audio?token=${token}`;
 }
+
+const ASSET_EVENT_KINDS: AssetEventKind[] = [
+  'uploaded',
+  'fingerprinted',
+  'cleared',
+  'flagged',
+  'chain_confirmed',
+  'settled',
+  'fractionalized',
+];
+
+// Streams lifecycle events for the given assets, starting with their history.
+// EventSource reconnects on its own and resumes from the last event id.
+// Returns a function that closes the stream.
+export function subscribeAssetEvents(assetIds: number[], onEvent: (event: AssetEvent) => void): () => void {
+  const query = new URLSearchParams({ token: getToken() || '', last_event_id: '0' });
+  assetIds.forEach((id) => query.append('asset_id', String(id)));
+  const source = new EventSource(`${API_BASE}/api/events?${query.toString()}`);
+  const listener = (message: MessageEvent) => onEvent(JSON.parse(message.data));
+  ASSET_EVENT_KINDS.forEach((kind) => source.addEventListener(kind, listener));
+  return () => source.close();
+}
@@ -24,6 +24,22 @@ export interface Asset {
   updated_at: string;
 }
 
+export interface AssetSearchParams {
+  q?: string;
+  year?: number;
+  clearance_status?: ClearanceStatus;
+  settlement_rule?: SettlementRule;
+  fractionalized?: boolean;
+  limit?: number;
+  offset?: number;
+}
+
+export interface AssetSearchResult {
+  total: number;
+  results: Asset[];
+  facets: Record<'year' | 'clearance_status' | 'settlement_rule' | 'fractionalized', Record<string, number>>;
+}
+
 export interface FractionHolding {
   id: number;
   asset_id: number;
@@ -56,6 +72,23 @@ export interface SettlementEvent {
   occurred_at: string;
 }
 
+export type AssetEventKind =
+  | 'uploaded'
+  | 'fingerprinted'
+  | 'cleared'
+  | 'flagged'
+  | 'chain_confirmed'
+  | 'settled'
+  | 'fractionalized';
+
+export interface AssetEvent {
+  id: number;
+  asset_id: number;
+  kind: AssetEventKind;
+  data: Partial<Asset>;
+  occurred_at: string;
+}
+
 export interface ApiResponse<T> {
   data?: T;
   error?: string;
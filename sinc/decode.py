@@ -0,0 +1,193 @@
+"""
+SINC Audio Decoding
+Decode backends with configurable resampling and range-limited reads
+
+Backends, tried in this order for "auto":
+    soundfile - native libsndfile read (WAV, FLAC, AIFF, OGG, MP3 on recent builds)
+    ffmpeg    - subprocess decode to raw float32 at the native rate and channel
+                count, for everything else (M4A, ...); needs ffprobe too
+    librosa   - the original librosa.load path
+
+Resamplers:
+    soxr_hq (default), soxr_vhq, soxr_mq, soxr_lq, soxr_qq - libsoxr presets;
+        soxr_hq matches librosa.load, so fingerprint hashes are unchanged
+    polyphase - scipy.signal.resample_poly
+    linear    - np.interp; no extra dependency, lowest quality
+
+Heavy modules (soundfile, soxr, scipy, librosa) are imported on first use.
+"""
+
+import importlib.util
+import json
+import os
+import shutil
+import subprocess
+from math import gcd
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .instrumentation import stage
+
+DECODE_BACKEND = os.getenv("SINC_DECODE_BACKEND", "auto")
+RESAMPLER = os.getenv("SINC_RESAMPLER", "soxr_hq")
+MAX_ANALYSIS_SECONDS = float(os.getenv("SINC_MAX_ANALYSIS_SECONDS", "0")) or None
+
+SOXR_QUALITIES = {"soxr_vhq": "VHQ", "soxr_hq": "HQ", "soxr_mq": "MQ", "soxr_lq": "LQ", "soxr_qq": "QQ"}
+
+
+class DecodedAudio(NamedTuple):
+    y: np.ndarray  # mono float32
+    sr: int
+    duration_seconds: float  # of the whole file, even when only a range was decoded
+
+
+def _has(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def available_backends() -> list:
+    backends = []
+    if _has("soundfile"):
+        backends.append("soundfile")
+    if shutil.which("ffmpeg") and shutil.which("ffprobe"):
+        backends.append("ffmpeg")
+    if _has("librosa"):
+        backends.append("librosa")
+    return backends
+
+
+def decoder_available() -> bool:
+    return bool(available_backends())
+
+
+def resample(y: np.ndarray, orig_sr: int, target_sr: int, resampler: Optional[str] = None) -> np.ndarray:
+    """Resample a mono float32 signal."""
+    resampler = resampler or RESAMPLER
+    if orig_sr == target_sr or len(y) == 0:
+        return y
+
+    if resampler in SOXR_QUALITIES:
+        import soxr
+        return soxr.resample(y, orig_sr, target_sr, quality=SOXR_QUALITIES[resampler]).astype(np.float32, copy=False)
+
+    if resampler == "polyphase":
+        from scipy.signal import resample_poly
+        factor = gcd(orig_sr, target_sr)
+        return resample_poly(y, target_sr // factor, orig_sr // factor).astype(np.float32, copy=False)
+
+    if resampler == "linear":
+        n_out = int(np.ceil(len(y) * target_sr / orig_sr))
+        positions = np.arange(n_out, dtype=np.float64) * (orig_sr / target_sr)
+        return np.interp(positions, np.arange(len(y)), y).astype(np.float32)
+
+    raise ValueError(f"Unknown resampler: {resampler}")
+
+
+def downmix(data: np.ndarray) -> np.ndarray:
+    """
+    Average interleaved (frames, channels) samples to mono.
+
+    Summing channel columns is several times faster than data.mean(axis=1)
+    on interleaved float32, and gives the same result as librosa's to_mono.
+    """
+    channels = data.shape[1]
+    y = np.ascontiguousarray(data[:, 0])
+    if channels == 1:
+        return y
+    for channel in range(1, channels):
+        y += data[:, channel]
+    y /= channels
+    return y
+
+
+def _decode_soundfile(path: str, sr: int, max_duration: Optional[float], resampler: Optional[str]) -> DecodedAudio:
+    import soundfile
+
+    info = soundfile.info(path)
+    frames = int(max_duration * info.samplerate) if max_duration else -1
+    data, native_sr = soundfile.read(path, frames=frames, dtype="float32", always_2d=True)
+    return DecodedAudio(resample(downmix(data), native_sr, sr, resampler), sr, info.frames / info.samplerate)
+
+
+def _probe(path: str) -> Tuple[int, int, Optional[float]]:
+    """(sample rate, channels, duration) of the first audio stream."""
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-select_streams", "a:0",
+         "-show_entries", "stream=sample_rate,channels:format=duration", "-of", "json", path],
+        capture_output=True, text=True, check=True
+    )
+    info = json.loads(result.stdout)
+    stream = info["streams"][0]
+    try:
+        duration = float(info.get("format", {}).get("duration"))
+    except (TypeError, ValueError):
+        duration = None
+    return int(stream["sample_rate"]), int(stream["channels"]), duration
+
+
+def _decode_ffmpeg(path: str, sr: int, max_duration: Optional[float], resampler: Optional[str]) -> DecodedAudio:
+    # Decode only: downmix and resampling go through the same code as the
+    # soundfile path, so hashes don't depend on which backend read the file
+    native_sr, channels, duration = _probe(path)
+    command = ["ffmpeg", "-nostdin", "-v", "error"]
+    if max_duration:
+        command += ["-t", str(max_duration)]
+    command += ["-i", path, "-map", "0:a:0", "-f", "f32le", "-"]
+    result = subprocess.run(command, capture_output=True, check=True)
+    data = np.frombuffer(result.stdout, dtype="<f4").astype(np.float32)
+    data = data[:len(data) // channels * channels].reshape(-1, channels)
+
+    if duration is None or not max_duration:
+        duration = len(data) / native_sr
+    return DecodedAudio(resample(downmix(data), native_sr, sr, resampler), sr, duration)
+
+
+def _decode_librosa(path: str, sr: int, max_duration: Optional[float], resampler: Optional[str]) -> DecodedAudio:
+    import librosa
+
+    y, sr = librosa.load(path, sr=sr, mono=True, duration=max_duration, res_type=resampler or RESAMPLER)
+    duration = len(y) / sr
+    if max_duration:
+        duration = librosa.get_duration(path=path)
+    return DecodedAudio(y, sr, duration)
+
+
+_BACKENDS = {
+    "soundfile": _decode_soundfile,
+    "ffmpeg": _decode_ffmpeg,
+    "librosa": _decode_librosa,
+}
+
+
+def decode(
+    path: str,
+    sr: int = 22050,
+    max_duration: Optional[float] = None,
+    backend: Optional[str] = None,
+    resampler: Optional[str] = None
+) -> DecodedAudio:
+    """
+    Decode an audio file to mono float32 at `sr`.
+
+    With `max_duration` (or SINC_MAX_ANALYSIS_SECONDS), only the leading
+    range is decoded. With backend "auto", the first backend that can read
+    the file is used.
+    """
+    backend = backend or DECODE_BACKEND
+    max_duration = max_duration or MAX_ANALYSIS_SECONDS
+    candidates = available_backends() if backend == "auto" else [backend]
+    if not candidates:
+        raise RuntimeError("No audio decode backend available (install soundfile, ffmpeg or librosa)")
+
+    errors = []
+    with stage("decode"):
+        for name in candidates:
+            try:
+                return _BACKENDS[name](path, sr, max_duration, resampler)
+            except Exception as e:
+                if backend != "auto":
+                    raise
+                errors.append(f"{name}: {e}")
+
+    raise RuntimeError(f"Could not decode {path}: {'; '.join(errors)}")
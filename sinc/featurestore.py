@@ -0,0 +1,255 @@
+"""
+SINC Feature Store
+Append-only, memory-mapped store of per-asset MFCC frame matrices
+
+Layout of a store directory:
+    meta.json   - dtype and coefficient count
+    frames.bin  - every asset's (frames, coeffs) matrix back to back, fixed dtype
+    index.bin   - fixed-size records: asset_id, first row, row count, deleted flag
+
+Frames are written before their index record, so a crash can only leave
+unreferenced bytes behind. Readers get zero-copy NumPy views into the
+memory-mapped frames; catalog-wide work (re-scoring, clustering, duplicate
+sweeps) never touches the audio files. Deleting an asset only flags its
+record; `compact` rewrites the files without flagged rows.
+
+    python -m sinc.featurestore stats ROOT
+    python -m sinc.featurestore delete ROOT ASSET_ID [ASSET_ID ...]
+    python -m sinc.featurestore compact ROOT
+"""
+
+import argparse
+import fcntl
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+INDEX_DTYPE = np.dtype([
+    ("asset_id", "<i8"),
+    ("start", "<i8"),
+    ("n_frames", "<i4"),
+    ("deleted", "u1"),
+    ("_pad", "u1", 3),
+])
+
+
+class FeatureStore:
+    def __init__(self, root, n_coeffs: int = 20, dtype: str = "float16"):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        meta_path = self.root / "meta.json"
+        if meta_path.exists():
+            meta = json.loads(meta_path.read_text())
+        else:
+            meta = {"version": 1, "n_coeffs": n_coeffs, "dtype": np.dtype(dtype).str}
+            meta_path.write_text(json.dumps(meta))
+
+        self.n_coeffs = meta["n_coeffs"]
+        self.dtype = np.dtype(meta["dtype"])
+        self.row_bytes = self.n_coeffs * self.dtype.itemsize
+        self._frames_path = self.root / "frames.bin"
+        self._index_path = self.root / "index.bin"
+        self._frames_path.touch()
+        self._index_path.touch()
+        self._frames: Optional[np.memmap] = None
+        self._index: Optional[np.ndarray] = None
+        self._positions: dict = {}
+        self._signature = None
+
+    # -- locking / mapping -------------------------------------------------
+
+    @contextmanager
+    def _locked(self, exclusive: bool = True):
+        """Writers hold the lock exclusively; readers share it while remapping."""
+        with open(self.root / ".lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _refresh(self, locked: bool = False):
+        """Remap the files if any writer (in any process) changed them."""
+        if not locked:
+            with self._locked(exclusive=False):
+                return self._refresh(locked=True)
+
+        index_stat, frames_stat = self._index_path.stat(), self._frames_path.stat()
+        signature = (index_stat.st_ino, index_stat.st_size, index_stat.st_mtime_ns, frames_stat.st_ino, frames_stat.st_size)
+        if signature == self._signature:
+            return
+
+        self._index = np.fromfile(self._index_path, dtype=INDEX_DTYPE)
+        # Replacing an asset flags its old record, so live records are unique per asset
+        live = np.flatnonzero(self._index["deleted"] == 0)
+        self._positions = dict(zip(self._index["asset_id"][live].tolist(), live.tolist()))
+
+        rows = frames_stat.st_size // self.row_bytes
+        self._frames = (
+            np.memmap(self._frames_path, dtype=self.dtype, mode="r", shape=(rows, self.n_coeffs))
+            if rows else np.empty((0, self.n_coeffs), dtype=self.dtype)
+        )
+        self._signature = signature
+
+    def _set_deleted(self, position: int):
+        with open(self._index_path, "r+b") as f:
+            f.seek(position * INDEX_DTYPE.itemsize + INDEX_DTYPE.fields["deleted"][1])
+            f.write(b"\x01")
+
+    # -- writes ------------------------------------------------------------
+
+    def append(self, asset_id: int, features: np.ndarray):
+        """
+        Store an asset's (frames, coeffs) matrix, replacing any previous one.
+
+        librosa returns MFCCs as (coeffs, frames); pass `mfccs.T`.
+        """
+        features = np.ascontiguousarray(features, dtype=self.dtype)
+        if features.ndim != 2 or features.shape[1] != self.n_coeffs:
+            raise ValueError(f"Expected (frames, {self.n_coeffs}) features, got {features.shape}")
+
+        with self._locked():
+            self._refresh(locked=True)
+            with open(self._frames_path, "r+b") as f:
+                # Round up past any torn tail left by an interrupted append
+                start = -(-f.seek(0, os.SEEK_END) // self.row_bytes)
+                f.seek(start * self.row_bytes)
+                f.write(features.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+            previous = self._positions.get(asset_id)
+            if previous is not None:
+                self._set_deleted(previous)
+
+            record = np.zeros(1, dtype=INDEX_DTYPE)
+            record["asset_id"], record["start"], record["n_frames"] = asset_id, start, len(features)
+            with open(self._index_path, "ab") as f:
+                f.write(record.tobytes())
+
+    def delete(self, asset_id: int) -> bool:
+        """Flag an asset's frames as deleted; returns False if it was not stored."""
+        with self._locked():
+            self._refresh(locked=True)
+            position = self._positions.get(asset_id)
+            if position is None:
+                return False
+            self._set_deleted(position)
+            return True
+
+    def compact(self) -> Tuple[int, int]:
+        """
+        Rewrite the store without deleted rows.
+
+        Returns (rows_before, rows_after). Views handed out earlier keep
+        pointing at the replaced file until they are dropped.
+        """
+        with self._locked():
+            self._refresh(locked=True)
+            rows_before = len(self._frames)
+            live = self._live()
+
+            frames_tmp = self.root / "frames.bin.compact"
+            index_tmp = self.root / "index.bin.compact"
+            new_index = np.zeros(len(live), dtype=INDEX_DTYPE)
+            start = 0
+            with open(frames_tmp, "wb") as f:
+                for i, record in enumerate(live):
+                    rows = self._frames[record["start"]:record["start"] + record["n_frames"]]
+                    f.write(np.ascontiguousarray(rows).tobytes())
+                    new_index[i] = (record["asset_id"], start, record["n_frames"], 0, 0)
+                    start += int(record["n_frames"])
+                f.flush()
+                os.fsync(f.fileno())
+            new_index.tofile(index_tmp)
+
+            # Both swaps happen under the exclusive lock, which readers need to remap
+            os.replace(frames_tmp, self._frames_path)
+            os.replace(index_tmp, self._index_path)
+            self._signature = None
+            return rows_before, start
+
+    # -- reads -------------------------------------------------------------
+
+    def __contains__(self, asset_id: int) -> bool:
+        self._refresh()
+        return asset_id in self._positions
+
+    def __len__(self) -> int:
+        self._refresh()
+        return len(self._positions)
+
+    def entries(self) -> np.ndarray:
+        """Live index records (INDEX_DTYPE), in storage order."""
+        self._refresh()
+        return self._live()
+
+    def _live(self) -> np.ndarray:
+        positions = np.fromiter(sorted(self._positions.values()), dtype=np.int64, count=len(self._positions))
+        return self._index[positions]
+
+    def get(self, asset_id: int) -> Optional[np.ndarray]:
+        """Zero-copy (frames, coeffs) view of one asset, or None."""
+        self._refresh()
+        position = self._positions.get(asset_id)
+        if position is None:
+            return None
+        record = self._index[position]
+        return self._frames[record["start"]:record["start"] + record["n_frames"]]
+
+    def frames(self) -> np.ndarray:
+        """The whole memory-mapped frame matrix, including deleted rows."""
+        self._refresh()
+        return self._frames
+
+    def iter_assets(self) -> Iterator[Tuple[int, np.ndarray]]:
+        """(asset_id, zero-copy frames view) for every live asset."""
+        for record in self.entries():
+            yield int(record["asset_id"]), self._frames[record["start"]:record["start"] + record["n_frames"]]
+
+    def summary_vectors(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Per-asset mean and std of every coefficient, as (asset_ids, vectors).
+
+        These are the 40 values behind `fingerprint_hash` (up to storage
+        precision), so catalog-wide similarity sweeps can start from them.
+        """
+        live = self.entries()
+        live = live[live["n_frames"] > 0]
+        vectors = np.empty((len(live), 2 * self.n_coeffs), dtype=np.float64)
+        for i, record in enumerate(live):
+            rows = self._frames[record["start"]:record["start"] + record["n_frames"]]
+            vectors[i, :self.n_coeffs] = rows.mean(axis=0, dtype=np.float64)
+            vectors[i, self.n_coeffs:] = rows.std(axis=0, dtype=np.float64)
+        return live["asset_id"].copy(), vectors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SINC feature store maintenance")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("stats", "compact", "delete"):
+        command = sub.add_parser(name)
+        command.add_argument("root")
+        if name == "delete":
+            command.add_argument("asset_ids", nargs="+", type=int)
+    args = parser.parse_args()
+
+    store = FeatureStore(args.root)
+    if args.command == "stats":
+        live = store.entries()
+        print(f"assets={len(live)} live_rows={int(live['n_frames'].sum())} "
+              f"total_rows={len(store.frames())} dtype={store.dtype} coeffs={store.n_coeffs}")
+    elif args.command == "delete":
+        for asset_id in args.asset_ids:
+            print(f"{asset_id}: {'deleted' if store.delete(asset_id) else 'not stored'}")
+    elif args.command == "compact":
+        before, after = store.compact()
+        print(f"rows {before} -> {after}")
+
+
+if __name__ == "__main__":
+    main()
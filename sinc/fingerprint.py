@@ -4,15 +4,26 @@ Generates audio fingerprints using MFCC-based spectral analysis
 """
 
 import hashlib
+import importlib.util
 import json
-from typing import Tuple
+from typing import Optional, Tuple
 import numpy as np
 
-try:
-    import librosa
-    LIBROSA_AVAILABLE = True
-except ImportError:
-    LIBROSA_AVAILABLE = False
+from .decode import decode, decoder_available
+from .instrumentation import stage
+from .landmarks import compute_landmarks, pack
+
+# librosa (and numba behind it) is only imported on first MFCC computation
+LIBROSA_AVAILABLE = importlib.util.find_spec("librosa") is not None
+
+SAMPLE_RATE = 22050
+N_MFCC = 20
+
+
+def load_audio(audio_path: str) -> Tuple[np.ndarray, int]:
+    """Decode an audio file to mono at SAMPLE_RATE (see sinc.decode for backends)."""
+    audio = decode(audio_path, sr=SAMPLE_RATE)
+    return audio.y, audio.sr
 
 
 def compute_fingerprint(audio_path: str) -> Tuple[str, float]:
@@ -28,30 +39,62 @@ def compute_fingerprint(audio_path: str) -> Tuple[str, float]:
         fake_hash = hashlib.sha256(audio_path.encode()).hexdigest()
         return fake_hash, random.uniform(120.0, 300.0)
 
-    # Load audio file
-    y, sr = librosa.load(audio_path, sr=22050, mono=True)
+    audio = decode(audio_path, sr=SAMPLE_RATE)
+    return fingerprint_signal(audio.y, audio.sr, audio.duration_seconds)
 
+
+def fingerprint_signal(y: np.ndarray, sr: int, duration_seconds: Optional[float] = None) -> Tuple[str, float]:
+    """
+    Fingerprint hash and duration of an already decoded signal.
+
+    `duration_seconds` overrides the signal length when only part of the
+    file was decoded.
+    """
     # Get duration
-    duration_seconds = librosa.get_duration(y=y, sr=sr)
+    if duration_seconds is None:
+        duration_seconds = len(y) / sr
+
+    return fingerprint_mfcc(compute_mfcc(y, sr)), duration_seconds
 
-    # Compute MFCCs (Mel-frequency cepstral coefficients)
-    mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=20)
 
-    # Create summary vector: mean and std of each MFCC coefficient
-    mfcc_mean = np.mean(mfccs, axis=1)
-    mfcc_std = np.std(mfccs, axis=1)
+def compute_mfcc(y: np.ndarray, sr: int) -> np.ndarray:
+    """MFCC (Mel-frequency cepstral coefficients) matrix, shape (N_MFCC, frames)."""
+    import librosa
+
+    with stage("mfcc"):
+        return librosa.feature.mfcc(y=y, sr=sr, n_mfcc=N_MFCC)
+
+
+def fingerprint_mfcc(mfccs: np.ndarray) -> str:
+    """Chain fingerprint hash of an MFCC matrix."""
+    with stage("hash"):
+        # Create summary vector: mean and std of each MFCC coefficient
+        mfcc_mean = np.mean(mfccs, axis=1)
+        mfcc_std = np.std(mfccs, axis=1)
+
+        # Combine into feature vector
+        feature_vector = np.concatenate([mfcc_mean, mfcc_std])
 
-    # Combine into feature vector
-    feature_vector = np.concatenate([mfcc_mean, mfcc_std])
+        # Quantize to reduce floating point noise
+        feature_vector = np.round(feature_vector, decimals=4)
 
-    # Quantize to reduce floating point noise
-    feature_vector = np.round(feature_vector, decimals=4)
+        # Serialize and hash
+        feature_json = json.dumps(feature_vector.tolist(), sort_keys=True)
+        return hashlib.sha256(feature_json.encode()).hexdigest()
 
-    # Serialize and hash
-    feature_json = json.dumps(feature_vector.tolist(), sort_keys=True)
-    fingerprint_hash = hashlib.sha256(feature_json.encode()).hexdigest()
 
-    return fingerprint_hash, duration_seconds
+def compute_landmark_blob(audio_path: str) -> Optional[bytes]:
+    """
+    Packed segment-level landmarks for an audio file (see sinc.landmarks).
+
+    Returns None when no decoder is available.
+    """
+    if not decoder_available():
+        return None
+
+    y, sr = load_audio(audio_path)
+    with stage("landmarks"):
+        return pack(compute_landmarks(y), sr)
 
 
 def analyze_audio(audio_path: str) -> dict:
@@ -63,14 +106,29 @@ def analyze_audio(audio_path: str) -> dict:
         - duration_seconds
         - risk_score
         - clearance_status
+        - landmarks (packed landmark blob, or None without a decoder)
+        - features (MFCC frames as (frames, N_MFCC) for sinc.featurestore, or None)
     """
-    fingerprint_hash, duration_seconds = compute_fingerprint(audio_path)
+    landmarks = features = None
+    if LIBROSA_AVAILABLE:
+        # Decode once for the chain hash, the segment landmarks and the stored features
+        audio = decode(audio_path, sr=SAMPLE_RATE)
+        duration_seconds = audio.duration_seconds
+        mfccs = compute_mfcc(audio.y, audio.sr)
+        fingerprint_hash = fingerprint_mfcc(mfccs)
+        features = mfccs.T
+        with stage("landmarks"):
+            landmarks = pack(compute_landmarks(audio.y), audio.sr)
+    else:
+        fingerprint_hash, duration_seconds = compute_fingerprint(audio_path)
 
     # Run external provider checks (stubbed)
     from .providers import audible_magic, pex
 
-    am_result = audible_magic.check_fingerprint(fingerprint_hash)
-    pex_result = pex.check_fingerprint(fingerprint_hash)
+    with stage("provider.audible_magic"):
+        am_result = audible_magic.check_fingerprint(fingerprint_hash)
+    with stage("provider.pex"):
+        pex_result = pex.check_fingerprint(fingerprint_hash)
 
     # Determine risk score and clearance
     if am_result["match"] or pex_result["match"]:
@@ -84,5 +142,7 @@ def analyze_audio(audio_path: str) -> dict:
         "fingerprint_hash": fingerprint_hash,
         "duration_seconds": duration_seconds,
         "risk_score": risk_score,
-        "clearance_status": clearance_status
+        "clearance_status": clearance_status,
+        "landmarks": landmarks,
+        "features": features
     }
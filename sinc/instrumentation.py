@@ -0,0 +1,33 @@
+"""
+SINC stage timing hooks.
+
+SINC has no metrics dependency of its own; a host application registers an
+observer that receives (stage, seconds) for each timed stage.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+_observer: Optional[Callable[[str, float], None]] = None
+
+
+def set_stage_observer(observer: Optional[Callable[[str, float], None]]):
+    """Register (or clear, with None) the stage timing observer."""
+    global _observer
+    _observer = observer
+
+
+@contextmanager
+def stage(name: str):
+    """Time a block and report it to the observer, if one is registered."""
+    observer = _observer
+    if observer is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observer(name, time.perf_counter() - start)
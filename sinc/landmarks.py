@@ -0,0 +1,271 @@
+"""
+SINC Landmark Fingerprints
+Segment-level fingerprints from spectral-peak pairs, with an inverted index
+
+Each landmark is a uint32 hash of (anchor peak bin, target peak bin, frame
+gap) plus the anchor's frame offset. Matching an excerpt is a hash lookup
+followed by voting on the offset difference: a true match produces many
+landmarks agreeing on the same shift, which also locates the excerpt.
+"""
+
+import struct
+import threading
+from typing import Dict, List, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+N_FFT = 1024
+HOP_LENGTH = 512
+
+# Peak picking neighbourhood (frames, bins) and density cap
+PEAK_TIME_RADIUS = 6
+PEAK_FREQ_RADIUS = 12
+MAX_PEAKS_PER_FRAME = 5
+
+# Each anchor is paired with the next FAN_OUT peaks within MAX_DT frames
+FAN_OUT = 5
+MAX_DT = 63
+
+FREQ_BITS = 9
+DT_BITS = 6
+
+LANDMARK_DTYPE = np.dtype([("hash", "<u4"), ("offset", "<u4")])
+
+_MAGIC = b"SLM1"
+_HEADER = struct.Struct("<4sII")  # magic, sample rate, hop length
+
+
+def spectrogram(y: np.ndarray) -> np.ndarray:
+    """Log-magnitude STFT, shape (frames, bins), computed in one batched FFT."""
+    if len(y) < N_FFT:
+        y = np.pad(y, (0, N_FFT - len(y)))
+    frames = sliding_window_view(y.astype(np.float32, copy=False), N_FFT)[::HOP_LENGTH]
+    window = np.hanning(N_FFT).astype(np.float32)
+    magnitude = np.abs(np.fft.rfft(frames * window, axis=1))
+    return np.log1p(magnitude * 1000.0).astype(np.float32)
+
+
+def _local_max(spec: np.ndarray) -> np.ndarray:
+    # Separable max filter: frequency neighbourhood, then time
+    padded = np.pad(spec, ((0, 0), (PEAK_FREQ_RADIUS, PEAK_FREQ_RADIUS)), mode="constant", constant_values=-np.inf)
+    freq_max = sliding_window_view(padded, 2 * PEAK_FREQ_RADIUS + 1, axis=1).max(axis=-1)
+    padded = np.pad(freq_max, ((PEAK_TIME_RADIUS, PEAK_TIME_RADIUS), (0, 0)), mode="constant", constant_values=-np.inf)
+    return sliding_window_view(padded, 2 * PEAK_TIME_RADIUS + 1, axis=0).max(axis=-1)
+
+
+def find_peaks(spec: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Spectral peaks as (frame, bin) arrays sorted by frame.
+
+    A peak is the maximum of its neighbourhood, above the frame's mean
+    energy, keeping at most MAX_PEAKS_PER_FRAME of the strongest per frame.
+    """
+    is_peak = (spec == _local_max(spec)) & (spec > spec.mean(axis=1, keepdims=True)) & (spec > 0)
+    frames, bins = np.nonzero(is_peak)
+    if len(frames) == 0:
+        return frames, bins
+
+    # Strongest first within each frame, then cap the count per frame
+    order = np.lexsort((-spec[frames, bins], frames))
+    frames, bins = frames[order], bins[order]
+    first = np.searchsorted(frames, frames, side="left")
+    keep = (np.arange(len(frames)) - first) < MAX_PEAKS_PER_FRAME
+    return frames[keep], bins[keep]
+
+
+def compute_landmarks(y: np.ndarray) -> np.ndarray:
+    """Landmark array (LANDMARK_DTYPE) for a mono signal, ordered by offset."""
+    frames, bins = find_peaks(spectrogram(y))
+    if len(frames) < 2:
+        return np.empty(0, dtype=LANDMARK_DTYPE)
+
+    # Bins above the hash width fold into the top bucket
+    bins = np.minimum(bins, (1 << FREQ_BITS) - 1).astype(np.uint32)
+
+    pieces = []
+    for k in range(1, FAN_OUT + 1):
+        anchor_f, target_f = frames[:-k], frames[k:]
+        dt = target_f - anchor_f
+        valid = (dt > 0) & (dt <= MAX_DT)
+        if not valid.any():
+            continue
+        hashes = (
+            (bins[:-k][valid] << (FREQ_BITS + DT_BITS))
+            | (bins[k:][valid] << DT_BITS)
+            | dt[valid].astype(np.uint32)
+        )
+        chunk = np.empty(len(hashes), dtype=LANDMARK_DTYPE)
+        chunk["hash"] = hashes
+        chunk["offset"] = anchor_f[valid]
+        pieces.append(chunk)
+
+    if not pieces:
+        return np.empty(0, dtype=LANDMARK_DTYPE)
+    landmarks = np.concatenate(pieces)
+    return landmarks[np.argsort(landmarks["offset"], kind="stable")]
+
+
+def pack(landmarks: np.ndarray, sr: int) -> bytes:
+    """Serialize landmarks to the compact binary format (header + packed array)."""
+    return _HEADER.pack(_MAGIC, sr, HOP_LENGTH) + np.ascontiguousarray(landmarks, dtype=LANDMARK_DTYPE).tobytes()
+
+
+def unpack(data: bytes) -> Tuple[np.ndarray, float]:
+    """Deserialize packed landmarks; returns (landmarks, seconds per frame)."""
+    magic, sr, hop = _HEADER.unpack_from(data)
+    if magic != _MAGIC:
+        raise ValueError("Not a SINC landmark blob")
+    landmarks = np.frombuffer(data, dtype=LANDMARK_DTYPE, offset=_HEADER.size)
+    return landmarks, hop / sr
+
+
+class LandmarkIndex:
+    """
+    In-memory inverted index from landmark hash to (asset, offset).
+
+    Postings live in hash-sorted NumPy arrays, so a lookup is a pair of
+    binary searches per query landmark. New assets go to a small delta tier
+    that is merged into the main arrays once it grows past a fraction of them.
+    """
+
+    _MERGE_RATIO = 0.1
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._main = self._empty()
+        self._delta = self._empty()
+        self._pending: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        self._removed = set()
+        self._assets = set()
+
+    def __contains__(self, asset_id: int) -> bool:
+        return asset_id in self._assets
+
+    @staticmethod
+    def _empty():
+        return (np.empty(0, np.uint32), np.empty(0, np.int64), np.empty(0, np.uint32))
+
+    @staticmethod
+    def _sorted(parts):
+        if not parts:
+            return LandmarkIndex._empty()
+        hashes = np.concatenate([p[0] for p in parts])
+        order = np.argsort(hashes, kind="stable")
+        return (
+            hashes[order],
+            np.concatenate([p[1] for p in parts])[order],
+            np.concatenate([p[2] for p in parts])[order],
+        )
+
+    def add(self, asset_id: int, landmarks: np.ndarray):
+        with self._lock:
+            if asset_id in self._removed:
+                self._flush()
+                if self._removed:
+                    self._purge()
+            self._assets.add(asset_id)
+            self._pending.append((
+                landmarks["hash"].astype(np.uint32),
+                np.full(len(landmarks), asset_id, dtype=np.int64),
+                landmarks["offset"].astype(np.uint32),
+            ))
+
+    def add_many(self, entries: Dict[int, np.ndarray]):
+        """Bulk load, merging straight into the main tier."""
+        with self._lock:
+            parts = [self._main] + [
+                (lm["hash"].astype(np.uint32), np.full(len(lm), asset_id, dtype=np.int64), lm["offset"].astype(np.uint32))
+                for asset_id, lm in entries.items()
+            ]
+            self._main = self._sorted(parts)
+            self._assets.update(entries)
+
+    def remove(self, asset_id: int):
+        """Hide an asset from results; its postings are dropped on the next merge."""
+        with self._lock:
+            self._removed.add(asset_id)
+            self._assets.discard(asset_id)
+
+    def _flush(self):
+        if not self._pending:
+            return
+        self._delta = self._sorted([self._delta] + self._pending)
+        self._pending = []
+        if len(self._delta[0]) > self._MERGE_RATIO * max(len(self._main[0]), 1):
+            self._main, self._delta = self._sorted([self._main, self._delta]), self._empty()
+            if self._removed:
+                self._purge()
+
+    def _purge(self):
+        # Physically drop postings of removed assets; pending must be flushed first
+        removed = np.fromiter(self._removed, dtype=np.int64)
+        self._main, self._delta = (
+            tuple(column[~np.isin(tier[1], removed)] for column in tier)
+            for tier in (self._main, self._delta)
+        )
+        self._removed = set()
+
+    def _lookup(self, tier, query: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        hashes, assets, offsets = tier
+        if len(hashes) == 0:
+            return np.empty(0, np.int64), np.empty(0, np.int64)
+        left = np.searchsorted(hashes, query["hash"], side="left")
+        right = np.searchsorted(hashes, query["hash"], side="right")
+        counts = right - left
+        total = int(counts.sum())
+        if total == 0:
+            return np.empty(0, np.int64), np.empty(0, np.int64)
+
+        # Expand every [left, right) range without a Python loop
+        starts = np.repeat(left - (np.cumsum(counts) - counts), counts)
+        positions = starts + np.arange(total)
+        deltas = offsets[positions].astype(np.int64) - np.repeat(query["offset"].astype(np.int64), counts)
+        return assets[positions], deltas
+
+    def query(self, landmarks: np.ndarray, limit: int = 5, min_score: int = 5) -> List[dict]:
+        """
+        Best-matching assets for an excerpt's landmarks.
+
+        Returns dicts with asset_id, offset_frames (where the excerpt starts
+        in the asset), score (aligned landmark votes) and confidence
+        (score / query landmarks).
+        """
+        if len(landmarks) == 0:
+            return []
+
+        with self._lock:
+            self._flush()
+            tiers = (self._main, self._delta)
+            removed = set(self._removed)
+
+        found = [self._lookup(tier, landmarks) for tier in tiers]
+        assets = np.concatenate([f[0] for f in found])
+        deltas = np.concatenate([f[1] for f in found])
+        if removed and len(assets):
+            keep = ~np.isin(assets, np.fromiter(removed, dtype=np.int64))
+            assets, deltas = assets[keep], deltas[keep]
+        if len(assets) == 0:
+            return []
+
+        # Vote on (asset, offset shift); the best shift per asset is its score
+        keys = (assets << 32) | (deltas + (1 << 31))
+        keys, votes = np.unique(keys, return_counts=True)
+        key_assets = keys >> 32
+        order = np.lexsort((-votes, key_assets))
+        keys, key_assets, votes = keys[order], key_assets[order], votes[order]
+        best = np.ones(len(keys), dtype=bool)
+        best[1:] = key_assets[1:] != key_assets[:-1]
+        keys, key_assets, votes = keys[best], key_assets[best], votes[best]
+        shifts = (keys & 0xFFFFFFFF) - (1 << 31)
+
+        ranked = np.argsort(-votes, kind="stable")[:limit]
+        return [
+            {
+                "asset_id": int(key_assets[i]),
+                "offset_frames": int(shifts[i]),
+                "score": int(votes[i]),
+                "confidence": float(votes[i]) / len(landmarks),
+            }
+            for i in ranked if votes[i] >= min_score
+        ]